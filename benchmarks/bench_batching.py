@@ -0,0 +1,62 @@
+# Voice notes/hour for one-by-one transcription versus batches of 4, 8 and 16 short synthetic notes.
+# Usage: PYTHONPATH=src python benchmarks/bench_batching.py [--model small] [--notes 64]
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import build_audio_set
+
+from transkript_bot.transcription.faster_whisper import run_faster_whisper, run_faster_whisper_batch
+from transkript_bot.transcription.media import SAMPLE_RATE
+from transkript_bot.transcription.model_cache import ModelCache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--notes", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    from faster_whisper import decode_audio
+
+    cache = ModelCache(budget_mb=1 << 20)
+    options = {
+        "model_size": args.model,
+        "language": args.language,
+        "device": args.device,
+        "compute_type": args.compute_type,
+        "model_cache": cache,
+        "cpu_threads": os.cpu_count() or 1,
+    }
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_audio_set(Path(tmp), [rng.uniform(5.0, 20.0) for _ in range(args.notes)])
+        audios = [decode_audio(str(path), sampling_rate=SAMPLE_RATE) for path in paths]
+        # Warm the model so load time is not counted as throughput.
+        run_faster_whisper(audios[0], **options)
+
+        print(f"{'batch':>6} {'seconds':>10} {'notes/hour':>11} {'speedup':>8}")
+        started_at = time.perf_counter()
+        for audio in audios:
+            run_faster_whisper(audio, **options)
+        baseline = time.perf_counter() - started_at
+        print(f"{1:>6} {baseline:>10.1f} {len(audios) * 3600 / baseline:>11.1f} {1.0:>7.2f}x")
+        for batch_size in args.batch_sizes:
+            started_at = time.perf_counter()
+            for offset in range(0, len(audios), batch_size):
+                run_faster_whisper_batch(audios[offset : offset + batch_size], batch_size=batch_size, **options)
+            elapsed = time.perf_counter() - started_at
+            print(f"{batch_size:>6} {elapsed:>10.1f} {len(audios) * 3600 / elapsed:>11.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Wall-clock time of one long synthetic recording split into 1, 2, 4 and 8 VAD chunks transcribed in parallel.
+# Usage: PYTHONPATH=src python benchmarks/bench_chunks.py [--model small] [--seconds 1800]
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import write_synthetic_meeting
+
+from transkript_bot.services.scheduler import threads_per_worker
+from transkript_bot.transcription.faster_whisper import run_faster_whisper
+from transkript_bot.transcription.media import SAMPLE_RATE
+from transkript_bot.transcription.model_cache import ModelCache
+
+
+def _run(audio, chunks: int, args: argparse.Namespace) -> tuple[float, int]:
+    threads = threads_per_worker(os.cpu_count() or 1, chunks)
+    cache = ModelCache(budget_mb=1 << 20)
+    options = {
+        "model_size": args.model,
+        "language": args.language,
+        "device": args.device,
+        "compute_type": args.compute_type,
+        "model_cache": cache,
+        "cpu_threads": threads,
+        "num_workers": chunks,
+        "chunk_workers": chunks,
+        "chunk_min_sec": 0,
+        "chunk_target_sec": args.seconds / chunks,
+    }
+    # Warm the replicas on a short slice so model load time is not counted.
+    run_faster_whisper(audio[: 10 * SAMPLE_RATE], **options)
+    started_at = time.perf_counter()
+    segments = run_faster_whisper(audio, **options)
+    return time.perf_counter() - started_at, len(segments)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--seconds", type=float, default=1800.0)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    from faster_whisper import decode_audio
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_meeting(Path(tmp) / "meeting.wav", args.seconds)
+        audio = decode_audio(str(path), sampling_rate=SAMPLE_RATE)
+        print(f"{'chunks':>7} {'threads':>8} {'seconds':>10} {'speedup':>8} {'segments':>9}")
+        baseline = None
+        for chunks in args.chunks:
+            elapsed, segments = _run(audio, chunks, args)
+            baseline = baseline or elapsed
+            threads = threads_per_worker(os.cpu_count() or 1, chunks)
+            print(f"{chunks:>7} {threads:>8} {elapsed:>10.1f} {baseline / elapsed:>7.2f}x {segments:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# End-to-end throughput of worker.process_job on synthetic voice notes, videos and meeting recordings.
+# Drives the real pipeline (download stand-in, ffmpeg, model, segment store, delivery) through a fake Bot and
+# writes per-stage p50/p95, RTF, peak RSS and jobs/hour per backend x model x compute type as JSON.
+# Usage: PYTHONPATH=src python benchmarks/bench_e2e.py [--models small] [--lengths 10 60 600] [--out run.json]
+#        PYTHONPATH=src python benchmarks/bench_e2e.py --compare old.json new.json
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import psutil
+from aiogram.client.telegram import PRODUCTION
+from synthetic import MEDIA_FORMATS, write_synthetic_media
+
+from transkript_bot.config import Settings
+from transkript_bot.services.job_metrics import summarize_job_metrics
+from transkript_bot.services.memory_budget import MemoryBudget
+from transkript_bot.services.scheduler import threads_per_worker
+from transkript_bot.storage.db import Storage, init_db
+from transkript_bot.transcription.model_cache import ModelCache
+from transkript_bot.worker import process_job
+
+
+class FakeBot:
+    # The file_id is a local path; every API call answers after an optional simulated round-trip.
+    session = SimpleNamespace(api=PRODUCTION)
+
+    def __init__(self, api_latency_sec: float = 0.0) -> None:
+        self.api_latency_sec = api_latency_sec
+        self.calls: dict[str, int] = {}
+        self._message_ids = itertools.count(1000)
+
+    async def _api(self, name: str) -> SimpleNamespace:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.api_latency_sec:
+            await asyncio.sleep(self.api_latency_sec)
+        return SimpleNamespace(message_id=next(self._message_ids))
+
+    async def download(self, file_id: str, destination: str | None = None) -> io.BytesIO | None:
+        await self._api("download")
+        if destination is not None:
+            await asyncio.to_thread(shutil.copyfile, file_id, destination)
+            return None
+        return io.BytesIO(await asyncio.to_thread(Path(file_id).read_bytes))
+
+    async def edit_message_text(self, **_: Any) -> SimpleNamespace:
+        return await self._api("edit_message_text")
+
+    async def send_message(self, *_: Any, **__: Any) -> SimpleNamespace:
+        return await self._api("send_message")
+
+    async def send_document(self, *_: Any, **__: Any) -> SimpleNamespace:
+        return await self._api("send_document")
+
+
+class PeakRss:
+    # Includes child processes: ffmpeg and the whisperx CLI run outside the bot process.
+    def __init__(self, interval_sec: float = 0.05) -> None:
+        self.interval_sec = interval_sec
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        process = psutil.Process()
+        while not self._stop.is_set():
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.peak_bytes = max(self.peak_bytes, rss)
+            self._stop.wait(self.interval_sec)
+
+    def __enter__(self) -> PeakRss:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _build_inputs(out_dir: Path, formats: list[str], lengths: list[float], repeat: int) -> list[dict[str, Any]]:
+    inputs = []
+    for kind, length, index in itertools.product(formats, lengths, range(repeat)):
+        path = write_synthetic_media(out_dir / f"{kind}_{int(length)}s_{index}", length, kind, seed=index)
+        inputs.append({"kind": kind, "path": path, "duration_sec": length})
+    return inputs
+
+
+async def _run_combo(
+    inputs: list[dict[str, Any]], backend: str, model: str, compute_type: str, args: argparse.Namespace
+) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(
+            bot_token="bench",
+            storage_path=str(Path(tmp) / "bench.db"),
+            media_dir=str(Path(tmp) / "media"),
+            whisper_model=model,
+            whisper_device=args.device,
+            whisper_compute_type=compute_type,
+            backend_force=backend,
+            default_language=args.language,
+        )
+        await init_db(settings.storage_path)
+        storage = Storage(settings.storage_path)
+        threads = threads_per_worker(os.cpu_count() or 1, args.concurrency)
+        state: dict[str, Any] = {
+            "model_cache": ModelCache(budget_mb=1 << 20),
+            "memory_budget": MemoryBudget(settings.audio_memory_limit_mb * 1024 * 1024),
+        }
+        bot = FakeBot(args.api_latency_ms / 1000)
+        kinds: dict[int, str] = {}
+
+        async def _enqueue(item: dict[str, Any]) -> int:
+            job_id = await storage.create_job(
+                chat_id=1,
+                user_id=1,
+                status="queued",
+                message_id=1,
+                file_id=str(item["path"]),
+                file_name=item["path"].name,
+                status_message_id=1,
+                duration_sec=item["duration_sec"],
+                file_size=item["path"].stat().st_size,
+            )
+            kinds[job_id] = item["kind"]
+            return job_id
+
+        errors: dict[int, str] = {}
+
+        async def _worker() -> None:
+            while job := await storage.claim_job(owner="bench", lease_expires_at=time.time() + 3600):
+                try:
+                    await process_job(job, bot, settings, storage, state, backend, threads, args.concurrency)
+                except Exception as exc:
+                    # One broken input must not abort the run; it is reported as a failed job instead.
+                    errors[job["id"]] = f"{type(exc).__name__}: {exc}"
+                    await storage.update_job(job["id"], status="failed", error=str(exc))
+
+        # Warm-up job: loads the model so it is reported once instead of skewing the first measured job.
+        warm_id = await _enqueue(min(inputs, key=lambda item: item["duration_sec"]))
+        await _worker()
+        for item in inputs:
+            await _enqueue(item)
+        with PeakRss() as rss:
+            started_at = time.perf_counter()
+            await asyncio.gather(*(_worker() for _ in range(args.concurrency)))
+            wall_sec = time.perf_counter() - started_at
+
+        metrics = await storage.list_job_metrics(limit=len(inputs) + 1)
+        rows = [row for row in metrics if row["job_id"] != warm_id]
+        warm = next((row for row in metrics if row["job_id"] == warm_id), {})
+        await storage.close()
+
+    by_kind: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        by_kind.setdefault(kinds[row["job_id"]], []).append(row)
+    audio_sec = sum(row["audio_sec"] or 0.0 for row in rows)
+    return {
+        "backend": backend,
+        "model": model,
+        "compute_type": compute_type,
+        "concurrency": args.concurrency,
+        "jobs": len(rows),
+        "failed": sum(1 for job_id in errors if job_id != warm_id),
+        "errors": [{"job_id": job_id, "format": kinds[job_id], "error": error} for job_id, error in errors.items()],
+        "wall_sec": round(wall_sec, 2),
+        "jobs_per_hour": round(len(rows) * 3600 / wall_sec, 1) if wall_sec else 0.0,
+        "audio_sec_per_sec": round(audio_sec / wall_sec, 2) if wall_sec else 0.0,
+        "peak_rss_mb": round(rss.peak_bytes / (1024 * 1024), 1),
+        "model_load_sec": warm.get("model_sec"),
+        "api_calls": bot.calls,
+        "stages": summarize_job_metrics([{**row, "backend": "all"} for row in rows]).get("all", {}),
+        "by_format": {
+            kind: summarize_job_metrics([{**row, "backend": "all"} for row in kind_rows]).get("all", {})
+            for kind, kind_rows in by_kind.items()
+        },
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_key(run: dict[str, Any]) -> tuple:
+    return run["backend"], run["model"], run["compute_type"], run["concurrency"]
+
+
+def compare(old_path: Path, new_path: Path) -> None:
+    old = {_run_key(run): run for run in json.loads(old_path.read_text())["runs"]}
+    new = json.loads(new_path.read_text())["runs"]
+    print(f"{'backend/model/compute/conc':<34} {'jobs/h':>16} {'total p50 s':>18} {'rtf p50':>16} {'rss MB':>14}")
+    for run in new:
+        base = old.get(_run_key(run))
+        if base is None:
+            continue
+
+        def _cell(a: float | None, b: float | None) -> str:
+            if a is None or b is None:
+                return "n/a"
+            change = f"{(b - a) * 100 / a:+.0f}%" if a else ""
+            return f"{a:g}->{b:g} {change}"
+
+        total = (base["stages"].get("total", {}).get("p50"), run["stages"].get("total", {}).get("p50"))
+        rtf = (base["stages"].get("rtf", {}).get("p50"), run["stages"].get("rtf", {}).get("p50"))
+        print(
+            f"{'/'.join(map(str, _run_key(run))):<34} {_cell(base['jobs_per_hour'], run['jobs_per_hour']):>16} "
+            f"{_cell(*total):>18} {_cell(*rtf):>16} {_cell(base['peak_rss_mb'], run['peak_rss_mb']):>14}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["faster"])
+    parser.add_argument("--models", nargs="+", default=["small"])
+    parser.add_argument("--compute-types", nargs="+", default=["int8"])
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--formats", nargs="+", default=list(MEDIA_FORMATS), choices=list(MEDIA_FORMATS))
+    parser.add_argument("--lengths", type=float, nargs="+", default=[10.0, 60.0, 600.0])
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = _git_commit()
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = _build_inputs(Path(tmp), args.formats, args.lengths, args.repeat)
+        for backend, model, compute_type in itertools.product(args.backends, args.models, args.compute_types):
+            run = await _run_combo(inputs, backend, model, compute_type, args)
+            runs.append(run)
+            stages = run["stages"]
+            print(
+                f"{backend}/{model}/{compute_type}: {run['jobs']} jobs ({run['failed']} failed), "
+                f"{run['jobs_per_hour']} jobs/h, total p50 {stages.get('total', {}).get('p50')}s, "
+                f"rtf p50 {stages.get('rtf', {}).get('p50')}, peak RSS {run['peak_rss_mb']} MB"
+            )
+
+    out = args.out or Path(__file__).with_name("results") / f"e2e-{commit or 'unknown'}-{int(time.time())}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "created_at": time.time(),
+        "cpu_count": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("out", "compare")},
+        "runs": runs,
+    }
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+# Storage ops/sec with a connection per call (the old behaviour) vs the pooled WAL Storage.
+# Usage: PYTHONPATH=src python benchmarks/bench_storage.py [--rounds 500]
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import aiosqlite
+
+from transkript_bot.storage.db import Storage, init_db
+
+OPS_PER_ROUND = 5
+
+
+async def _media_message_per_connect(db_path: str, chat_id: int) -> None:
+    # Mirrors the pre-pool Storage: every call opens, queries, commits and closes.
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "INSERT INTO chats (chat_id, title, type, allowed_user_ids) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(chat_id) DO UPDATE SET title = excluded.title, type = excluded.type",
+            (chat_id, "Bench", "group", json.dumps([])),
+        )
+        await db.commit()
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute("SELECT * FROM chats WHERE chat_id = ?", (chat_id,)) as cursor:
+            await cursor.fetchone()
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute("SELECT * FROM users WHERE tg_id = ?", (chat_id,)) as cursor:
+            await cursor.fetchone()
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(
+            "SELECT started_at, finished_at FROM jobs WHERE status = 'done' ORDER BY finished_at DESC LIMIT 5"
+        ) as cursor:
+            await cursor.fetchall()
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "INSERT INTO jobs (chat_id, user_id, status) VALUES (?, ?, 'queued')",
+            (chat_id, chat_id),
+        )
+        await db.commit()
+
+
+async def _media_message_pooled(storage: Storage, chat_id: int) -> None:
+    await storage.upsert_chat(chat_id=chat_id, title="Bench", type_="group")
+    await storage.get_chat(chat_id)
+    await storage.get_user(chat_id)
+    await storage.get_recent_durations(limit=5)
+    await storage.create_job(chat_id=chat_id, user_id=chat_id, status="queued")
+
+
+async def _measure(rounds: int, concurrency: int, call) -> float:
+    started_at = time.perf_counter()
+    for offset in range(0, rounds, concurrency):
+        await asyncio.gather(*(call(offset + i) for i in range(min(concurrency, rounds - offset))))
+    elapsed = time.perf_counter() - started_at
+    return rounds * OPS_PER_ROUND / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path = str(Path(tmp) / "before.db")
+        await init_db(before_path)
+        async with aiosqlite.connect(before_path) as db:
+            await db.execute("PRAGMA journal_mode=DELETE")
+        before = await _measure(
+            args.rounds, args.concurrency, lambda i: _media_message_per_connect(before_path, i)
+        )
+
+        after_path = str(Path(tmp) / "after.db")
+        await init_db(after_path)
+        storage = Storage(after_path)
+        after = await _measure(args.rounds, args.concurrency, lambda i: _media_message_pooled(storage, i))
+        await storage.close()
+
+    print(f"connect per call: {before:>10.0f} ops/sec")
+    print(f"pooled WAL:       {after:>10.0f} ops/sec ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+# Jobs/hour for 1, 2, 4 and 8 concurrent faster-whisper workers on a fixed synthetic set.
+# Usage: PYTHONPATH=src python benchmarks/bench_workers.py [--model small] [--jobs 16]
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import build_audio_set
+
+from transkript_bot.services.scheduler import threads_per_worker
+from transkript_bot.transcription.faster_whisper import run_faster_whisper
+from transkript_bot.transcription.model_cache import ModelCache
+
+
+async def _run(paths: list[Path], workers: int, args: argparse.Namespace) -> float:
+    threads = threads_per_worker(os.cpu_count() or 1, workers)
+    cache = ModelCache(budget_mb=1 << 20)
+    options = {
+        "model_size": args.model,
+        "language": args.language,
+        "device": args.device,
+        "compute_type": args.compute_type,
+        "model_cache": cache,
+        "cpu_threads": threads,
+        "num_workers": workers,
+    }
+    # Warm the model so load time is not counted as throughput.
+    await asyncio.to_thread(run_faster_whisper, str(paths[0]), **options)
+
+    queue: asyncio.Queue[Path] = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+
+    async def _worker() -> None:
+        while not queue.empty():
+            path = queue.get_nowait()
+            await asyncio.to_thread(run_faster_whisper, str(path), **options)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(workers)))
+    return time.perf_counter() - started_at
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_audio_set(Path(tmp), [args.seconds] * args.jobs)
+        print(f"{'workers':>8} {'threads':>8} {'seconds':>10} {'jobs/hour':>10}")
+        for workers in args.workers:
+            elapsed = await _run(paths, workers, args)
+            threads = threads_per_worker(os.cpu_count() or 1, workers)
+            print(f"{workers:>8} {threads:>8} {elapsed:>10.1f} {len(paths) * 3600 / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
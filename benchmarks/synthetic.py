@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import math
+import random
+import subprocess
+import wave
+from array import array
+from pathlib import Path
+
+SAMPLE_RATE = 16000
+
+
+def _voiced_samples(seconds: float, seed: int) -> array:
+    # Vowel-like harmonic bursts at a syllable rate with short pauses, so VAD keeps most of it.
+    rng = random.Random(seed)
+    samples = array("h")
+    total = int(seconds * SAMPLE_RATE)
+    while len(samples) < total:
+        syllable = int(rng.uniform(0.12, 0.3) * SAMPLE_RATE)
+        pitch = rng.uniform(100.0, 220.0)
+        formants = (rng.uniform(300.0, 900.0), rng.uniform(900.0, 2500.0))
+        for i in range(syllable):
+            t = i / SAMPLE_RATE
+            envelope = math.sin(math.pi * i / syllable)
+            value = sum(
+                math.sin(2 * math.pi * pitch * k * t) / k
+                * (1.0 + sum(1.0 for f in formants if abs(pitch * k - f) < 150.0))
+                for k in range(1, 12)
+            )
+            samples.append(int(max(-1.0, min(1.0, 0.12 * envelope * value)) * 32767))
+        pause = int(rng.uniform(0.03, 0.25) * SAMPLE_RATE)
+        samples.extend([0] * pause)
+    del samples[total:]
+    return samples
+
+
+def write_synthetic_wav(path: Path, seconds: float, seed: int = 0) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(_voiced_samples(seconds, seed).tobytes())
+    return path
+
+
+def write_synthetic_meeting(
+    path: Path, seconds: float, seed: int = 0, turn_sec: float = 20.0, gap_sec: float = 2.5
+) -> Path:
+    # Speaker turns separated by pauses long enough for VAD to treat them as silence.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    samples = array("h")
+    turn = 0
+    while len(samples) < seconds * SAMPLE_RATE:
+        samples.extend(_voiced_samples(turn_sec, seed + turn))
+        samples.extend([0] * int(gap_sec * SAMPLE_RATE))
+        turn += 1
+    del samples[int(seconds * SAMPLE_RATE) :]
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return path
+
+
+def build_audio_set(out_dir: Path, lengths: list[float]) -> list[Path]:
+    return [
+        write_synthetic_wav(out_dir / f"synthetic_{index:03d}_{int(length)}s.wav", length, seed=index)
+        for index, length in enumerate(lengths)
+    ]
+
+
+# Telegram-like containers: voice notes are ogg/opus, videos mp4/h264+aac, meeting recordings webm/vp8+opus.
+_VIDEO_INPUT = ["-f", "lavfi", "-i", "color=c=black:s=320x240:r=5"]
+MEDIA_FORMATS = {
+    "voice": (".ogg", [], ["-c:a", "libopus", "-b:a", "32k"]),
+    "video": (".mp4", _VIDEO_INPUT, ["-shortest", "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac"]),
+    "meeting": (".webm", _VIDEO_INPUT, ["-shortest", "-c:v", "libvpx", "-deadline", "realtime", "-c:a", "libopus"]),
+}
+
+
+def write_synthetic_media(path_stem: Path, seconds: float, kind: str, seed: int = 0) -> Path:
+    suffix, inputs, codecs = MEDIA_FORMATS[kind]
+    wav_path = path_stem.with_suffix(".src.wav")
+    if kind == "meeting":
+        write_synthetic_meeting(wav_path, seconds, seed=seed)
+    else:
+        write_synthetic_wav(wav_path, seconds, seed=seed)
+    out_path = path_stem.with_suffix(suffix)
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", *inputs, "-i", str(wav_path), *codecs, str(out_path)]
+    subprocess.run(cmd, check=True)
+    wav_path.unlink()
+    return out_path
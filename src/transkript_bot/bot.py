@@ -12,42 +12,130 @@ from .config import Settings
 from .routers import admin, chat_admin, common, media
 from .services.telegram_api import build_api_server
 from .services.idle_shutdown import idle_shutdown_loop
+from .services.janitor import MediaJanitor, janitor_loop
 from .services.commands import build_command_scopes
+from .services.memory_budget import MemoryBudget
+from .services.metrics import MetricsRegistry, TelegramMetrics, register_app_metrics, start_metrics_server
+from .services.job_queue import JobQueue
+from .services.queue import EtaModel
+from .services.rate_governor import RateGovernor
+from .services.scheduler import threads_per_worker, worker_count
+from .services.transcript_cache import TranscriptCache
 from .services.system_info import format_startup_info, get_system_info
 from .storage.db import Storage, init_db
+from .storage.ttl_cache import TtlCache
 from .transcription.backend import choose_backend
-from .worker import worker_loop
+from .transcription.whisperx_worker import WhisperXPool, WhisperXWorker, build_whisperx_worker_cmd
+from .transcription.model_cache import ModelCache
+from .transcription.segment_store import RenderCache
+from .worker import start_workers, stop_profilers
 
 logger = logging.getLogger(__name__)
 
 
+async def _warm_up_whisperx(pool: WhisperXPool) -> None:
+    try:
+        await pool.start()
+    except Exception as exc:
+        logger.warning("WhisperX worker warm-up failed: %s", exc)
+
+
 async def create_app() -> tuple[Bot, Dispatcher]:
     settings = Settings()
     if not settings.bot_token:
         raise RuntimeError("BOT_TOKEN is required")
 
     await init_db(settings.storage_path)
-    storage = Storage(settings.storage_path)
-    queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    storage = Storage(
+        settings.storage_path,
+        pool_size=settings.sqlite_pool_size,
+        busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+        synchronous=settings.sqlite_synchronous,
+        permission_cache_ttl_sec=settings.permission_cache_ttl_sec,
+    )
+    queue = JobQueue(storage, lease_sec=settings.job_lease_sec, max_attempts=settings.job_max_attempts)
     app_state: dict[str, Any] = {
         "admin_mode": set(),
         "last_activity": time.time(),
-        "worker_busy": False,
+        "workers": {},
+        "model_cache": ModelCache(settings.model_cache_mb),
+        "memory_budget": MemoryBudget(settings.audio_memory_limit_mb * 1024 * 1024),
+        "chat_admin_cache": TtlCache(settings.permission_cache_ttl_sec),
+        "render_cache": RenderCache(settings.render_cache_entries),
+        "janitor": MediaJanitor(
+            storage,
+            settings.media_dir,
+            retention_sec=settings.media_retention_days * 86400,
+            max_bytes=settings.media_max_mb * 1024 * 1024,
+            min_free_pct=settings.media_min_free_pct,
+        ),
+        "transcript_cache": TranscriptCache(
+            storage,
+            max_bytes=settings.transcript_cache_mb * 1024 * 1024,
+            max_age_sec=settings.transcript_cache_days * 86400,
+        ),
     }
 
     system_info = get_system_info()
     backend = choose_backend(force=settings.backend_force, has_gpu=system_info.get("has_gpu", False))
+    workers = worker_count(settings, backend)
+    # Long recordings may run chunk_workers model replicas per transcribe worker; split the cores across all of them.
+    replicas = workers * max(1, settings.chunk_workers) if backend == "faster" else workers
+    threads = threads_per_worker(system_info.get("cpu_count", 0), replicas, settings.worker_threads)
     logger.info(
-        "App init: backend=%s media_dir=%s storage=%s idle_shutdown=%smin",
+        "App init: backend=%s workers=%s threads=%s media_dir=%s storage=%s idle_shutdown=%smin",
         backend,
+        workers,
+        threads,
         settings.media_dir,
         settings.storage_path,
         settings.idle_shutdown_minutes,
     )
 
+    app_state["eta"] = EtaModel(backend, settings.whisper_model, workers=workers)
+
+    if backend == "faster" and settings.model_warmup:
+        try:
+            await asyncio.to_thread(
+                app_state["model_cache"].get,
+                settings.whisper_model,
+                settings.whisper_device,
+                settings.whisper_compute_type,
+                cpu_threads=threads,
+                num_workers=replicas,
+            )
+        except Exception as exc:
+            logger.warning("Model warm-up failed: %s", exc)
+
+    if backend == "whisperx" and settings.whisperx_persistent:
+        worker_cmd = build_whisperx_worker_cmd(
+            settings.whisper_model, threads=threads, worker_cmd=settings.whisperx_worker_cmd
+        )
+        app_state["whisperx_pool"] = WhisperXPool(
+            workers,
+            lambda: WhisperXWorker(
+                worker_cmd,
+                hf_token=settings.hf_token,
+                job_timeout=settings.whisperx_job_timeout_sec,
+            ),
+        )
+
     api_server = build_api_server(settings)
     session = AiohttpSession(api=api_server)
+    rate_governor = RateGovernor(
+        global_rate=settings.tg_global_rate,
+        chat_rate=settings.tg_chat_rate,
+        group_rate_per_min=settings.tg_group_rate_per_min,
+    )
+    session.middleware(rate_governor)
+    app_state["rate_governor"] = rate_governor
+    metrics = MetricsRegistry()
+    session.middleware(TelegramMetrics(metrics))
+    storage.query_observer = metrics.histogram("sqlite_query_seconds", "SQLite operation latency").observe
+    register_app_metrics(metrics, app_state)
+    app_state["metrics"] = metrics
     bot = Bot(settings.bot_token, session=session)
+    queue.bot = bot
     dp = Dispatcher()
 
     dp["settings"] = settings
@@ -74,19 +162,59 @@ async def create_app() -> tuple[Bot, Dispatcher]:
                 await bot.send_message(admin_id, format_startup_info(system_info))
             except Exception:
                 continue
-        dispatcher["worker_task"] = asyncio.create_task(
-            worker_loop(queue, bot, settings, storage, app_state, backend)
+        await queue.recover()
+        eta_model: EtaModel = app_state["eta"]
+        eta_model.seed(await storage.list_job_metrics(limit=50))
+        for job in await storage.list_queued_jobs():
+            eta_model.enqueue(
+                job["id"],
+                job["duration_sec"],
+                chat_id=job["chat_id"],
+                status_message_id=job["status_message_id"],
+            )
+        await app_state["transcript_cache"].evict()
+        dispatcher["queue_heartbeat_task"] = asyncio.create_task(queue.heartbeat_loop())
+        dispatcher["janitor_task"] = asyncio.create_task(
+            janitor_loop(app_state["janitor"], settings.janitor_interval_sec)
+        )
+        dispatcher["worker_tasks"] = start_workers(
+            queue,
+            bot,
+            settings,
+            storage,
+            app_state,
+            backend,
+            workers,
+            threads,
         )
+        whisperx_pool = app_state.get("whisperx_pool")
+        if whisperx_pool is not None and settings.model_warmup:
+            dispatcher["whisperx_warmup_task"] = asyncio.create_task(_warm_up_whisperx(whisperx_pool))
         dispatcher["idle_task"] = asyncio.create_task(
             idle_shutdown_loop(queue, app_state, settings.idle_shutdown_minutes * 60)
         )
-        logger.info("Startup complete: worker and idle tasks launched")
+        if settings.metrics_port:
+            dispatcher["metrics_runner"] = await start_metrics_server(
+                metrics, settings.metrics_host, settings.metrics_port
+            )
+        logger.info("Startup complete: workers and idle task launched")
 
     async def on_shutdown(dispatcher: Dispatcher, **_: Any) -> None:
-        for key in ("worker_task", "idle_task"):
+        for task in dispatcher.get("worker_tasks") or []:
+            task.cancel()
+        for key in ("idle_task", "queue_heartbeat_task", "janitor_task", "whisperx_warmup_task"):
             task = dispatcher.get(key)
             if task:
                 task.cancel()
+        metrics_runner = dispatcher.get("metrics_runner")
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        # Jobs interrupted by the shutdown never reach _finish_profile; do not leave their samplers running.
+        stop_profilers(app_state)
+        whisperx_pool = app_state.get("whisperx_pool")
+        if whisperx_pool is not None:
+            await whisperx_pool.close()
+        await storage.close()
 
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
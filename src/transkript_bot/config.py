@@ -4,15 +4,63 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     bot_token: str | None = None
     bot_api_base_url: str | None = None
+    # Read local Bot API files in place from the shared volume instead of copying them into media_dir.
+    bot_api_read_in_place: bool = True
+    bot_api_server_dir: str = "/var/lib/telegram-bot-api"
+    bot_api_local_dir: str | None = None
     root_admin_ids: list[int] = []
     hf_token: str | None = None
     storage_path: str = "./data/bot.db"
+    sqlite_pool_size: int = 4
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = "NORMAL"
+    permission_cache_ttl_sec: float = 60.0
     media_dir: str = "./data/media"
     idle_shutdown_minutes: int = 5
     default_language: str = "auto"
     whisper_model: str = "small"
+    whisper_device: str = "cpu"
+    whisper_compute_type: str = "int8"
+    model_cache_mb: int = 2048
+    model_warmup: bool = True
     allowed_senders_default: str = "whitelist"
     backend_force: str | None = None
     whisperx_cmd: str = "whisperx"
+    whisperx_persistent: bool = True
+    whisperx_worker_cmd: str = ""
+    whisperx_job_timeout_sec: int = 7200
+    workers_cpu: int = 1
+    workers_gpu: int = 1
+    worker_threads: int = 0
+    prepare_workers: int = 1
+    pipeline_depth: int = 2
+    chunk_workers: int = 1
+    batch_max_size: int = 1
+    batch_wait_ms: int = 300
+    batch_max_audio_sec: int = 30
+    chunk_min_sec: int = 1200
+    chunk_target_sec: int = 300
+    job_lease_sec: int = 300
+    job_max_attempts: int = 3
+    transcript_cache_mb: int = 2048
+    transcript_cache_days: int = 30
+    media_retention_days: float = 30.0
+    media_max_mb: int = 10240
+    media_min_free_pct: float = 10.0
+    janitor_interval_sec: int = 600
+    tg_global_rate: float = 30.0
+    tg_chat_rate: float = 1.0
+    tg_group_rate_per_min: float = 20.0
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+    profile_every_n: int = 0
+    profile_interval_ms: int = 5
+    ffmpeg_timeout_sec: int = 1800
+    stream_audio: bool = True
+    stream_partial: bool = True
+    partial_tail_chars: int = 600
+    inmemory_max_mb: int = 64
+    render_cache_entries: int = 32
+    audio_memory_limit_mb: int = 1536
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
@@ -7,6 +7,9 @@ from aiogram.types import CallbackQuery, Message
 from ..config import Settings
 from ..services.keyboard import build_admin_menu_keyboard, build_requests_list_keyboard
 from ..services.commands import parse_user_id
+from ..services.job_metrics import format_job_metrics, summarize_job_metrics
+from ..services.pipeline import format_pipeline_stats
+from ..services.scheduler import format_workers
 from ..services.system_info import format_startup_info, get_system_info
 from ..storage.db import Storage
 
@@ -144,11 +147,86 @@ async def stats(message: Message, settings: Settings, storage: Storage, app_stat
         "Stats:\n"
         f"Users: {stats_data['users_total']} (allowed {stats_data['users_allowed']}, blocked {stats_data['users_blocked']})\n"
         f"Chats: {stats_data['chats_total']}\n"
-        f"Jobs: {stats_data['jobs_total']}"
+        f"Jobs: {stats_data['jobs_total']}\n"
+        f"{format_workers(app_state)}"
     )
+    if app_state.get("pipeline"):
+        text += "\n" + format_pipeline_stats(app_state)
+    eta_model = app_state.get("eta")
+    if eta_model is not None:
+        eta = eta_model.stats()
+        text += f"\nETA model: RTF {eta['rtf']} from {eta['samples']} job(s), {eta['queued']} queued"
+    memory_budget = app_state.get("memory_budget")
+    if memory_budget is not None:
+        memory = memory_budget.stats()
+        text += f"\nAudio memory: {memory['used_mb']}/{memory['limit_mb']} MB (peak {memory['peak_mb']} MB)"
+    transcript_cache = app_state.get("transcript_cache")
+    if transcript_cache is not None:
+        cached = transcript_cache.stats()
+        text += (
+            f"\nTranscript cache: {cached['entries']} entries, {cached['size_mb']} MB, "
+            f"hit rate {cached['hit_rate_pct']}% ({cached['hits']} hits, {cached['misses']} misses)"
+        )
+    permission_caches = [("users", storage.user_cache), ("chats", storage.chat_cache)]
+    if app_state.get("chat_admin_cache") is not None:
+        permission_caches.append(("admins", app_state["chat_admin_cache"]))
+    if permission_caches[0][1].enabled:
+        parts = []
+        for name, cache in permission_caches:
+            snap = cache.stats()
+            parts.append(f"{name} {snap['hit_rate_pct']}% ({snap['hits']}/{snap['hits'] + snap['misses']})")
+        text += "\nPermission cache: " + ", ".join(parts)
+    text += "\n" + format_job_metrics(summarize_job_metrics(await storage.list_job_metrics(limit=500)))
+    janitor = app_state.get("janitor")
+    if janitor is not None:
+        swept = janitor.stats()
+        text += (
+            f"\nMedia janitor: {swept['removed_files']} files removed, {swept['freed_mb']} MB freed, "
+            f"disk free {swept['free_pct']}%"
+        )
+    rate_governor = app_state.get("rate_governor")
+    if rate_governor is not None:
+        limits = rate_governor.stats()
+        text += (
+            f"\nTelegram API: throttled {limits['throttled']}, flood waits {limits['retry_after']}, "
+            f"coalesced edits {limits['coalesced']}"
+        )
+    whisperx_pool = app_state.get("whisperx_pool")
+    if whisperx_pool is not None:
+        pool = whisperx_pool.stats()
+        text += f"\nWhisperX workers: {pool['alive']}/{pool['workers']} alive, restarts {pool['restarts']}"
+    model_cache = app_state.get("model_cache")
+    if model_cache is not None:
+        cache = model_cache.stats()
+        text += (
+            f"\nModel cache: {cache['models']} loaded, {cache['used_mb']}/{cache['budget_mb']} MB, "
+            f"hits {cache['hits']}, misses {cache['misses']}, load {cache['load_seconds']}s"
+        )
     await _reply_private(message, text)
 
 
+@router.message(Command("profile"))
+async def profile_job(message: Message, settings: Settings, storage: Storage, app_state: dict) -> None:
+    if not _is_root_admin(message.from_user.id if message.from_user else None, settings):
+        return
+    if not _is_admin_mode(app_state, message.from_user.id if message.from_user else 0):
+        await _reply_private(message, "Enable admin mode with /admin")
+        return
+    job_id = parse_user_id(message.text or "")
+    if job_id is None:
+        await _reply_private(message, "Usage: /profile <job_id>")
+        return
+    job = await storage.get_job(job_id)
+    if not job or job.get("status") != "queued":
+        await _reply_private(message, f"Job {job_id} is not queued; only queued jobs can be profiled")
+        return
+    requests = app_state.setdefault("profile_requests", {})
+    recipients = requests.setdefault(job_id, [])
+    if message.from_user.id not in recipients:
+        recipients.append(message.from_user.id)
+    await _reply_private(message, f"Job {job_id} will be profiled; the collapsed stacks are sent here when it ends")
+
+
 @router.message(Command("system"))
 async def system_info_cmd(message: Message, settings: Settings, app_state: dict) -> None:
     if not _is_root_admin(message.from_user.id if message.from_user else None, settings):
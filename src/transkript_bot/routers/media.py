@@ -8,17 +8,21 @@ from typing import Any
 
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import CallbackQuery, FSInputFile, Message
+from aiogram.types import BufferedInputFile, CallbackQuery, FSInputFile, InputMediaDocument, Message
 from aiogram.types.chat_member_administrator import ChatMemberAdministrator
 from aiogram.types.chat_member_owner import ChatMemberOwner
 
 from ..config import Settings
 from ..services.access import can_process
 from ..services.limits import is_cloud_file_too_large
-from ..services.queue import estimate_eta
-from ..services.keyboard import build_request_access_keyboard
+from ..services.queue import EtaModel, format_queue_status
+from ..services.keyboard import build_request_access_keyboard, build_result_files_keyboard
 from ..services.notifications import notify_root_admins_request
+from ..services.progress import format_progress
 from ..storage.db import Storage
+from ..storage.ttl_cache import TtlCache
+from ..transcription.formatting import RENDERERS
+from ..transcription.segment_store import RenderCache
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -28,17 +32,26 @@ def _is_admin_member(member) -> bool:
     return isinstance(member, (ChatMemberAdministrator, ChatMemberOwner))
 
 
-async def _is_chat_admin(message: Message) -> bool:
+async def _is_chat_admin(message: Message, cache: TtlCache | None = None) -> bool:
     if not message.from_user:
         return False
+    key = (message.chat.id, message.from_user.id)
+    if cache is not None:
+        found, is_admin = cache.get(key)
+        if found:
+            return is_admin
     member = await message.bot.get_chat_member(message.chat.id, message.from_user.id)
-    return _is_admin_member(member)
+    is_admin = _is_admin_member(member)
+    if cache is not None:
+        cache.set(key, is_admin)
+    return is_admin
 
 
 def _extract_media(message: Message) -> dict[str, Any] | None:
     if message.audio:
         return {
             "file_id": message.audio.file_id,
+            "file_unique_id": message.audio.file_unique_id,
             "file_name": message.audio.file_name or "audio",
             "duration": message.audio.duration,
             "file_size": message.audio.file_size,
@@ -46,6 +59,7 @@ def _extract_media(message: Message) -> dict[str, Any] | None:
     if message.video:
         return {
             "file_id": message.video.file_id,
+            "file_unique_id": message.video.file_unique_id,
             "file_name": message.video.file_name or "video",
             "duration": message.video.duration,
             "file_size": message.video.file_size,
@@ -53,6 +67,7 @@ def _extract_media(message: Message) -> dict[str, Any] | None:
     if message.voice:
         return {
             "file_id": message.voice.file_id,
+            "file_unique_id": message.voice.file_unique_id,
             "file_name": "voice.ogg",
             "duration": message.voice.duration,
             "file_size": message.voice.file_size,
@@ -60,6 +75,7 @@ def _extract_media(message: Message) -> dict[str, Any] | None:
     if message.document:
         return {
             "file_id": message.document.file_id,
+            "file_unique_id": message.document.file_unique_id,
             "file_name": message.document.file_name or "document",
             "duration": None,
             "file_size": message.document.file_size,
@@ -116,6 +132,59 @@ def _parse_result_file_callback(data: str | None) -> tuple[int, str] | None:
         return None
 
 
+def _load_json_dict(raw: str | None) -> dict[str, Any]:
+    try:
+        data = json.loads(raw) if raw else {}
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _result_documents(
+    job_id: int,
+    kinds: tuple[str, ...],
+    output_paths: dict[str, Any],
+    file_ids: dict[str, Any],
+    renders: RenderCache,
+) -> list[tuple[str, str | FSInputFile | BufferedInputFile]]:
+    documents: list[tuple[str, str | FSInputFile | BufferedInputFile]] = []
+    segments_path = output_paths.get("segments")
+    has_segments = bool(segments_path) and Path(segments_path).is_file()
+    for kind in kinds:
+        if file_ids.get(kind):
+            documents.append((kind, file_ids[kind]))
+            continue
+        if has_segments:
+            documents.append((kind, BufferedInputFile(renders.render(segments_path, kind), f"{job_id}.{kind}")))
+            continue
+        # Jobs finished before the segment store keep their eagerly written files.
+        path = output_paths.get(kind)
+        if path and Path(path).is_file():
+            documents.append((kind, FSInputFile(path)))
+    return documents
+
+
+async def _send_documents(
+    query: CallbackQuery, documents: list[str | FSInputFile | BufferedInputFile]
+) -> list[Message]:
+    chat_id = query.message.chat.id
+
+    async def _send(thread_id: int | None) -> list[Message]:
+        if len(documents) == 1:
+            return [
+                await query.bot.send_document(chat_id=chat_id, document=documents[0], message_thread_id=thread_id)
+            ]
+        media = [InputMediaDocument(media=document) for document in documents]
+        return await query.bot.send_media_group(chat_id=chat_id, media=media, message_thread_id=thread_id)
+
+    try:
+        return await _send(query.message.message_thread_id)
+    except TelegramBadRequest as exc:
+        if "message thread not found" not in str(exc).lower():
+            raise
+        return await _send(None)
+
+
 @router.callback_query(F.data.startswith("job:file:"))
 async def send_result_file(query: CallbackQuery, storage: Storage, app_state: dict) -> None:
     parsed = _parse_result_file_callback(query.data)
@@ -132,13 +201,8 @@ async def send_result_file(query: CallbackQuery, storage: Storage, app_state: di
         await query.answer("Access denied", show_alert=True)
         return
 
-    output_paths_raw = job.get("output_paths")
-    try:
-        output_paths = json.loads(output_paths_raw) if output_paths_raw else {}
-    except json.JSONDecodeError:
-        output_paths = {}
-    if not isinstance(output_paths, dict):
-        output_paths = {}
+    output_paths = _load_json_dict(job.get("output_paths"))
+    file_ids = _load_json_dict(job.get("tg_file_ids"))
 
     selector_key = (query.message.chat.id, query.message.message_id)
     sent_files_state = app_state.setdefault("result_file_messages", {})
@@ -149,34 +213,38 @@ async def send_result_file(query: CallbackQuery, storage: Storage, app_state: di
         except Exception:
             continue
 
-    kinds = ("txt", "md", "json") if file_kind == "all" else (file_kind,)
-    sent = 0
-    new_message_ids: list[int] = []
-    for kind in kinds:
-        path = output_paths.get(kind)
-        if not path or not Path(path).is_file():
-            continue
-        try:
-            sent_message = await query.bot.send_document(
-                chat_id=query.message.chat.id,
-                document=FSInputFile(path),
-                message_thread_id=query.message.message_thread_id,
-            )
-        except TelegramBadRequest as exc:
-            if "message thread not found" not in str(exc).lower():
-                raise
-            sent_message = await query.bot.send_document(
-                chat_id=query.message.chat.id,
-                document=FSInputFile(path),
-            )
-        new_message_ids.append(sent_message.message_id)
-        sent += 1
-
-    if sent == 0:
+    kinds = tuple(RENDERERS) if file_kind == "all" else (file_kind,)
+    if any(kind not in RENDERERS for kind in kinds):
+        await query.answer("Invalid action", show_alert=True)
+        return
+    renders: RenderCache = app_state.setdefault("render_cache", RenderCache())
+    documents = _result_documents(job_id, kinds, output_paths, file_ids, renders)
+    if not documents:
         await query.answer("Result files are unavailable", show_alert=True)
         return
-    sent_files_state[selector_key] = new_message_ids
-    await query.answer(f"Sent {sent} file(s)")
+    try:
+        sent_messages = await _send_documents(query, [document for _, document in documents])
+    except TelegramBadRequest:
+        if not any(isinstance(document, str) for _, document in documents):
+            raise
+        # A stored file_id was rejected; upload from disk again and record fresh ids.
+        logger.info("Cached file_id rejected, re-uploading: job_id=%s", job_id)
+        file_ids = {}
+        documents = _result_documents(job_id, kinds, output_paths, file_ids, renders)
+        if not documents:
+            await query.answer("Result files are unavailable", show_alert=True)
+            return
+        sent_messages = await _send_documents(query, [document for _, document in documents])
+
+    uploaded = {
+        kind: sent_message.document.file_id
+        for (kind, document), sent_message in zip(documents, sent_messages)
+        if not isinstance(document, str) and sent_message.document
+    }
+    if uploaded:
+        await storage.update_job(job_id, tg_file_ids=json.dumps({**file_ids, **uploaded}))
+    sent_files_state[selector_key] = [sent_message.message_id for sent_message in sent_messages]
+    await query.answer(f"Sent {len(sent_messages)} file(s)")
 
 @router.message(F.audio | F.video | F.voice | F.document)
 async def handle_media(
@@ -185,6 +253,7 @@ async def handle_media(
     storage: Storage,
     queue,
     app_state: dict,
+    backend: str,
 ) -> None:
     media = _extract_media(message)
     if not media:
@@ -197,7 +266,11 @@ async def handle_media(
         )
         return
 
-    is_admin = await _is_chat_admin(message) if message.chat.type != "private" else False
+    is_admin = (
+        await _is_chat_admin(message, app_state.get("chat_admin_cache"))
+        if message.chat.type != "private"
+        else False
+    )
 
     if message.chat.type == "private":
         user_id = message.from_user.id if message.from_user else 0
@@ -259,14 +332,73 @@ async def handle_media(
         )
         return
 
-    position = queue.qsize() + 1
-    durations = await storage.get_recent_durations(limit=5)
-    eta = estimate_eta(durations, position)
-    eta_text = "unknown" if eta < 0 else f"{eta} sec"
+    transcript_cache = app_state.get("transcript_cache")
+    if transcript_cache is not None:
+        cached_paths = await transcript_cache.lookup(
+            backend=backend,
+            model=settings.whisper_model,
+            language=settings.default_language,
+            file_unique_id=media.get("file_unique_id"),
+        )
+        if cached_paths:
+            job_id = await storage.create_job(
+                chat_id=message.chat.id,
+                user_id=message.from_user.id if message.from_user else 0,
+                message_id=message.message_id,
+                thread_id=message.message_thread_id,
+                file_id=media["file_id"],
+                file_unique_id=media.get("file_unique_id"),
+                file_name=media["file_name"],
+                duration_sec=media.get("duration"),
+                file_size=media.get("file_size"),
+                backend=backend,
+                status="done",
+                output_paths=json.dumps(cached_paths),
+            )
+            logger.info("Transcript cache hit: job id=%s file_unique_id=%s", job_id, media.get("file_unique_id"))
+            await message.reply(
+                format_progress(stage="done", transcribe_percent=100),
+                reply_markup=build_result_files_keyboard(job_id=job_id),
+            )
+            app_state["last_activity"] = time.time()
+            return
 
-    status_msg = await message.reply(
-        f"Queued. Position: {position}. ETA: {eta_text}."
-    )
+    status_msg = None
+    inflight = await storage.find_inflight_job(media["file_unique_id"]) if media.get("file_unique_id") else None
+    if inflight is not None:
+        status_msg = await message.reply(
+            f"Same file is already being transcribed (job {inflight['id']}). The result will appear here."
+        )
+        job_id = await storage.attach_coalesced_job(
+            inflight["id"],
+            chat_id=message.chat.id,
+            user_id=message.from_user.id if message.from_user else 0,
+            message_id=message.message_id,
+            thread_id=message.message_thread_id,
+            file_id=media["file_id"],
+            file_unique_id=media.get("file_unique_id"),
+            file_name=media["file_name"],
+            duration_sec=media.get("duration"),
+            file_size=media.get("file_size"),
+            status_message_id=status_msg.message_id,
+        )
+        if job_id is not None:
+            logger.info("Coalesced job id=%s into in-flight job id=%s", job_id, inflight["id"])
+            app_state["last_activity"] = time.time()
+            return
+        # The leader finished while we were replying; transcribe this file on its own.
+        logger.info("In-flight job id=%s finished before coalescing, queueing normally", inflight["id"])
+
+    position = queue.qsize() + 1
+    eta_model: EtaModel = app_state["eta"]
+    status_text = format_queue_status(position, eta_model.estimate(media.get("duration")))
+    if status_msg is None:
+        status_msg = await message.reply(status_text)
+    else:
+        try:
+            await status_msg.edit_text(status_text)
+        except TelegramBadRequest:
+            pass
 
     job_id = await storage.create_job(
         chat_id=message.chat.id,
@@ -274,13 +406,22 @@ async def handle_media(
         message_id=message.message_id,
         thread_id=message.message_thread_id,
         file_id=media["file_id"],
+        file_unique_id=media.get("file_unique_id"),
         file_name=media["file_name"],
         duration_sec=media.get("duration"),
+        file_size=media.get("file_size"),
         status="queued",
         status_message_id=status_msg.message_id,
         progress_message_id=status_msg.message_id,
     )
 
+    eta_model.enqueue(
+        job_id,
+        media.get("duration"),
+        chat_id=message.chat.id,
+        status_message_id=status_msg.message_id,
+        text=status_text,
+    )
     await queue.put(
         {
             "id": job_id,
@@ -288,7 +429,10 @@ async def handle_media(
             "thread_id": message.message_thread_id,
             "message_id": message.message_id,
             "file_id": media["file_id"],
+            "file_unique_id": media.get("file_unique_id"),
             "file_name": media["file_name"],
+            "file_size": media.get("file_size"),
+            "duration_sec": media.get("duration"),
             "status_message_id": status_msg.message_id,
         }
     )
@@ -45,6 +45,7 @@ def build_command_scopes(*, root_admin_ids: set[int]) -> dict[str, tuple[object,
             ("deny", "Block user"),
             ("stats", "Show stats"),
             ("system", "System info"),
+            ("profile", "Profile a queued job"),
         ]
     )
     scopes: dict[str, tuple[object, list[BotCommand]]] = {
@@ -6,6 +6,9 @@ import os
 import time
 from typing import Any
 
+from .pipeline import pipeline_empty
+from .scheduler import any_worker_busy
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +21,7 @@ async def idle_shutdown_loop(queue, state: dict[str, Any], idle_limit_sec: int)
         await asyncio.sleep(30)
         last_activity = state.get("last_activity", time.time())
         idle_for = time.time() - last_activity
-        worker_busy = bool(state.get("worker_busy", False))
+        worker_busy = any_worker_busy(state) or not pipeline_empty(state)
         if queue.empty() and not worker_busy and should_shutdown(idle_for, idle_limit_sec):
             logger.info(
                 "Idle shutdown triggered (idle_for=%.1fs idle_limit=%ss)",
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from ..storage.db import Storage
+from ..transcription.segment_store import SEGMENTS_SUFFIX
+from .profiler import PROFILE_SUFFIX
+from .system_info import get_disk_usage
+
+logger = logging.getLogger(__name__)
+
+_JOB_FILE = re.compile(r"^(\d+)(\..+)$")
+# Legacy jobs wrote txt/md/json next to the input; newer ones keep a single segment store.
+OUTPUT_SUFFIXES = {SEGMENTS_SUFFIX, PROFILE_SUFFIX, ".txt", ".md", ".json"}
+FINISHED_STATUSES = {"done", "failed"}
+
+
+def scan_media_dir(media_dir: Path) -> list[dict[str, Any]]:
+    files = []
+    if not media_dir.is_dir():
+        return files
+    for path in media_dir.iterdir():
+        match = _JOB_FILE.match(path.name)
+        if not match:
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if not path.is_file():
+            continue
+        files.append(
+            {
+                "path": path,
+                "job_id": int(match.group(1)),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "is_output": match.group(2) in OUTPUT_SUFFIXES,
+            }
+        )
+    return files
+
+
+class MediaJanitor:
+    def __init__(
+        self,
+        storage: Storage,
+        media_dir: str,
+        *,
+        retention_sec: float,
+        max_bytes: int,
+        min_free_pct: float,
+        grace_sec: float = 600,
+        disk_usage: Callable[[str], dict[str, Any]] = get_disk_usage,
+    ) -> None:
+        self.storage = storage
+        self.media_dir = Path(media_dir)
+        self.retention_sec = retention_sec
+        self.max_bytes = max_bytes
+        self.min_free_pct = min_free_pct
+        self.grace_sec = grace_sec
+        self._disk_usage = disk_usage
+        self.runs = 0
+        self.removed_files = 0
+        self.freed_bytes = 0
+        self.free_pct = 100.0
+
+    def _output_limits(self, output_bytes: int) -> tuple[float, int]:
+        usage = self._disk_usage(str(self.media_dir))
+        self.free_pct = float(usage["free_pct"])
+        retention_sec, max_bytes = self.retention_sec, self.max_bytes
+        if self.min_free_pct <= 0 or self.free_pct >= self.min_free_pct:
+            return retention_sec, max_bytes
+        # Below the free-space floor: shorten retention in proportion and free enough output bytes to reach it.
+        retention_sec *= max(0.1, self.free_pct / self.min_free_pct)
+        deficit = int(usage["total_bytes"] * self.min_free_pct / 100) - int(usage["free_bytes"])
+        pressure_bytes = max(0, output_bytes - deficit)
+        return retention_sec, min(max_bytes, pressure_bytes) if max_bytes > 0 else pressure_bytes
+
+    async def run_once(self) -> int:
+        now = time.time()
+        files = await asyncio.to_thread(scan_media_dir, self.media_dir)
+        statuses = await self.storage.get_job_statuses(sorted({f["job_id"] for f in files}))
+        settled = [f for f in files if now - f["mtime"] >= self.grace_sec]
+
+        # Inputs, WAV/PCM and partial files of failed, finished or deleted jobs will never be read again.
+        doomed = [
+            f for f in settled if not f["is_output"] and statuses.get(f["job_id"], "done") in FINISHED_STATUSES
+        ]
+
+        outputs = sorted((f for f in files if f["is_output"]), key=lambda f: f["mtime"])
+        total = sum(f["size"] for f in outputs)
+        retention_sec, max_bytes = self._output_limits(total)
+        for f in outputs:
+            if now - f["mtime"] < self.grace_sec:
+                continue
+            expired = retention_sec > 0 and now - f["mtime"] > retention_sec
+            if not expired and (max_bytes <= 0 or total <= max_bytes):
+                continue
+            doomed.append(f)
+            total -= f["size"]
+
+        removed = await asyncio.to_thread(self._unlink, doomed)
+        gone = [str(f["path"]) for f in removed if f["is_output"]]
+        for offset in range(0, len(gone), 500):
+            await self.storage.drop_output_paths(gone[offset : offset + 500])
+        self.runs += 1
+        self.removed_files += len(removed)
+        freed = sum(f["size"] for f in removed)
+        self.freed_bytes += freed
+        if removed:
+            logger.info(
+                "Janitor removed %s file(s) (%s outputs), freed %.1f MB, disk free %.1f%%",
+                len(removed),
+                len(gone),
+                freed / (1024 * 1024),
+                self.free_pct,
+            )
+        return len(removed)
+
+    @staticmethod
+    def _unlink(files: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        removed = []
+        for f in files:
+            try:
+                f["path"].unlink(missing_ok=True)
+            except OSError as exc:
+                logger.warning("Janitor failed to remove %s: %s", f["path"], exc)
+                continue
+            removed.append(f)
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "removed_files": self.removed_files,
+            "freed_mb": round(self.freed_bytes / (1024 * 1024), 1),
+            "free_pct": self.free_pct,
+        }
+
+
+async def janitor_loop(janitor: MediaJanitor, interval_sec: float) -> None:
+    while True:
+        try:
+            await janitor.run_once()
+        except Exception as exc:
+            logger.warning("Janitor pass failed: %s", exc)
+        await asyncio.sleep(interval_sec)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import math
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+STAGES = ("queue_wait", "download", "convert", "model", "transcribe", "render", "deliver")
+_SUMMARY_FIELDS = (*STAGES, "total", "rtf")
+
+
+@contextmanager
+def stage_span(timings: dict[str, float], stage: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started_at
+
+
+def sqlite_timestamp(value: Any) -> float | None:
+    # CURRENT_TIMESTAMP defaults are UTC text without a zone.
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def metrics_row(job: dict[str, Any], finished_at: float) -> dict[str, Any]:
+    timings = job.get("timings") or {}
+    row: dict[str, Any] = {f"{stage}_sec": round(timings[stage], 3) for stage in STAGES if stage in timings}
+    audio_sec = job.get("audio_sec")
+    transcribed_sec = job.get("transcribed_audio_sec", audio_sec)
+    rtf = None
+    if "transcribe" in timings and transcribed_sec:
+        rtf = round(timings["transcribe"] / transcribed_sec, 4)
+    return {
+        **row,
+        "backend": job.get("backend"),
+        "audio_sec": audio_sec,
+        "rtf": rtf,
+        "total_sec": round(finished_at - job["started_at"] + timings.get("queue_wait", 0.0), 3),
+        "cached": int(bool(job.get("cached_outputs"))),
+        "batched": int(bool(job.get("batched"))),
+        "created_at": finished_at,
+    }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    # Nearest-rank percentile: no interpolation, always an observed value.
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize_job_metrics(rows: list[dict[str, Any]]) -> dict[str, dict[str, dict[str, float]]]:
+    values: dict[str, dict[str, list[float]]] = {}
+    for row in rows:
+        per_backend = values.setdefault(row.get("backend") or "unknown", {})
+        for field in _SUMMARY_FIELDS:
+            value = row.get(field if field == "rtf" else f"{field}_sec")
+            if value is not None:
+                per_backend.setdefault(field, []).append(float(value))
+    return {
+        backend: {
+            field: {"p50": percentile(samples, 50), "p95": percentile(samples, 95), "count": len(samples)}
+            for field, samples in fields.items()
+        }
+        for backend, fields in values.items()
+    }
+
+
+def format_job_metrics(summary: dict[str, dict[str, dict[str, float]]]) -> str:
+    if not summary:
+        return "Stage timings: no finished jobs yet"
+    lines = ["Stage timings p50/p95:"]
+    for backend, fields in sorted(summary.items()):
+        parts = [
+            f"{field} {fields[field]['p50']:.2f}/{fields[field]['p95']:.2f}{'' if field == 'rtf' else 's'}"
+            for field in _SUMMARY_FIELDS
+            if field in fields
+        ]
+        jobs = fields["total"]["count"] if "total" in fields else 0
+        lines.append(f"{backend} ({jobs} jobs): " + ", ".join(parts))
+    return "\n".join(lines)
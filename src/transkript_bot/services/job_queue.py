@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from typing import Any
+
+from aiogram import Bot
+
+from ..storage.db import INTERRUPTED_ERROR, Storage
+from .job_metrics import sqlite_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    name = "download"
+    maxsize = 0
+
+    def __init__(
+        self,
+        storage: Storage,
+        *,
+        lease_sec: float = 300.0,
+        max_attempts: int = 3,
+        poll_sec: float = 30.0,
+        history: int = 100,
+        bot: Bot | None = None,
+    ) -> None:
+        self.storage = storage
+        # Set once the bot exists; used to close out status messages of jobs given up on.
+        self.bot = bot
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self.poll_sec = poll_sec
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._depth = 0
+        self._held: set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._waits: deque[float] = deque(maxlen=history)
+
+    async def recover(self) -> int:
+        requeued = await self._requeue_expired()
+        self._depth = await self.storage.count_jobs("queued")
+        if self._depth:
+            self._wakeup.set()
+        logger.info("Job queue recovered: queued=%s requeued=%s", self._depth, requeued)
+        return requeued
+
+    async def _requeue_expired(self) -> int:
+        requeued, failed = await self.storage.requeue_expired_jobs(
+            now=time.time(), max_attempts=self.max_attempts
+        )
+        if failed:
+            logger.warning("Marked %s job(s) failed after %s interrupted attempts", len(failed), self.max_attempts)
+            await self._report_failed(failed)
+        if requeued:
+            logger.info("Requeued %s job(s) with expired leases", requeued)
+            self._depth += requeued
+        return requeued
+
+    async def _report_failed(self, jobs: list[dict[str, Any]]) -> None:
+        if self.bot is None:
+            return
+        for job in jobs:
+            if not job.get("status_message_id"):
+                continue
+            try:
+                await self.bot.edit_message_text(
+                    chat_id=job["chat_id"], message_id=job["status_message_id"], text=f"Failed: {INTERRUPTED_ERROR}"
+                )
+            except Exception as exc:
+                logger.debug("Failed to edit status of job %s: %s", job["id"], exc)
+
+    async def put(self, job: dict[str, Any]) -> None:
+        # The row is already persisted as 'queued' by Storage.create_job; only wake the workers.
+        self._depth += 1
+        self._wakeup.set()
+
+    async def get(self) -> dict[str, Any]:
+        while True:
+            # Cleared before claiming so a put() that lands during the claim still wakes us.
+            self._wakeup.clear()
+            job = await self.storage.claim_job(
+                owner=self.owner, lease_expires_at=time.time() + self.lease_sec
+            )
+            if job is not None:
+                self._depth = max(0, self._depth - 1)
+                self._held.add(int(job["id"]))
+                queued_at = sqlite_timestamp(job.get("queued_at"))
+                if queued_at is not None:
+                    self._waits.append(max(0.0, time.time() - queued_at))
+                return job
+            if not self._wakeup.is_set():
+                self._depth = 0
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_sec)
+            except asyncio.TimeoutError:
+                await self._requeue_expired()
+
+    def release(self, job_id: int) -> None:
+        self._held.discard(int(job_id))
+
+    def task_done(self) -> None:
+        pass
+
+    def qsize(self) -> int:
+        return self._depth
+
+    def empty(self) -> bool:
+        return self._depth == 0
+
+    def snapshot(self) -> dict[str, Any]:
+        waits = list(self._waits)
+        return {
+            "name": self.name,
+            "depth": self._depth,
+            "maxsize": self.maxsize,
+            "wait_avg_sec": round(sum(waits) / len(waits), 2) if waits else 0.0,
+            "wait_max_sec": round(max(waits), 2) if waits else 0.0,
+        }
+
+    async def heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_sec / 3)
+            try:
+                await self.storage.renew_job_leases(
+                    sorted(self._held),
+                    owner=self.owner,
+                    lease_expires_at=time.time() + self.lease_sec,
+                )
+            except Exception as exc:
+                logger.warning("Failed to renew job leases: %s", exc)
@@ -89,6 +89,8 @@ def build_result_files_keyboard(*, job_id: int) -> InlineKeyboardMarkup:
     builder.button(text="TXT", callback_data=f"job:file:{job_id}:txt")
     builder.button(text="MD", callback_data=f"job:file:{job_id}:md")
     builder.button(text="JSON", callback_data=f"job:file:{job_id}:json")
+    builder.button(text="SRT", callback_data=f"job:file:{job_id}:srt")
+    builder.button(text="VTT", callback_data=f"job:file:{job_id}:vtt")
     builder.button(text="All", callback_data=f"job:file:{job_id}:all")
-    builder.adjust(2, 2)
+    builder.adjust(3, 3)
     return builder.as_markup()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+
+
+class MemoryBudget:
+    def __init__(self, limit_bytes: int) -> None:
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+        self.peak_bytes = 0
+        self._cond = asyncio.Condition()
+
+    def fits(self, size: int) -> bool:
+        return 0 <= size <= self.limit_bytes
+
+    async def acquire(self, size: int) -> bool:
+        if not self.fits(size):
+            return False
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.used_bytes + size <= self.limit_bytes)
+            self.used_bytes += size
+            self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+        return True
+
+    async def release(self, size: int) -> None:
+        if size <= 0:
+            return
+        async with self._cond:
+            self.used_bytes = max(0, self.used_bytes - size)
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "used_mb": self.used_bytes // (1024 * 1024),
+            "peak_mb": self.peak_bytes // (1024 * 1024),
+            "limit_mb": self.limit_bytes // (1024 * 1024),
+        }
@@ -34,6 +34,7 @@ def build_help_text(*, role: MenuRole, in_private: bool) -> str:
                 "/deny <id> - block user",
                 "/stats - show stats",
                 "/system - system info",
+                "/profile <job_id> - profile a queued job",
             ]
         )
     return "\n".join(lines)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from typing import Any, Callable
+
+import psutil
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods.base import Response, TelegramMethod, TelegramType
+from aiohttp import web
+
+from .scheduler import busy_worker_count
+
+logger = logging.getLogger(__name__)
+
+FAST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = [*labels, extra] if extra else list(labels)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = FAST_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # Per label set: per-bucket (non-cumulative) counts, then sum and count.
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+        series[1][1] += 1
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, (total, count)) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {int(count)}")
+        return lines
+
+
+class Collected:
+    # Values owned by other components (queues, caches), read at scrape time instead of mirrored.
+    def __init__(
+        self, name: str, help_text: str, collect: Callable[[], dict[Labels, float] | float], kind: str = "gauge"
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> list[str]:
+        values = self._collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in values.items()]
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "transkript_") -> None:
+        self.prefix = prefix
+        self._metrics: dict[str, Counter | Histogram | Collected] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(self.prefix + name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...] = FAST_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, help_text, buckets))
+
+    def collect(
+        self, name: str, help_text: str, collect: Callable[[], dict[Labels, float] | float], kind: str = "gauge"
+    ) -> Collected:
+        return self._register(Collected(self.prefix + name, help_text, collect, kind))
+
+    def _register(self, metric: Any) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception as exc:
+                logger.debug("Metric %s failed to collect: %s", metric.name, exc)
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+class TelegramMetrics(BaseRequestMiddleware):
+    # Registered after the rate governor, so it times each HTTP round-trip rather than time spent throttled.
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.latency = registry.histogram("telegram_request_seconds", "Telegram Bot API request latency")
+        self.errors = registry.counter("telegram_errors_total", "Failed Telegram Bot API requests")
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = type(method).__name__
+        started_at = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as exc:
+            self.errors.inc(method=name, error=type(exc).__name__)
+            raise
+        finally:
+            self.latency.observe(time.perf_counter() - started_at, method=name)
+
+
+def register_app_metrics(registry: MetricsRegistry, state: dict[str, Any]) -> None:
+    process = psutil.Process()
+
+    def _stats(key: str) -> dict[str, Any]:
+        component = state.get(key)
+        return component.stats() if component is not None else {}
+
+    registry.collect(
+        "queue_depth",
+        "Items waiting in each pipeline stage",
+        lambda: {_labels({"stage": s.name}): s.snapshot()["depth"] for s in state.get("pipeline", {}).values()},
+    )
+    registry.collect("workers_busy", "Pipeline workers currently processing a job", lambda: busy_worker_count(state))
+    registry.collect("workers_total", "Pipeline workers started", lambda: len(state.get("workers", {})))
+    registry.collect("process_rss_bytes", "Resident memory of the bot process", lambda: process.memory_info().rss)
+    for key in ("model_cache", "transcript_cache"):
+        for field in ("hits", "misses"):
+            registry.collect(
+                f"{key}_{field}_total",
+                f"{key.replace('_', ' ').capitalize()} {field}",
+                lambda key=key, field=field: _stats(key).get(field, 0),
+                kind="counter",
+            )
+    registry.collect(
+        "telegram_throttled_total",
+        "Telegram requests delayed by the rate governor",
+        lambda: _stats("rate_governor").get("throttled", 0),
+        kind="counter",
+    )
+    registry.collect(
+        "telegram_flood_waits_total",
+        "Telegram 429 flood waits",
+        lambda: _stats("rate_governor").get("retry_after", 0),
+        kind="counter",
+    )
+
+
+async def start_metrics_server(registry: MetricsRegistry, host: str, port: int) -> web.AppRunner:
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(
+            body=registry.render().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Metrics endpoint listening on http://%s:%s/metrics", host, port)
+    return runner
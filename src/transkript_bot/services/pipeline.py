@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable
+
+
+class StageQueue:
+    def __init__(self, name: str, maxsize: int = 0, history: int = 100) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self._queue: asyncio.Queue[tuple[float, Any]] = asyncio.Queue(maxsize)
+        self._waits: deque[float] = deque(maxlen=history)
+
+    async def put(self, item: Any) -> None:
+        await self._queue.put((time.monotonic(), item))
+
+    async def get(self) -> Any:
+        queued_at, item = await self._queue.get()
+        self._waits.append(time.monotonic() - queued_at)
+        return item
+
+    def get_nowait(self) -> Any:
+        queued_at, item = self._queue.get_nowait()
+        self._waits.append(time.monotonic() - queued_at)
+        return item
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def empty(self) -> bool:
+        return self._queue.empty()
+
+    def snapshot(self) -> dict[str, Any]:
+        waits = list(self._waits)
+        return {
+            "name": self.name,
+            "depth": self.qsize(),
+            "maxsize": self.maxsize,
+            "wait_avg_sec": round(sum(waits) / len(waits), 2) if waits else 0.0,
+            "wait_max_sec": round(max(waits), 2) if waits else 0.0,
+        }
+
+
+async def gather_batch(
+    queue: StageQueue,
+    first: Any,
+    *,
+    max_size: int,
+    wait_sec: float,
+    accept: Callable[[Any], bool],
+) -> tuple[list[Any], Any | None]:
+    # Returns the batch and, if a non-batchable item arrived while waiting, that item to run on its own next.
+    batch = [first]
+    if not accept(first):
+        return batch, None
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_sec
+    while len(batch) < max_size:
+        if not queue.empty():
+            item = queue.get_nowait()
+        else:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=remaining)
+            # cancel() is a no-op if the get already completed; then the item is ours and must not be dropped.
+            if not done and getter.cancel():
+                break
+            item = await getter
+        if not accept(item):
+            return batch, item
+        batch.append(item)
+    return batch, None
+
+
+def pipeline_empty(state: dict[str, Any]) -> bool:
+    return all(stage.empty() for stage in state.get("pipeline", {}).values())
+
+
+def format_pipeline_stats(state: dict[str, Any]) -> str:
+    lines = ["Pipeline:"]
+    for stage in state.get("pipeline", {}).values():
+        snap = stage.snapshot()
+        depth = f"{snap['depth']}/{snap['maxsize']}" if snap["maxsize"] else str(snap["depth"])
+        lines.append(
+            f"{snap['name']}: depth {depth}, wait avg {snap['wait_avg_sec']}s max {snap['wait_max_sec']}s"
+        )
+    return "\n".join(lines)
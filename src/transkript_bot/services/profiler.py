@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+PROFILE_SUFFIX = ".folded"
+# Innermost Python frames of threads that are parked, not working: skipping them keeps the graph about the job.
+IDLE_LEAVES = {
+    "threading:Condition.wait",
+    "threading:Event.wait",
+    "queue:Queue.get",
+    "selectors:EpollSelector.select",
+    "selectors:KqueueSelector.select",
+    "selectors:SelectSelector.select",
+    "thread:_worker",
+}
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    # ';' separates frames and ' ' separates the count in the collapsed format.
+    return f"{module}:{code.co_qualname}".replace(";", ":").replace(" ", "_")
+
+
+class SamplingProfiler:
+    # Samples every thread's Python stack, so work offloaded with asyncio.to_thread is seen too.
+    # Concurrent jobs share the process and show up in the same samples.
+    def __init__(self, interval_sec: float = 0.005) -> None:
+        self.interval_sec = interval_sec
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.elapsed_sec = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.elapsed_sec = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_sec):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if _frame_label(frame) in IDLE_LEAVES:
+                    continue
+                labels = []
+                current: FrameType | None = frame
+                while current is not None:
+                    labels.append(_frame_label(current))
+                    current = current.f_back
+                labels.append(names.get(thread_id, str(thread_id)).replace(";", ":").replace(" ", "_"))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        # Brendan Gregg's folded format: flamegraph.pl, speedscope and inferno read it directly.
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, path: Path) -> Path:
+        path.write_text(self.collapsed(), encoding="utf-8")
+        return path
@@ -21,6 +21,7 @@ def format_progress(
     position: int | None = None,
     eta: int | None = None,
     transcribe_percent: int | None = None,
+    tail: str | None = None,
 ) -> str:
     overall = _overall_percent(stage, transcribe_percent)
     lines = [f"Progress: {overall}%"]
@@ -42,6 +43,9 @@ def format_progress(
         lines.append(f"Stage: Transcribing... {max(0, min(100, transcribe_percent))}%")
     elif stage in labels:
         lines.append(f"Stage: {labels[stage]}")
+    if tail:
+        lines.append("")
+        lines.append(tail)
     if stage == "done":
         lines.append("")
         lines.append("Done. Choose output format:")
@@ -1,3 +1,9 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+
 def estimate_eta(durations: list[int], position: int) -> int:
     if position <= 1:
         return 0
@@ -5,3 +11,120 @@ def estimate_eta(durations: list[int], position: int) -> int:
         return -1
     avg = sum(durations) // len(durations)
     return avg * (position - 1)
+
+
+def format_queue_status(position: int, eta: int) -> str:
+    eta_text = "unknown" if eta < 0 else f"{eta} sec"
+    return f"Queued. Position: {position}. ETA: {eta_text}."
+
+
+class EtaModel:
+    def __init__(
+        self,
+        backend: str,
+        model: str,
+        *,
+        workers: int = 1,
+        default_rtf: float = 1.0,
+        overhead_sec: float = 5.0,
+        default_duration_sec: float = 300.0,
+        alpha: float = 0.3,
+    ) -> None:
+        self.backend = backend
+        self.model = model
+        self.workers = max(1, workers)
+        self.default_rtf = default_rtf
+        self.overhead_sec = overhead_sec
+        self.default_duration_sec = default_duration_sec
+        self.alpha = alpha
+        self.samples = 0
+        self._rtf: dict[tuple[str, str], float] = {}
+        self.queued: dict[int, dict[str, Any]] = {}
+        self.running: dict[int, dict[str, Any]] = {}
+
+    def observe(
+        self,
+        backend: str,
+        model: str,
+        audio_sec: float | None,
+        elapsed_sec: float,
+        overhead_sec: float | None = None,
+    ) -> None:
+        if not audio_sec or audio_sec <= 0 or elapsed_sec <= 0:
+            return
+        overhead_sec = self.overhead_sec if overhead_sec is None else overhead_sec
+        sample = max(elapsed_sec - overhead_sec, 0.0) / audio_sec
+        key = (backend, model)
+        previous = self._rtf.get(key)
+        self._rtf[key] = sample if previous is None else previous + self.alpha * (sample - previous)
+        self.samples += 1
+
+    def seed(self, metrics: list[dict[str, Any]]) -> None:
+        # job_metrics rows, newest first. Oldest go in first so the moving average ends up weighted towards
+        # recent jobs; transcribe_sec carries no overhead, the same sample finish() takes from a live job.
+        for row in reversed(metrics):
+            if row.get("cached") or row.get("transcribe_sec") is None:
+                continue
+            backend = row.get("backend") or self.backend
+            self.observe(backend, self.model, row.get("audio_sec"), row["transcribe_sec"], overhead_sec=0.0)
+
+    def rtf(self, backend: str | None = None, model: str | None = None) -> float:
+        return self._rtf.get((backend or self.backend, model or self.model), self.default_rtf)
+
+    def job_seconds(self, duration_sec: float | None) -> float:
+        return self.overhead_sec + self.rtf() * (duration_sec or self.default_duration_sec)
+
+    def _backlog_seconds(self, now: float) -> float:
+        return sum(
+            max(entry["expected_sec"] - (now - entry["started_at"]), 0.0) for entry in self.running.values()
+        )
+
+    def estimate(self, duration_sec: float | None, *, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        ahead = self._backlog_seconds(now) + sum(self.job_seconds(e["duration_sec"]) for e in self.queued.values())
+        return int(ahead / self.workers + self.job_seconds(duration_sec))
+
+    def enqueue(self, job_id: int, duration_sec: float | None, **extra: Any) -> None:
+        self.queued[job_id] = {"duration_sec": duration_sec, **extra}
+
+    def start(self, job_id: int, duration_sec: float | None = None, *, now: float | None = None) -> None:
+        entry = self.queued.pop(job_id, {"duration_sec": duration_sec})
+        duration = entry.get("duration_sec") or duration_sec
+        self.running[job_id] = {
+            "started_at": time.time() if now is None else now,
+            "expected_sec": self.job_seconds(duration),
+        }
+
+    def finish(
+        self,
+        job_id: int,
+        audio_sec: float | None = None,
+        elapsed_sec: float | None = None,
+        *,
+        transcribe_sec: float | None = None,
+    ) -> None:
+        self.queued.pop(job_id, None)
+        self.running.pop(job_id, None)
+        if transcribe_sec is not None:
+            # Pure transcription time: there is no fixed per-job overhead in it to take out.
+            self.observe(self.backend, self.model, audio_sec, transcribe_sec, overhead_sec=0.0)
+        elif elapsed_sec is not None:
+            self.observe(self.backend, self.model, audio_sec, elapsed_sec)
+
+    def queued_etas(self, *, now: float | None = None) -> list[tuple[int, dict[str, Any], int, int]]:
+        now = time.time() if now is None else now
+        ahead = self._backlog_seconds(now)
+        result = []
+        for position, (job_id, entry) in enumerate(self.queued.items(), start=1):
+            own = self.job_seconds(entry["duration_sec"])
+            result.append((job_id, entry, position, int(ahead / self.workers + own)))
+            ahead += own
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rtf": round(self.rtf(), 3),
+            "samples": self.samples,
+            "queued": len(self.queued),
+            "running": len(self.running),
+        }
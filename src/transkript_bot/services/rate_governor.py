@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, SendDocument, SendMediaGroup, SendMessage
+from aiogram.methods.base import Response, TelegramMethod, TelegramType
+
+logger = logging.getLogger(__name__)
+
+GOVERNED_METHODS = (EditMessageText, SendMessage, SendDocument, SendMediaGroup)
+
+
+def _settle(future: asyncio.Future, exc: BaseException) -> None:
+    if future.done():
+        return
+    if isinstance(exc, asyncio.CancelledError):
+        # Cancelling the shared future would raise in every coalesced caller; report the edit as dropped instead.
+        future.set_result(None)
+        return
+    future.set_exception(exc)
+    # Mark as retrieved: the owner re-raises it, coalesced callers may already be gone.
+    future.exception()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        # Tokens may go negative: each caller books its slot and sleeps until it comes up, in arrival order.
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= tokens
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class RateGovernor(BaseRequestMiddleware):
+    def __init__(
+        self,
+        *,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate_per_min: float = 20.0,
+        max_retries: int = 3,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate_per_min / 60.0
+        self.max_retries = max_retries
+        self._chats: dict[int | str, TokenBucket] = {}
+        self._pending_edits: dict[tuple[Any, Any], dict[str, Any]] = {}
+        self._handoffs: set[asyncio.Task] = set()
+        self.throttled = 0
+        self.retry_after = 0
+        self.coalesced = 0
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) > 1024:
+                self._chats = {key: value for key, value in self._chats.items() if not value.idle()}
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = TokenBucket(self.group_rate if is_group else self.chat_rate, 3.0 if is_group else 1.0)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def _wait_turn(self, chat_id: int | str | None, cost: float = 1.0) -> None:
+        delay = self._chat_bucket(chat_id).reserve(cost) if chat_id is not None else 0.0
+        if delay > 0:
+            self.throttled += 1
+            await asyncio.sleep(delay)
+        delay = self.global_bucket.reserve(cost)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        chat_id: int | str | None,
+        cost: float = 1.0,
+    ) -> Response[TelegramType]:
+        attempt = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                attempt += 1
+                self.retry_after += 1
+                logger.warning(
+                    "Telegram flood wait %ss on %s (chat=%s, attempt %s)",
+                    exc.retry_after,
+                    type(method).__name__,
+                    chat_id,
+                    attempt,
+                )
+                bucket = self._chat_bucket(chat_id) if chat_id is not None else self.global_bucket
+                bucket.pause(exc.retry_after)
+                if attempt > self.max_retries:
+                    raise
+                await self._wait_turn(chat_id, cost)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not isinstance(method, GOVERNED_METHODS):
+            return await make_request(bot, method)
+        chat_id = getattr(method, "chat_id", None)
+        if not isinstance(method, EditMessageText) or method.message_id is None:
+            # Telegram counts every message of an album against the limits.
+            cost = len(method.media) if isinstance(method, SendMediaGroup) else 1
+            await self._wait_turn(chat_id, cost)
+            return await self._send(make_request, bot, method, chat_id, cost)
+
+        # Edits of the same message still waiting for a slot collapse into one request carrying the newest text.
+        key = (chat_id, method.message_id)
+        pending = self._pending_edits.get(key)
+        if pending is not None:
+            pending["method"] = method
+            pending["waiters"] += 1
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending["future"])
+            finally:
+                pending["waiters"] -= 1
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        pending = {"method": method, "future": future, "waiters": 0}
+        self._pending_edits[key] = pending
+        try:
+            await self._wait_turn(chat_id)
+            latest = self._pending_edits.pop(key)["method"]
+            response = await self._send(make_request, bot, latest, chat_id)
+        except asyncio.CancelledError:
+            if pending["waiters"]:
+                # The newest text belongs to callers still waiting; finish the edit for them.
+                task = asyncio.create_task(self._finish_edit(make_request, bot, key, pending, chat_id))
+                self._handoffs.add(task)
+                task.add_done_callback(self._handoffs.discard)
+            else:
+                self._drop_pending(key, pending, asyncio.CancelledError())
+            raise
+        except BaseException as exc:
+            self._drop_pending(key, pending, exc)
+            raise
+        future.set_result(response)
+        return response
+
+    def _drop_pending(self, key: tuple[Any, Any], pending: dict[str, Any], exc: BaseException) -> None:
+        if self._pending_edits.get(key) is pending:
+            del self._pending_edits[key]
+        _settle(pending["future"], exc)
+
+    async def _finish_edit(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        key: tuple[Any, Any],
+        pending: dict[str, Any],
+        chat_id: int | str | None,
+    ) -> None:
+        try:
+            if self._pending_edits.get(key) is pending:
+                await self._wait_turn(chat_id)
+                del self._pending_edits[key]
+            if not pending["waiters"]:
+                _settle(pending["future"], asyncio.CancelledError())
+                return
+            response = await self._send(make_request, bot, pending["method"], chat_id)
+        except BaseException as exc:
+            self._drop_pending(key, pending, exc)
+            if isinstance(exc, Exception):
+                return
+            raise
+        pending["future"].set_result(response)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "throttled": self.throttled,
+            "retry_after": self.retry_after,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Any
+
+from ..config import Settings
+
+
+def uses_gpu(settings: Settings, backend: str) -> bool:
+    return backend == "whisperx" or settings.whisper_device.startswith("cuda")
+
+
+def worker_count(settings: Settings, backend: str) -> int:
+    count = settings.workers_gpu if uses_gpu(settings, backend) else settings.workers_cpu
+    return max(1, count)
+
+
+def threads_per_worker(cpu_count: int, workers: int, override: int = 0) -> int:
+    if override > 0:
+        return override
+    return max(1, cpu_count // max(1, workers))
+
+
+def any_worker_busy(state: dict[str, Any]) -> bool:
+    return any(job_id is not None for job_id in state.get("workers", {}).values())
+
+
+def busy_worker_count(state: dict[str, Any]) -> int:
+    return sum(1 for job_id in state.get("workers", {}).values() if job_id is not None)
+
+
+def workers_by_stage(state: dict[str, Any]) -> dict[str, dict[str, int]]:
+    # Pipeline workers are named "<stage>-<index>"; each stage has its own pool.
+    stages: dict[str, dict[str, int]] = {}
+    for name, job_id in state.get("workers", {}).items():
+        stage = str(name).rsplit("-", 1)[0]
+        counts = stages.setdefault(stage, {"busy": 0, "total": 0})
+        counts["total"] += 1
+        counts["busy"] += job_id is not None
+    return stages
+
+
+def format_workers(state: dict[str, Any]) -> str:
+    stages = workers_by_stage(state)
+    if not stages:
+        return "Workers: none"
+    return "Workers busy: " + ", ".join(f"{stage} {c['busy']}/{c['total']}" for stage, c in stages.items())
@@ -73,6 +73,18 @@ def get_system_info() -> dict[str, Any]:
     }
 
 
+def get_disk_usage(path: str) -> dict[str, Any]:
+    try:
+        disk = psutil.disk_usage(path)
+    except Exception:
+        return {"total_bytes": 0, "free_bytes": 0, "free_pct": 100.0}
+    return {
+        "total_bytes": disk.total,
+        "free_bytes": disk.free,
+        "free_pct": _safe_float(100.0 * disk.free / disk.total) if disk.total else 100.0,
+    }
+
+
 def format_startup_info(info: dict[str, Any]) -> str:
     gpu = info.get("gpu")
     gpu_str = "none"
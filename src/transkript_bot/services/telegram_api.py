@@ -1,12 +1,94 @@
 from __future__ import annotations
 
-from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+import asyncio
+import io
+import logging
+import os
+from pathlib import Path, PurePosixPath
+
+from aiogram import Bot
+from aiogram.client.telegram import PRODUCTION, SimpleFilesPathWrapper, TelegramAPIServer
 
 from ..config import Settings
 
+logger = logging.getLogger(__name__)
+
+_HTTP_CHUNK_SIZE = 1 << 20
+# A whole-file limit: the local server hands out files up to 2GB.
+_HTTP_TIMEOUT_SEC = 3600
+
 
 def build_api_server(settings: Settings) -> TelegramAPIServer:
     base_url = settings.bot_api_base_url
     if not base_url:
         return PRODUCTION
+    if settings.bot_api_local_dir:
+        # The server's working directory is mounted somewhere else in this container.
+        wrapper = SimpleFilesPathWrapper(Path(settings.bot_api_server_dir), Path(settings.bot_api_local_dir))
+        return TelegramAPIServer.from_base(base_url, is_local=True, wrap_local_file=wrapper)
     return TelegramAPIServer.from_base(base_url, is_local=True)
+
+
+def readable_local_file(api: TelegramAPIServer, file_path: str) -> Path | None:
+    path = Path(api.wrap_local_file.to_local(file_path))
+    try:
+        if path.is_file() and os.access(path, os.R_OK):
+            return path
+    except OSError:
+        pass
+    return None
+
+
+async def locate_local_file(bot: Bot, file_id: str) -> tuple[Path | None, str | None]:
+    # Local Bot API server only: the file on the shared volume if it is readable here, and its server-side path.
+    api = bot.session.api
+    if not api.is_local:
+        return None, None
+    file = await bot.get_file(file_id)
+    return await asyncio.to_thread(readable_local_file, api, file.file_path), file.file_path
+
+
+def server_file_url(api: TelegramAPIServer, token: str, server_path: str, server_dir: str) -> str:
+    # getFile returns an absolute path in --local mode; a file server in front of the Bot API serves the
+    # server's working directory under /file/bot<token>/, so the URL takes the path relative to it.
+    path = PurePosixPath(server_path)
+    try:
+        relative = path.relative_to(server_dir)
+    except ValueError:
+        relative = PurePosixPath(*path.parts[1:]) if path.is_absolute() else path
+    return api.file_url(token, str(relative))
+
+
+async def fetch_file(
+    bot: Bot,
+    file_id: str,
+    destination: Path | None,
+    *,
+    server_path: str | None = None,
+    server_dir: str = "/var/lib/telegram-bot-api",
+) -> str | io.BytesIO:
+    # Returns the destination path, or an in-memory copy when there is no destination.
+    if server_path is None:
+        if destination is None:
+            return await bot.download(file_id)
+        await bot.download(file_id, destination=str(destination))
+        return str(destination)
+
+    # A local Bot API file whose volume is not mounted here: aiogram's local read would fail, so use HTTP.
+    logger.info("Local Bot API file %s is not accessible, downloading over HTTP", server_path)
+    stream = bot.session.stream_content(
+        url=server_file_url(bot.session.api, bot.token, server_path, server_dir),
+        timeout=_HTTP_TIMEOUT_SEC,
+        chunk_size=_HTTP_CHUNK_SIZE,
+        raise_for_status=True,
+    )
+    if destination is None:
+        buffer = io.BytesIO()
+        async for chunk in stream:
+            buffer.write(chunk)
+        buffer.seek(0)
+        return buffer
+    with destination.open("wb") as handle:
+        async for chunk in stream:
+            await asyncio.to_thread(handle.write, chunk)
+    return str(destination)
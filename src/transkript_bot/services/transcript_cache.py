@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+from ..storage.db import Storage
+
+logger = logging.getLogger(__name__)
+
+
+def hash_bytes(data: bytes | memoryview) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while chunk := handle.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_paths(raw: str | None) -> dict[str, str]:
+    try:
+        paths = json.loads(raw) if raw else {}
+    except json.JSONDecodeError:
+        return {}
+    return paths if isinstance(paths, dict) else {}
+
+
+class TranscriptCache:
+    def __init__(self, storage: Storage, *, max_bytes: int, max_age_sec: float) -> None:
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+        self.hits = 0
+        self.misses = 0
+        self.entries = 0
+        self.size_bytes = 0
+        self._evict_lock = asyncio.Lock()
+
+    async def lookup(
+        self,
+        *,
+        backend: str,
+        model: str,
+        language: str,
+        file_unique_id: str | None = None,
+        content_hash: str | None = None,
+    ) -> dict[str, str] | None:
+        entry = await self.storage.find_transcript_cache(
+            backend=backend,
+            model=model,
+            language=language,
+            file_unique_id=file_unique_id,
+            content_hash=content_hash,
+        )
+        paths = _parse_paths(entry.get("output_paths")) if entry else {}
+        if entry and (not paths or not all(Path(p).is_file() for p in paths.values())):
+            # Outputs were removed behind our back; drop the entry instead of serving a broken result.
+            await self.storage.delete_transcript_cache([int(entry["id"])])
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        await self.storage.touch_transcript_cache(int(entry["id"]), now=time.time())
+        return paths
+
+    async def store(
+        self,
+        *,
+        job_id: int,
+        backend: str,
+        model: str,
+        language: str,
+        output_paths: dict[str, str],
+        file_unique_id: str | None = None,
+        content_hash: str | None = None,
+    ) -> None:
+        if not file_unique_id and not content_hash:
+            return
+        size_bytes = sum(Path(p).stat().st_size for p in output_paths.values() if Path(p).is_file())
+        await self.storage.put_transcript_cache(
+            job_id=job_id,
+            backend=backend,
+            model=model,
+            language=language,
+            output_paths=json.dumps(output_paths),
+            size_bytes=size_bytes,
+            now=time.time(),
+            file_unique_id=file_unique_id,
+            content_hash=content_hash,
+        )
+        await self.evict()
+
+    async def evict(self) -> int:
+        async with self._evict_lock:
+            entries = await self.storage.list_transcript_cache_lru()
+            cutoff = time.time() - self.max_age_sec
+            total = sum(int(e["size_bytes"]) for e in entries)
+            evicted: list[dict[str, Any]] = []
+            for entry in entries:
+                if float(entry["created_at"]) >= cutoff and total <= self.max_bytes:
+                    continue
+                evicted.append(entry)
+                total -= int(entry["size_bytes"])
+            for entry in evicted:
+                for path in _parse_paths(entry.get("output_paths")).values():
+                    try:
+                        Path(path).unlink(missing_ok=True)
+                    except OSError as exc:
+                        logger.warning("Failed to remove cached output %s: %s", path, exc)
+            await self.storage.delete_transcript_cache([int(e["id"]) for e in evicted])
+            self.entries = len(entries) - len(evicted)
+            self.size_bytes = total
+            if evicted:
+                logger.info("Evicted %s transcript cache entr(ies)", len(evicted))
+            return len(evicted)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_pct": round(100.0 * self.hits / lookups, 1) if lookups else 0.0,
+            "entries": self.entries,
+            "size_mb": round(self.size_bytes / (1024 * 1024), 1),
+        }
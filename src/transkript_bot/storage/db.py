@@ -1,27 +1,134 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
 import aiosqlite
 
+from .ttl_cache import TtlCache
+
+
+# Columns added after the first release; CREATE TABLE IF NOT EXISTS does not add them to old databases.
+_COLUMN_MIGRATIONS: dict[str, dict[str, str]] = {
+    "jobs": {
+        "priority": "INTEGER NOT NULL DEFAULT 0",
+        "file_size": "INTEGER",
+        "attempts": "INTEGER NOT NULL DEFAULT 0",
+        "lease_owner": "TEXT",
+        "lease_expires_at": "REAL",
+        "file_unique_id": "TEXT",
+        "coalesced_into": "INTEGER",
+        "tg_file_ids": "TEXT",
+    },
+}
+
+JOB_QUEUE_COLUMNS = (
+    "id, chat_id, user_id, message_id, thread_id, file_id, file_unique_id, file_name, file_size, "
+    "duration_sec, status_message_id, priority, attempts, queued_at"
+)
+INTERRUPTED_ERROR = "Gave up after repeated interruptions"
+
+
+async def _migrate_columns(db: aiosqlite.Connection) -> None:
+    for table, columns in _COLUMN_MIGRATIONS.items():
+        async with db.execute(f"PRAGMA table_info({table})") as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        if not existing:
+            continue
+        for name, ddl in columns.items():
+            if name not in existing:
+                await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
 
 async def init_db(db_path: str) -> None:
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     schema_path = Path(__file__).with_name("schema.sql")
     schema_sql = schema_path.read_text(encoding="utf-8")
     async with aiosqlite.connect(db_path) as db:
+        # WAL is persistent in the database file; readers no longer block the writer.
+        await db.execute("PRAGMA journal_mode=WAL")
+        await _migrate_columns(db)
         await db.executescript(schema_sql)
         await db.commit()
 
 
+def _copy_chat(chat: dict[str, Any] | None) -> dict[str, Any] | None:
+    if chat is None:
+        return None
+    return {**chat, "allowed_user_ids": list(chat["allowed_user_ids"])}
+
+
 class Storage:
-    def __init__(self, db_path: str) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        pool_size: int = 4,
+        busy_timeout_ms: int = 5000,
+        synchronous: str = "NORMAL",
+        cached_statements: int = 256,
+        permission_cache_ttl_sec: float = 0,
+    ) -> None:
         self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.cached_statements = cached_statements
+        self._pool: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._opened = 0
+        # Permission rows are read on every media message; the writes below invalidate them.
+        self.user_cache = TtlCache(permission_cache_ttl_sec)
+        self.chat_cache = TtlCache(permission_cache_ttl_sec)
+        # Called with the seconds each operation held (or waited for) a pooled connection.
+        self.query_observer: Callable[[float], None] | None = None
+
+    async def _open(self) -> aiosqlite.Connection:
+        # sqlite3 caches prepared statements per connection, so long-lived connections reuse them.
+        db = await aiosqlite.connect(self.db_path, cached_statements=self.cached_statements)
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute(f"PRAGMA synchronous={self.synchronous}")
+        await db.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return db
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        started_at = time.perf_counter()
+        if self._pool is None:
+            self._pool = asyncio.Queue()
+        pool = self._pool
+        if pool.empty() and self._opened < self.pool_size:
+            self._opened += 1
+            try:
+                db = await self._open()
+            except BaseException:
+                self._opened -= 1
+                raise
+        else:
+            db = await pool.get()
+        try:
+            yield db
+        except BaseException:
+            if db.in_transaction:
+                await db.rollback()
+            raise
+        finally:
+            pool.put_nowait(db)
+            if self.query_observer is not None:
+                self.query_observer(time.perf_counter() - started_at)
+
+    async def close(self) -> None:
+        pool, self._pool = self._pool, None
+        self._opened = 0
+        while pool is not None and not pool.empty():
+            await pool.get_nowait().close()
 
     async def set_user_allowed(self, tg_id: int, allowed: bool) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             await db.execute(
                 """
                 INSERT INTO users (tg_id, is_allowed)
@@ -31,9 +138,10 @@ class Storage:
                 (tg_id, int(allowed)),
             )
             await db.commit()
+        self.user_cache.invalidate(tg_id)
 
     async def set_user_blocked(self, tg_id: int, blocked: bool) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             await db.execute(
                 """
                 INSERT INTO users (tg_id, is_blocked)
@@ -43,37 +151,55 @@ class Storage:
                 (tg_id, int(blocked)),
             )
             await db.commit()
+        self.user_cache.invalidate(tg_id)
 
     async def get_user(self, tg_id: int) -> dict[str, Any] | None:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        found, cached = self.user_cache.get(tg_id)
+        if found:
+            return dict(cached) if cached is not None else None
+        generation = self.user_cache.generation
+        async with self._connection() as db:
             async with db.execute(
                 "SELECT tg_id, is_allowed, is_blocked, note, created_at FROM users WHERE tg_id = ?",
                 (tg_id,),
             ) as cursor:
                 row = await cursor.fetchone()
-            if row is None:
-                return None
-            data = dict(row)
-            data["is_allowed"] = bool(data.get("is_allowed"))
-            data["is_blocked"] = bool(data.get("is_blocked"))
-            return data
+        if row is None:
+            self.user_cache.set(tg_id, None, generation=generation)
+            return None
+        data = dict(row)
+        data["is_allowed"] = bool(data.get("is_allowed"))
+        data["is_blocked"] = bool(data.get("is_blocked"))
+        self.user_cache.set(tg_id, data, generation=generation)
+        return dict(data)
 
     async def upsert_chat(self, chat_id: int, title: str | None, type_: str | None) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
+        found, cached = self.chat_cache.get(chat_id)
+        if found and cached is not None and cached["title"] == title and cached["type"] == type_:
+            return
+        async with self._connection() as db:
+            cursor = await db.execute(
                 """
                 INSERT INTO chats (chat_id, title, type, enabled, allowed_senders, allowed_user_ids, require_reply, language)
                 VALUES (?, ?, ?, 0, 'whitelist', ?, 0, 'auto')
                 ON CONFLICT(chat_id) DO UPDATE SET title = excluded.title, type = excluded.type
+                WHERE chats.title IS NOT excluded.title OR chats.type IS NOT excluded.type
                 """,
                 (chat_id, title, type_, json.dumps([])),
             )
+            changed = cursor.rowcount > 0
+            await cursor.close()
+            # A no-op upsert still opened a write transaction; ending it releases the lock for other connections.
             await db.commit()
+        if changed:
+            self.chat_cache.invalidate(chat_id)
 
     async def get_chat(self, chat_id: int) -> dict[str, Any] | None:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        found, cached = self.chat_cache.get(chat_id)
+        if found:
+            return _copy_chat(cached)
+        generation = self.chat_cache.generation
+        async with self._connection() as db:
             async with db.execute(
                 """
                 SELECT chat_id, title, type, enabled, allowed_senders, allowed_user_ids, require_reply, language
@@ -82,17 +208,19 @@ class Storage:
                 (chat_id,),
             ) as cursor:
                 row = await cursor.fetchone()
-            if row is None:
-                return None
-            data = dict(row)
-            data["enabled"] = bool(data.get("enabled"))
-            data["require_reply"] = bool(data.get("require_reply"))
-            raw = data.get("allowed_user_ids")
-            try:
-                data["allowed_user_ids"] = json.loads(raw) if raw else []
-            except json.JSONDecodeError:
-                data["allowed_user_ids"] = []
-            return data
+        if row is None:
+            self.chat_cache.set(chat_id, None, generation=generation)
+            return None
+        data = dict(row)
+        data["enabled"] = bool(data.get("enabled"))
+        data["require_reply"] = bool(data.get("require_reply"))
+        raw = data.get("allowed_user_ids")
+        try:
+            data["allowed_user_ids"] = json.loads(raw) if raw else []
+        except json.JSONDecodeError:
+            data["allowed_user_ids"] = []
+        self.chat_cache.set(chat_id, data, generation=generation)
+        return _copy_chat(data)
 
     async def set_chat_enabled(self, chat_id: int, enabled: bool) -> None:
         await self._update_chat(chat_id, enabled=int(enabled))
@@ -113,13 +241,13 @@ class Storage:
             values.append(value)
         values.append(chat_id)
         sql = f"UPDATE chats SET {', '.join(columns)} WHERE chat_id = ?"
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             await db.execute(sql, values)
             await db.commit()
+        self.chat_cache.invalidate(chat_id)
 
     async def get_request(self, request_id: int) -> dict[str, Any] | None:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connection() as db:
             async with db.execute(
                 """
                 SELECT id, kind, status, user_id, chat_id, requested_by_id, reason, created_at, updated_at
@@ -154,8 +282,7 @@ class Storage:
                 "FROM requests WHERE kind = ? AND status = 'pending' AND chat_id = ?"
             )
             params = (kind, chat_id)
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connection() as db:
             async with db.execute(sql, params) as cursor:
                 row = await cursor.fetchone()
             return dict(row) if row else None
@@ -171,7 +298,7 @@ class Storage:
         existing = await self.get_pending_request(kind=kind, user_id=user_id, chat_id=chat_id)
         if existing:
             return int(existing["id"])
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             cursor = await db.execute(
                 """
                 INSERT INTO requests (kind, status, user_id, chat_id, requested_by_id)
@@ -190,8 +317,7 @@ class Storage:
         limit: int,
         offset: int,
     ) -> list[dict[str, Any]]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connection() as db:
             async with db.execute(
                 """
                 SELECT id, kind, status, user_id, chat_id, requested_by_id, reason, created_at, updated_at
@@ -206,7 +332,7 @@ class Storage:
             return [dict(row) for row in rows]
 
     async def set_request_status(self, request_id: int, *, status: str, reason: str | None = None) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             await db.execute(
                 """
                 UPDATE requests
@@ -231,14 +357,20 @@ class Storage:
         progress_message_id: int | None = None,
         backend: str | None = None,
         duration_sec: float | None = None,
+        file_size: int | None = None,
+        priority: int = 0,
+        file_unique_id: str | None = None,
+        output_paths: str | None = None,
+        coalesced_into: int | None = None,
     ) -> int:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             cursor = await db.execute(
                 """
                 INSERT INTO jobs (
                     chat_id, user_id, message_id, thread_id, file_id, file_name,
-                    duration_sec, backend, status, status_message_id, progress_message_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    duration_sec, backend, status, status_message_id, progress_message_id,
+                    file_size, priority, file_unique_id, output_paths, coalesced_into
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     chat_id,
@@ -252,6 +384,11 @@ class Storage:
                     status,
                     status_message_id,
                     progress_message_id,
+                    file_size,
+                    priority,
+                    file_unique_id,
+                    output_paths,
+                    coalesced_into,
                 ),
             )
             await db.commit()
@@ -267,16 +404,15 @@ class Storage:
             values.append(value)
         values.append(job_id)
         sql = f"UPDATE jobs SET {', '.join(columns)} WHERE id = ?"
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             await db.execute(sql, values)
             await db.commit()
 
     async def get_job(self, job_id: int) -> dict[str, Any] | None:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connection() as db:
             async with db.execute(
                 """
-                SELECT id, chat_id, user_id, status, output_paths
+                SELECT id, chat_id, user_id, status, output_paths, tg_file_ids
                 FROM jobs
                 WHERE id = ?
                 """,
@@ -285,10 +421,295 @@ class Storage:
                 row = await cursor.fetchone()
             return dict(row) if row else None
 
+    async def claim_job(self, *, owner: str, lease_expires_at: float) -> dict[str, Any] | None:
+        # A single UPDATE ... RETURNING keeps the claim atomic across workers and processes.
+        async with self._connection() as db:
+            async with db.execute(
+                f"""
+                UPDATE jobs
+                SET status = 'running', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued'
+                    ORDER BY priority DESC, queued_at ASC, id ASC
+                    LIMIT 1
+                )
+                RETURNING {JOB_QUEUE_COLUMNS}
+                """,
+                (owner, lease_expires_at),
+            ) as cursor:
+                row = await cursor.fetchone()
+            await db.commit()
+            return dict(row) if row else None
+
+    async def renew_job_leases(self, job_ids: list[int], *, owner: str, lease_expires_at: float) -> None:
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" for _ in job_ids)
+        async with self._connection() as db:
+            await db.execute(
+                f"""
+                UPDATE jobs SET lease_expires_at = ?
+                WHERE lease_owner = ? AND status = 'running' AND id IN ({placeholders})
+                """,
+                (lease_expires_at, owner, *job_ids),
+            )
+            await db.commit()
+
+    async def requeue_expired_jobs(self, *, now: float, max_attempts: int) -> tuple[int, list[dict[str, Any]]]:
+        # Returns the requeued count and the jobs given up on (with their waiting followers), whose status
+        # messages still show the last progress update.
+        expired = "status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)"
+        async with self._connection() as db:
+            async with db.execute(
+                f"""
+                UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, lease_expires_at = NULL
+                WHERE {expired} AND attempts >= ?
+                RETURNING id, chat_id, status_message_id
+                """,
+                (INTERRUPTED_ERROR, now, max_attempts),
+            ) as cursor:
+                failed = [dict(row) for row in await cursor.fetchall()]
+            requeued = await db.execute(
+                f"""
+                UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL
+                WHERE {expired}
+                """,
+                (now,),
+            )
+            if failed:
+                placeholders = ", ".join("?" for _ in failed)
+                async with db.execute(
+                    f"""
+                    UPDATE jobs SET status = 'failed', error = ?
+                    WHERE status = 'waiting' AND coalesced_into IN ({placeholders})
+                    RETURNING id, chat_id, status_message_id
+                    """,
+                    (INTERRUPTED_ERROR, *(job["id"] for job in failed)),
+                ) as cursor:
+                    failed += [dict(row) for row in await cursor.fetchall()]
+            await db.commit()
+            return requeued.rowcount, failed
+
+    async def find_inflight_job(self, file_unique_id: str) -> dict[str, Any] | None:
+        async with self._connection() as db:
+            async with db.execute(
+                """
+                SELECT id, chat_id, status
+                FROM jobs
+                WHERE file_unique_id = ? AND status IN ('queued', 'running') AND coalesced_into IS NULL
+                ORDER BY id ASC
+                LIMIT 1
+                """,
+                (file_unique_id,),
+            ) as cursor:
+                row = await cursor.fetchone()
+            return dict(row) if row else None
+
+    async def attach_coalesced_job(
+        self,
+        leader_id: int,
+        *,
+        chat_id: int,
+        user_id: int,
+        message_id: int | None = None,
+        thread_id: int | None = None,
+        file_id: str | None = None,
+        file_unique_id: str | None = None,
+        file_name: str | None = None,
+        duration_sec: float | None = None,
+        file_size: int | None = None,
+        status_message_id: int | None = None,
+    ) -> int | None:
+        # Inserts the follower only while the leader is still in flight, so a leader that finished in the
+        # meantime cannot leave it 'waiting' forever. None means the caller has to queue the file itself.
+        async with self._connection() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO jobs (
+                    chat_id, user_id, message_id, thread_id, file_id, file_name,
+                    duration_sec, status, status_message_id, progress_message_id,
+                    file_size, file_unique_id, coalesced_into
+                )
+                SELECT ?, ?, ?, ?, ?, ?, ?, 'waiting', ?, ?, ?, ?, id
+                FROM jobs
+                WHERE id = ? AND status IN ('queued', 'running') AND coalesced_into IS NULL
+                """,
+                (
+                    chat_id,
+                    user_id,
+                    message_id,
+                    thread_id,
+                    file_id,
+                    file_name,
+                    duration_sec,
+                    status_message_id,
+                    status_message_id,
+                    file_size,
+                    file_unique_id,
+                    leader_id,
+                ),
+            )
+            attached = cursor.rowcount > 0
+            await db.commit()
+            return int(cursor.lastrowid) if attached else None
+
+    async def list_coalesced_jobs(self, job_id: int) -> list[dict[str, Any]]:
+        async with self._connection() as db:
+            async with db.execute(
+                """
+                SELECT id, chat_id, message_id, thread_id, status_message_id
+                FROM jobs
+                WHERE coalesced_into = ? AND status = 'waiting'
+                ORDER BY id ASC
+                """,
+                (job_id,),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def count_jobs(self, status: str) -> int:
+        async with self._connection() as db:
+            async with db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)) as cursor:
+                row = await cursor.fetchone()
+        return int(row[0]) if row else 0
+
+    async def find_transcript_cache(
+        self,
+        *,
+        backend: str,
+        model: str,
+        language: str,
+        file_unique_id: str | None = None,
+        content_hash: str | None = None,
+    ) -> dict[str, Any] | None:
+        if file_unique_id:
+            key_sql, key = "file_unique_id = ?", file_unique_id
+        elif content_hash:
+            key_sql, key = "content_hash = ?", content_hash
+        else:
+            return None
+        async with self._connection() as db:
+            async with db.execute(
+                f"""
+                SELECT id, job_id, file_unique_id, content_hash, output_paths, size_bytes, hits, created_at
+                FROM transcript_cache
+                WHERE {key_sql} AND backend = ? AND model = ? AND language = ?
+                """,
+                (key, backend, model, language),
+            ) as cursor:
+                row = await cursor.fetchone()
+            return dict(row) if row else None
+
+    async def touch_transcript_cache(self, entry_id: int, *, now: float) -> None:
+        async with self._connection() as db:
+            await db.execute(
+                "UPDATE transcript_cache SET hits = hits + 1, last_used_at = ? WHERE id = ?",
+                (now, entry_id),
+            )
+            await db.commit()
+
+    async def put_transcript_cache(
+        self,
+        *,
+        job_id: int,
+        backend: str,
+        model: str,
+        language: str,
+        output_paths: str,
+        size_bytes: int,
+        now: float,
+        file_unique_id: str | None = None,
+        content_hash: str | None = None,
+    ) -> None:
+        async with self._connection() as db:
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO transcript_cache (
+                    job_id, file_unique_id, content_hash, backend, model, language,
+                    output_paths, size_bytes, created_at, last_used_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job_id,
+                    file_unique_id,
+                    content_hash,
+                    backend,
+                    model,
+                    language,
+                    output_paths,
+                    size_bytes,
+                    now,
+                    now,
+                ),
+            )
+            await db.commit()
+
+    async def list_transcript_cache_lru(self) -> list[dict[str, Any]]:
+        async with self._connection() as db:
+            async with db.execute(
+                """
+                SELECT id, job_id, output_paths, size_bytes, created_at, last_used_at
+                FROM transcript_cache
+                ORDER BY last_used_at ASC
+                """
+            ) as cursor:
+                rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def delete_transcript_cache(self, entry_ids: list[int]) -> None:
+        if not entry_ids:
+            return
+        placeholders = ", ".join("?" for _ in entry_ids)
+        async with self._connection() as db:
+            await db.execute(f"DELETE FROM transcript_cache WHERE id IN ({placeholders})", entry_ids)
+            await db.commit()
+
+    async def get_job_statuses(self, job_ids: list[int]) -> dict[int, str]:
+        statuses: dict[int, str] = {}
+        async with self._connection() as db:
+            for offset in range(0, len(job_ids), 500):
+                batch = job_ids[offset : offset + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                async with db.execute(f"SELECT id, status FROM jobs WHERE id IN ({placeholders})", batch) as cursor:
+                    statuses.update({int(row["id"]): row["status"] for row in await cursor.fetchall()})
+        return statuses
+
+    async def drop_output_paths(self, paths: list[str]) -> int:
+        # Deleted files must not stay referenced by finished jobs or transcript cache entries.
+        if not paths:
+            return 0
+        gone = set(paths)
+        async with self._connection() as db:
+            jobs = await self._rows_referencing(db, "jobs", gone)
+            for row in jobs:
+                remaining = {k: v for k, v in json.loads(row["output_paths"]).items() if v not in gone}
+                await db.execute(
+                    "UPDATE jobs SET output_paths = ? WHERE id = ?",
+                    (json.dumps(remaining) if remaining else None, row["id"]),
+                )
+            cached = await self._rows_referencing(db, "transcript_cache", gone)
+            for row in cached:
+                await db.execute("DELETE FROM transcript_cache WHERE id = ?", (row["id"],))
+            await db.commit()
+        return len(jobs)
+
+    @staticmethod
+    async def _rows_referencing(db: aiosqlite.Connection, table: str, paths: set[str]) -> list[aiosqlite.Row]:
+        placeholders = ", ".join("?" for _ in paths)
+        async with db.execute(
+            f"""
+            SELECT DISTINCT {table}.id, {table}.output_paths
+            FROM {table}, json_each(CASE WHEN json_valid({table}.output_paths) THEN {table}.output_paths ELSE '{{}}' END)
+            WHERE json_each.value IN ({placeholders})
+            """,
+            list(paths),
+        ) as cursor:
+            return list(await cursor.fetchall())
+
     async def get_recent_durations(self, limit: int = 10) -> list[int]:
         durations: list[int] = []
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connection() as db:
             async with db.execute(
                 """
                 SELECT started_at, finished_at FROM jobs
@@ -308,8 +729,39 @@ class Storage:
             durations.append(int(end - start))
         return durations
 
+    async def record_job_metrics(self, job_id: int, metrics: dict[str, Any]) -> None:
+        columns = ["job_id", *metrics]
+        placeholders = ", ".join("?" for _ in columns)
+        async with self._connection() as db:
+            await db.execute(
+                f"INSERT OR REPLACE INTO job_metrics ({', '.join(columns)}) VALUES ({placeholders})",
+                [job_id, *metrics.values()],
+            )
+            await db.commit()
+
+    async def list_job_metrics(self, limit: int = 500) -> list[dict[str, Any]]:
+        async with self._connection() as db:
+            async with db.execute(
+                "SELECT * FROM job_metrics ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def list_queued_jobs(self) -> list[dict[str, Any]]:
+        async with self._connection() as db:
+            async with db.execute(
+                """
+                SELECT id, chat_id, status_message_id, duration_sec FROM jobs
+                WHERE status = 'queued'
+                ORDER BY priority DESC, queued_at ASC, id ASC
+                """
+            ) as cursor:
+                rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
     async def get_stats(self) -> dict[str, int]:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connection() as db:
             users_total = await self._fetch_count(db, "SELECT COUNT(*) FROM users")
             users_allowed = await self._fetch_count(
                 db, "SELECT COUNT(*) FROM users WHERE is_allowed = 1"
@@ -35,7 +35,15 @@ CREATE TABLE IF NOT EXISTS jobs (
     started_at TEXT,
     finished_at TEXT,
     error TEXT,
-    output_paths TEXT
+    output_paths TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    file_size INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    file_unique_id TEXT,
+    coalesced_into INTEGER,
+    tg_file_ids TEXT
 );
 
 CREATE TABLE IF NOT EXISTS requests (
@@ -53,3 +61,47 @@ CREATE TABLE IF NOT EXISTS requests (
 CREATE INDEX IF NOT EXISTS idx_requests_kind_status ON requests(kind, status);
 CREATE INDEX IF NOT EXISTS idx_requests_user_id ON requests(user_id);
 CREATE INDEX IF NOT EXISTS idx_requests_chat_id ON requests(chat_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_priority_queued ON jobs(status, priority DESC, queued_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_file_unique_id_status ON jobs(file_unique_id, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_coalesced_into ON jobs(coalesced_into);
+
+CREATE TABLE IF NOT EXISTS transcript_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    file_unique_id TEXT,
+    content_hash TEXT,
+    backend TEXT NOT NULL,
+    model TEXT NOT NULL,
+    language TEXT NOT NULL,
+    output_paths TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transcript_cache_unique_id
+    ON transcript_cache(file_unique_id, backend, model, language);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transcript_cache_hash
+    ON transcript_cache(content_hash, backend, model, language);
+CREATE INDEX IF NOT EXISTS idx_transcript_cache_last_used ON transcript_cache(last_used_at);
+
+CREATE TABLE IF NOT EXISTS job_metrics (
+    job_id INTEGER PRIMARY KEY,
+    backend TEXT,
+    audio_sec REAL,
+    queue_wait_sec REAL,
+    download_sec REAL,
+    convert_sec REAL,
+    model_sec REAL,
+    transcribe_sec REAL,
+    render_sec REAL,
+    deliver_sec REAL,
+    total_sec REAL,
+    rtf REAL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    batched INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_metrics_created_at ON job_metrics(created_at);
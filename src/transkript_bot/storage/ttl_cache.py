@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Hashable
+
+
+class TtlCache:
+    def __init__(
+        self, ttl_sec: float, *, max_entries: int = 4096, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.ttl_sec = ttl_sec
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._items: dict[Hashable, tuple[float, Any]] = {}
+        # Bumped on every invalidation so a read that raced a write cannot store the stale value it fetched.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_sec > 0
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        if not self.enabled:
+            return False, None
+        entry = self._items.get(key)
+        if entry is None or entry[0] <= self._clock():
+            self._items.pop(key, None)
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, key: Hashable, value: Any, *, generation: int | None = None) -> None:
+        if not self.enabled or (generation is not None and generation != self.generation):
+            return
+        now = self._clock()
+        # Re-inserting keeps the dict in expiry order (one TTL for every entry), so expired and overflowing
+        # entries are always at the front and are dropped here instead of waiting for a read that never comes.
+        self._items.pop(key, None)
+        self._items[key] = (now + self.ttl_sec, value)
+        while True:
+            oldest = next(iter(self._items))
+            if len(self._items) <= self.max_entries and self._items[oldest][0] > now:
+                break
+            del self._items[oldest]
+
+    def invalidate(self, key: Hashable) -> None:
+        self.generation += 1
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._items.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_pct": round(self.hits * 100 / lookups, 1) if lookups else 0.0,
+            "entries": len(self._items),
+        }
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable
+
+from .media import SAMPLE_RATE
+
+# transcribe(chunk_audio, language) -> (segments relative to the chunk, detected language)
+ChunkTranscriber = Callable[[Any, str | None], tuple[list[dict[str, Any]], str | None]]
+
+
+def speech_regions(audio: Any) -> list[tuple[int, int]]:
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    return [(int(ts["start"]), int(ts["end"])) for ts in get_speech_timestamps(audio, VadOptions())]
+
+
+def plan_chunks(speech: list[tuple[int, int]], total_samples: int, target_samples: int) -> list[tuple[int, int]]:
+    # Cut only in the middle of a pause between speech regions, so no word is split across chunks.
+    bounds = [0]
+    last_end: int | None = None
+    for start, end in speech:
+        if last_end is not None and end - bounds[-1] > target_samples and start > last_end:
+            bounds.append((last_end + start) // 2)
+        last_end = end
+    bounds.append(total_samples)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def transcribe_chunks(
+    audio: Any,
+    chunks: list[tuple[int, int]],
+    transcribe: ChunkTranscriber,
+    *,
+    language: str | None,
+    workers: int,
+    on_progress: Callable[[int], None] | None = None,
+    on_segment: Callable[[dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    total = sum(end - start for start, end in chunks) or 1
+    results: dict[int, list[dict[str, Any]]] = {}
+    done = 0
+    emitted = 0
+
+    def _shifted(index: int) -> list[dict[str, Any]]:
+        offset = chunks[index][0] / SAMPLE_RATE
+        return [{**seg, "start": seg["start"] + offset, "end": seg["end"] + offset} for seg in results[index]]
+
+    def _report(index: int) -> None:
+        nonlocal done, emitted
+        done += chunks[index][1] - chunks[index][0]
+        if on_progress:
+            on_progress(max(1, min(99, int(done * 100 / total))))
+        # Segments are streamed (and checkpointed) only once every earlier chunk is in, so they stay in order.
+        while on_segment and emitted in results:
+            for seg in _shifted(emitted):
+                on_segment(seg)
+            emitted += 1
+
+    pending = list(range(len(chunks)))
+    if language is None and pending:
+        # Detect the language once on the first chunk, then pin it so every chunk agrees.
+        first = pending.pop(0)
+        start, end = chunks[first]
+        results[first], language = transcribe(audio[start:end], None)
+        _report(first)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(transcribe, audio[chunks[index][0] : chunks[index][1]], language): index
+            for index in pending
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()[0]
+            _report(index)
+
+    stitched: list[dict[str, Any]] = []
+    for index in range(len(chunks)):
+        stitched.extend(_shifted(index))
+    return stitched
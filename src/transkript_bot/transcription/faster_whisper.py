@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import time
 from typing import Any, Callable
 
+from .chunking import plan_chunks, speech_regions, transcribe_chunks
+from .media import SAMPLE_RATE
+from .model_cache import ModelCache, load_whisper_model
+
 
 def normalize_segments(segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
     normalized: list[dict[str, Any]] = []
@@ -12,34 +17,185 @@ def normalize_segments(segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return normalized
 
 
-def run_faster_whisper(
-    wav_path: str,
-    *,
-    model_size: str,
-    language: str,
-    device: str,
-    compute_type: str,
+def _transcribe_segments(
+    model: Any,
+    audio: str | Any,
+    language: str | None,
     on_progress: Callable[[int], None] | None = None,
-) -> list[dict[str, Any]]:
-    from faster_whisper import WhisperModel
-
-    model = WhisperModel(model_size, device=device, compute_type=compute_type)
+    on_segment: Callable[[dict[str, Any]], None] | None = None,
+    offset: float = 0.0,
+) -> tuple[list[dict[str, Any]], str | None]:
     segments, info = model.transcribe(
-        wav_path,
-        language=None if language == "auto" else language,
+        audio,
+        language=language,
         beam_size=1,
         best_of=1,
         condition_on_previous_text=False,
         vad_filter=True,
     )
-    duration = float(getattr(info, "duration", 0.0) or 0.0)
+    duration = float(getattr(info, "duration", 0.0) or 0.0) + offset
     last_progress = -1
     result: list[dict[str, Any]] = []
     for seg in segments:
-        result.append({"start": seg.start, "end": seg.end, "text": seg.text})
+        result.append({"start": seg.start + offset, "end": seg.end + offset, "text": seg.text})
+        if on_segment:
+            on_segment(normalize_segments(result[-1:])[0])
         if on_progress and duration > 0:
-            current = max(1, min(99, int((float(seg.end) / duration) * 100)))
+            current = max(1, min(99, int((float(seg.end + offset) / duration) * 100)))
             if current > last_progress:
                 last_progress = current
                 on_progress(current)
+    return result, getattr(info, "language", None)
+
+
+def _acquire_model(
+    model_size: str,
+    device: str,
+    compute_type: str,
+    model_cache: ModelCache | None,
+    cpu_threads: int,
+    num_workers: int,
+    timings: dict[str, float] | None,
+) -> Any:
+    started_at = time.perf_counter()
+    options = {"cpu_threads": cpu_threads, "num_workers": num_workers}
+    if model_cache is not None:
+        model = model_cache.get(model_size, device, compute_type, **options)
+    else:
+        model = load_whisper_model(model_size, device, compute_type, **options)
+    if timings is not None:
+        timings["model"] = time.perf_counter() - started_at
+    return model
+
+
+def run_faster_whisper(
+    audio: str | Any,
+    *,
+    model_size: str,
+    language: str,
+    device: str,
+    compute_type: str,
+    on_progress: Callable[[int], None] | None = None,
+    on_segment: Callable[[dict[str, Any]], None] | None = None,
+    model_cache: ModelCache | None = None,
+    cpu_threads: int = 0,
+    num_workers: int = 1,
+    chunk_workers: int = 1,
+    chunk_min_sec: float = 0.0,
+    chunk_target_sec: float = 300.0,
+    start_sec: float = 0.0,
+    timings: dict[str, float] | None = None,
+) -> list[dict[str, Any]]:
+    model = _acquire_model(model_size, device, compute_type, model_cache, cpu_threads, num_workers, timings)
+    language_code = None if language == "auto" else language
+
+    if isinstance(audio, str) and (chunk_workers > 1 or start_sec > 0):
+        from faster_whisper import decode_audio
+
+        audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+    if start_sec > 0:
+        # Resuming from a checkpoint: decode only what is left and shift timestamps back to the full file.
+        audio = audio[int(start_sec * SAMPLE_RATE) :]
+        if len(audio) < SAMPLE_RATE // 10:
+            return []
+
+    if chunk_workers > 1:
+        if len(audio) >= chunk_min_sec * SAMPLE_RATE:
+            chunks = plan_chunks(speech_regions(audio), len(audio), int(chunk_target_sec * SAMPLE_RATE))
+            if len(chunks) > 1:
+
+                def _on_chunk_segment(seg: dict[str, Any]) -> None:
+                    shifted = {**seg, "start": seg["start"] + start_sec, "end": seg["end"] + start_sec}
+                    on_segment(normalize_segments([shifted])[0])
+
+                result = transcribe_chunks(
+                    audio,
+                    chunks,
+                    lambda chunk, lang: _transcribe_segments(model, chunk, lang),
+                    language=language_code,
+                    workers=chunk_workers,
+                    on_progress=on_progress,
+                    on_segment=_on_chunk_segment if on_segment else None,
+                )
+                for seg in result:
+                    seg["start"] += start_sec
+                    seg["end"] += start_sec
+                return normalize_segments(result)
+
+    result, _ = _transcribe_segments(model, audio, language_code, on_progress, on_segment, offset=start_sec)
     return normalize_segments(result)
+
+
+def pack_clips(audios: list[Any], gap_samples: int = SAMPLE_RATE // 2) -> tuple[Any, list[dict[str, float]]]:
+    import numpy as np
+
+    pieces = []
+    clips = []
+    offset = 0
+    silence = np.zeros(gap_samples, dtype=np.float32)
+    for audio in audios:
+        clips.append({"start": offset / SAMPLE_RATE, "end": (offset + len(audio)) / SAMPLE_RATE})
+        pieces.extend([np.asarray(audio, dtype=np.float32), silence])
+        offset += len(audio) + gap_samples
+    return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32), clips
+
+
+def split_by_clip(segments: list[dict[str, Any]], clips: list[dict[str, float]]) -> list[list[dict[str, Any]]]:
+    result: list[list[dict[str, Any]]] = [[] for _ in clips]
+    for seg in segments:
+        middle = (seg["start"] + seg["end"]) / 2
+        for index, clip in enumerate(clips):
+            if clip["start"] <= middle <= clip["end"] or index == len(clips) - 1:
+                offset = clip["start"]
+                result[index].append(
+                    {
+                        **seg,
+                        "start": max(0.0, seg["start"] - offset),
+                        "end": min(clip["end"], seg["end"]) - offset,
+                    }
+                )
+                break
+    return result
+
+
+def run_faster_whisper_batch(
+    audios: list[Any],
+    *,
+    model_size: str,
+    language: str,
+    device: str,
+    compute_type: str,
+    model_cache: ModelCache | None = None,
+    cpu_threads: int = 0,
+    num_workers: int = 1,
+    batch_size: int = 8,
+    timings: dict[str, float] | None = None,
+) -> list[list[dict[str, Any]]]:
+    from faster_whisper import BatchedInferencePipeline
+
+    model = _acquire_model(model_size, device, compute_type, model_cache, cpu_threads, num_workers, timings)
+    pipeline = BatchedInferencePipeline(model=model)
+
+    # The batched pipeline decodes every clip with one language, so notes are grouped by detected language.
+    groups: dict[str | None, list[int]] = {}
+    for index, audio in enumerate(audios):
+        lang = None if language == "auto" else language
+        if lang is None:
+            lang, _, _ = model.detect_language(audio)
+        groups.setdefault(lang, []).append(index)
+
+    results: list[list[dict[str, Any]]] = [[] for _ in audios]
+    for lang, indexes in groups.items():
+        joined, clips = pack_clips([audios[index] for index in indexes])
+        segments, _ = pipeline.transcribe(
+            joined,
+            language=lang,
+            batch_size=batch_size,
+            clip_timestamps=clips,
+            vad_filter=False,
+            beam_size=1,
+        )
+        flat = [{"start": seg.start, "end": seg.end, "text": seg.text} for seg in segments]
+        for index, segs in zip(indexes, split_by_clip(flat, clips)):
+            results[index] = normalize_segments(segs)
+    return results
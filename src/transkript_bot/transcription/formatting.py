@@ -1,3 +1,6 @@
+import json
+
+
 def sec_to_hms(sec: float) -> str:
     m = int(sec // 60)
     s = sec % 60
@@ -17,3 +20,59 @@ def segments_to_txt(segments: list[dict]) -> str:
         lines.append(text)
         lines.append("")
     return "\n".join(lines).strip() + "\n"
+
+
+def _clock(sec: float, separator: str) -> str:
+    ms = int(round(max(0.0, sec) * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+
+
+def _spoken(segments: list[dict]) -> list[tuple[float, float, str, str]]:
+    spoken = []
+    for seg in segments:
+        text = (seg.get("text") or "").strip()
+        if text:
+            spoken.append((float(seg.get("start", 0.0)), float(seg.get("end", 0.0)), seg.get("speaker", ""), text))
+    return spoken
+
+
+def segments_to_md(segments: list[dict]) -> str:
+    lines = []
+    for start, end, speaker, text in _spoken(segments):
+        lines.append(f"**{speaker or 'SPEAKER'}** `{sec_to_hms(start)} – {sec_to_hms(end)}`")
+        lines.append("")
+        lines.append(text)
+        lines.append("")
+    return "\n".join(lines).strip() + "\n"
+
+
+def segments_to_srt(segments: list[dict]) -> str:
+    blocks = []
+    for index, (start, end, speaker, text) in enumerate(_spoken(segments), 1):
+        line = f"{speaker}: {text}" if speaker else text
+        blocks.append(f"{index}\n{_clock(start, ',')} --> {_clock(end, ',')}\n{line}\n")
+    return "\n".join(blocks)
+
+
+def segments_to_vtt(segments: list[dict]) -> str:
+    blocks = ["WEBVTT\n"]
+    for start, end, speaker, text in _spoken(segments):
+        line = f"<v {speaker}>{text}" if speaker else text
+        blocks.append(f"{_clock(start, '.')} --> {_clock(end, '.')}\n{line}\n")
+    return "\n".join(blocks)
+
+
+def segments_to_json(segments: list[dict]) -> str:
+    return json.dumps({"segments": segments}, ensure_ascii=False)
+
+
+RENDERERS = {
+    "txt": segments_to_txt,
+    "md": segments_to_md,
+    "srt": segments_to_srt,
+    "vtt": segments_to_vtt,
+    "json": segments_to_json,
+}
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import subprocess
+from typing import Any
+
+SAMPLE_RATE = 16000
 
 
 def build_ffmpeg_cmd(input_path: str, output_path: str) -> list[str]:
@@ -13,13 +17,172 @@ def build_ffmpeg_cmd(input_path: str, output_path: str) -> list[str]:
         "-ac",
         "1",
         "-ar",
-        "16000",
+        str(SAMPLE_RATE),
         "-f",
         "wav",
         output_path,
     ]
 
 
+def build_ffmpeg_pcm_cmd(input_path: str) -> list[str]:
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-i",
+        input_path,
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-f",
+        "f32le",
+        "-acodec",
+        "pcm_f32le",
+        "pipe:1",
+    ]
+
+
 def convert_to_wav(input_path: str, output_path: str) -> None:
     cmd = build_ffmpeg_cmd(input_path, output_path)
     subprocess.run(cmd, check=True)
+
+
+async def _wait_or_kill(proc: asyncio.subprocess.Process, awaitable: Any, timeout: float | None) -> Any:
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except BaseException as exc:
+        # Timeouts and task cancellation must not leave ffmpeg running in the background.
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if isinstance(exc, asyncio.TimeoutError):
+            raise TimeoutError(f"ffmpeg timed out after {timeout}s") from exc
+        raise
+
+
+async def run_ffmpeg(cmd: list[str], *, timeout: float | None = None) -> bytes:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await _wait_or_kill(proc, proc.communicate(), timeout)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=None, stderr=stderr)
+    return stdout
+
+
+async def convert_to_wav_async(input_path: str, output_path: str, *, timeout: float | None = None) -> None:
+    await run_ffmpeg(build_ffmpeg_cmd(input_path, output_path), timeout=timeout)
+
+
+def expected_samples(duration_sec: float | None, margin: float = 1.05) -> int:
+    if not duration_sec or duration_sec <= 0:
+        return SAMPLE_RATE * 60
+    return int(duration_sec * SAMPLE_RATE * margin) + SAMPLE_RATE
+
+
+class PcmBuffer:
+    def __init__(self, capacity_samples: int, mmap_path: str | None = None, spill_path: str | None = None) -> None:
+        import numpy as np
+
+        self._np = np
+        self.mmap_path = mmap_path
+        # An in-memory buffer that outgrows its (budgeted) capacity moves to this file instead of growing in RAM.
+        self.spill_path = spill_path
+        self.spilled = False
+        self._size = 0
+        self._array = self._allocate(max(1, capacity_samples))
+
+    def _allocate(self, samples: int) -> Any:
+        np = self._np
+        if self.mmap_path is None:
+            return np.empty(samples, dtype=np.float32)
+        mode = "r+" if self._size else "w+"
+        if self._size:
+            with open(self.mmap_path, "r+b") as handle:
+                handle.truncate(samples * 4)
+        return np.memmap(self.mmap_path, dtype=np.float32, mode=mode, shape=(samples,))
+
+    @property
+    def capacity_bytes(self) -> int:
+        return int(self._array.nbytes)
+
+    def write(self, chunk: bytes) -> None:
+        end = self._size + len(chunk)
+        if end > self.capacity_bytes:
+            self._grow(end)
+        self._array.view(self._np.uint8)[self._size : end] = self._np.frombuffer(chunk, dtype=self._np.uint8)
+        self._size = end
+
+    def _grow(self, min_bytes: int) -> None:
+        samples = max(min_bytes // 4 + 1, len(self._array) * 2)
+        if self.mmap_path is None and self.spill_path is not None:
+            np = self._np
+            spilled = np.memmap(self.spill_path, dtype=np.float32, mode="w+", shape=(samples,))
+            spilled.view(np.uint8)[: self._size] = self._array.view(np.uint8)[: self._size]
+            self._array = spilled
+            self.mmap_path = self.spill_path
+            self.spilled = True
+            return
+        if self.mmap_path is None:
+            grown = self._np.empty(samples, dtype=self._np.float32)
+            grown.view(self._np.uint8)[: self._size] = self._array.view(self._np.uint8)[: self._size]
+            self._array = grown
+            return
+        self._array.flush()
+        self._array = self._allocate(samples)
+
+    def array(self) -> Any:
+        return self._array[: self._size // 4]
+
+
+async def decode_to_pcm(
+    source: str | bytes | memoryview,
+    *,
+    timeout: float | None = None,
+    buffer: PcmBuffer | None = None,
+    chunk_size: int = 1 << 20,
+) -> Any:
+    from_stdin = not isinstance(source, str)
+    cmd = build_ffmpeg_pcm_cmd("pipe:0" if from_stdin else source)
+    if buffer is None:
+        buffer = PcmBuffer(expected_samples(None))
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if from_stdin else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def _feed() -> None:
+        if not from_stdin:
+            return
+        view = memoryview(source)
+        try:
+            for offset in range(0, len(view), chunk_size):
+                proc.stdin.write(view[offset : offset + chunk_size])
+                await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg stopped reading; its exit code and stderr explain why.
+            pass
+        finally:
+            proc.stdin.close()
+
+    async def _drain() -> None:
+        while chunk := await proc.stdout.read(chunk_size):
+            buffer.write(chunk)
+
+    async def _communicate() -> bytes:
+        _, _, stderr = await asyncio.gather(_feed(), _drain(), proc.stderr.read())
+        await proc.wait()
+        return stderr
+
+    stderr = await _wait_or_kill(proc, _communicate(), timeout)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=None, stderr=stderr)
+    return buffer.array()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+ModelKey = tuple[str, str, str]
+
+# Approximate resident size of float16 CTranslate2 weights per model size.
+_MODEL_SIZE_MB = {
+    "tiny": 80,
+    "base": 150,
+    "small": 490,
+    "medium": 1530,
+    "large": 3100,
+    "turbo": 1620,
+    "distil-large": 1520,
+}
+
+_COMPUTE_TYPE_FACTOR = {
+    "int8": 0.5,
+    "int8_float16": 0.5,
+    "int8_float32": 0.5,
+    "int8_bfloat16": 0.5,
+    "float16": 1.0,
+    "bfloat16": 1.0,
+    "float32": 2.0,
+}
+
+
+def estimate_model_mb(model_size: str, compute_type: str) -> int:
+    base = 0
+    name = model_size.casefold()
+    for prefix, size_mb in _MODEL_SIZE_MB.items():
+        if name.startswith(prefix) and size_mb > base:
+            base = size_mb
+    if not base:
+        base = _MODEL_SIZE_MB["large"]
+    factor = _COMPUTE_TYPE_FACTOR.get(compute_type, 1.0)
+    return int(base * factor)
+
+
+def load_whisper_model(model_size: str, device: str, compute_type: str, **options: Any) -> Any:
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(model_size, device=device, compute_type=compute_type, **options)
+
+
+class ModelCache:
+    def __init__(
+        self,
+        budget_mb: int,
+        loader: Callable[..., Any] = load_whisper_model,
+    ) -> None:
+        self.budget_mb = budget_mb
+        self._loader = loader
+        self._models: OrderedDict[ModelKey, tuple[Any, int]] = OrderedDict()
+        # Loads happen under the lock so concurrent workers never build the same model twice.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def get(self, model_size: str, device: str, compute_type: str, **options: Any) -> Any:
+        key = (model_size, device, compute_type)
+        with self._lock:
+            cached = self._models.get(key)
+            if cached is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            size_mb = estimate_model_mb(model_size, compute_type)
+            self._evict_for(size_mb)
+            started_at = time.perf_counter()
+            model = self._loader(model_size, device, compute_type, **options)
+            elapsed = time.perf_counter() - started_at
+            self.load_seconds += elapsed
+            logger.info(
+                "Loaded model %s device=%s compute_type=%s in %.2fs (~%sMB)",
+                model_size,
+                device,
+                compute_type,
+                elapsed,
+                size_mb,
+            )
+            self._models[key] = (model, size_mb)
+            return model
+
+    def _evict_for(self, size_mb: int) -> None:
+        while self._models and self.used_mb + size_mb > self.budget_mb:
+            key, _ = self._models.popitem(last=False)
+            self.evictions += 1
+            logger.info("Evicted model %s device=%s compute_type=%s", *key)
+
+    @property
+    def used_mb(self) -> int:
+        return sum(size_mb for _, size_mb in self._models.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "models": len(self._models),
+                "used_mb": self.used_mb,
+                "budget_mb": self.budget_mb,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 2),
+            }
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from .formatting import segments_to_txt
+
+
+class PartialTranscript:
+    def __init__(self, jsonl_path: Path, txt_path: Path, tail_chars: int = 600, append: bool = False) -> None:
+        self.jsonl_path = jsonl_path
+        self.txt_path = txt_path
+        self.tail_chars = tail_chars
+        self.count = 0
+        self._tail = ""
+        mode = "a" if append else "w"
+        self._jsonl = open(jsonl_path, mode, encoding="utf-8")
+        self._txt = open(txt_path, mode, encoding="utf-8")
+
+    def restore(self, segments: list[dict[str, Any]], jsonl_size: int | None = None) -> None:
+        # Segments already on disk from an earlier attempt. A crash can leave a torn jsonl line that would hide
+        # everything appended after it, so cut the jsonl back to its intact prefix and rebuild the txt to match.
+        if jsonl_size is not None:
+            self._jsonl.truncate(jsonl_size)
+        self._txt.seek(0)
+        self._txt.truncate()
+        for segment in segments:
+            self._txt.write(segments_to_txt([segment]) + "\n")
+            self.count += 1
+            self._extend_tail(segment)
+        self._txt.flush()
+
+    def append(self, segment: dict[str, Any]) -> None:
+        # One line per segment, flushed immediately: whatever was decoded survives a crash mid-job.
+        self._jsonl.write(json.dumps(segment, ensure_ascii=False) + "\n")
+        self._jsonl.flush()
+        self._txt.write(segments_to_txt([segment]) + "\n")
+        self._txt.flush()
+        self.count += 1
+        self._extend_tail(segment)
+
+    def _extend_tail(self, segment: dict[str, Any]) -> None:
+        text = (segment.get("text") or "").strip()
+        if text:
+            self._tail = f"{self._tail} {text}".strip()[-self.tail_chars :]
+
+    def tail(self) -> str:
+        if len(self._tail) < self.tail_chars:
+            return self._tail
+        # Trimmed on a character boundary; start at the next word so the tail doesn't open mid-word.
+        _, _, rest = self._tail.partition(" ")
+        return "…" + (rest or self._tail)
+
+    def close(self) -> None:
+        self._jsonl.close()
+        self._txt.close()
+
+    def remove(self) -> None:
+        self.close()
+        for path in (self.jsonl_path, self.txt_path):
+            path.unlink(missing_ok=True)
+
+
+def read_partial_checkpoint(path: Path) -> tuple[list[dict[str, Any]], int]:
+    # The intact segments and the byte length of the lines holding them.
+    segments: list[dict[str, Any]] = []
+    size = 0
+    if not path.is_file():
+        return segments, size
+    with open(path, "rb") as handle:
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                segments.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # A torn last line from a crash; everything before it is intact.
+                break
+            size += len(line)
+    return segments, size
+
+
+def read_partial_segments(path: Path) -> list[dict[str, Any]]:
+    return read_partial_checkpoint(path)[0]
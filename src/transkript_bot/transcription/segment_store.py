@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from .formatting import RENDERERS
+
+SEGMENTS_SUFFIX = ".seg"
+_FORMAT_VERSION = 1
+
+
+def encode_segments(segments: list[dict[str, Any]]) -> bytes:
+    # Columnar layout with millisecond integers and a speaker dictionary compresses far better than per-segment JSON.
+    speakers: dict[str, int] = {}
+    speaker_ids = []
+    for seg in segments:
+        speaker = seg.get("speaker")
+        speaker_ids.append(-1 if speaker is None else speakers.setdefault(speaker, len(speakers)))
+    columns = {
+        "v": _FORMAT_VERSION,
+        "start_ms": [int(round(float(seg.get("start", 0.0)) * 1000)) for seg in segments],
+        "end_ms": [int(round(float(seg.get("end", 0.0)) * 1000)) for seg in segments],
+        "speakers": list(speakers),
+        "speaker": speaker_ids,
+        "text": [seg.get("text") or "" for seg in segments],
+    }
+    return zlib.compress(json.dumps(columns, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_segments(blob: bytes) -> list[dict[str, Any]]:
+    columns = json.loads(zlib.decompress(blob))
+    if columns.get("v") != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported segment store version: {columns.get('v')}")
+    speakers = columns["speakers"]
+    segments = []
+    for start_ms, end_ms, speaker_id, text in zip(
+        columns["start_ms"], columns["end_ms"], columns["speaker"], columns["text"]
+    ):
+        seg: dict[str, Any] = {"start": start_ms / 1000, "end": end_ms / 1000, "text": text}
+        if speaker_id >= 0:
+            seg["speaker"] = speakers[speaker_id]
+        segments.append(seg)
+    return segments
+
+
+def write_segments(path: Path, segments: list[dict[str, Any]]) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(encode_segments(segments))
+    tmp_path.replace(path)
+
+
+def read_segments(path: str | Path) -> list[dict[str, Any]]:
+    return decode_segments(Path(path).read_bytes())
+
+
+class RenderCache:
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._renders: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, path: str | Path, kind: str) -> bytes:
+        if kind not in RENDERERS:
+            raise ValueError(f"Unknown transcript format: {kind}")
+        key = (str(path), kind)
+        data = self._renders.get(key)
+        if data is not None:
+            self._renders.move_to_end(key)
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = RENDERERS[kind](read_segments(path)).encode("utf-8")
+        if self.max_entries > 0:
+            self._renders[key] = data
+            while len(self._renders) > self.max_entries:
+                self._renders.popitem(last=False)
+        return data
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._renders),
+            "hits": self.hits,
+            "misses": self.misses,
+            "size_kb": round(sum(len(data) for data in self._renders.values()) / 1024, 1),
+        }
@@ -14,6 +14,7 @@ def build_whisperx_cmd(
     diarize: bool,
     hf_token: str | None,
     whisperx_cmd: str = "whisperx",
+    threads: int = 0,
 ) -> list[str]:
     cmd = [
         whisperx_cmd,
@@ -31,6 +32,8 @@ def build_whisperx_cmd(
     ]
     if diarize and hf_token:
         cmd += ["--diarize", "--hf_token", hf_token]
+    if threads > 0:
+        cmd += ["--threads", str(threads)]
     return cmd
 
 
@@ -43,6 +46,7 @@ def run_whisperx(
     diarize: bool,
     hf_token: str | None,
     whisperx_cmd: str = "whisperx",
+    threads: int = 0,
 ) -> list[dict[str, Any]]:
     cmd = build_whisperx_cmd(
         wav_path,
@@ -52,14 +56,15 @@ def run_whisperx(
         diarize,
         hf_token,
         whisperx_cmd=whisperx_cmd,
+        threads=threads,
     )
     proc = subprocess.run(cmd, text=True, capture_output=True)
     if proc.returncode != 0:
         raise subprocess.CalledProcessError(
             proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
         )
-    json_files = sorted(Path(out_dir).glob("*.json"))
-    if not json_files:
+    json_path = Path(out_dir) / f"{Path(wav_path).stem}.json"
+    if not json_path.is_file():
         raise FileNotFoundError("WhisperX did not produce JSON output")
-    data = json.loads(json_files[-1].read_text(encoding="utf-8"))
+    data = json.loads(json_path.read_text(encoding="utf-8"))
     return data.get("segments", [])
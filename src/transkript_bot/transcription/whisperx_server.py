@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, TextIO
+
+# Line protocol spoken with WhisperXWorker over stdin/stdout, one JSON object per line:
+#   -> {"id": 1, "audio": "/path.wav", "language": "ru", "diarize": true}
+#   <- {"event": "ready"}  (once, after the models are loaded)
+#   <- {"id": 1, "event": "progress", "percent": 60}
+#   <- {"id": 1, "event": "result", "segments": [...]}
+#   <- {"id": 1, "event": "error", "error": "..."}
+
+
+def _emit(out: TextIO, **message: Any) -> None:
+    out.write(json.dumps(message, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+class _Models:
+    def __init__(self, args: argparse.Namespace) -> None:
+        import torch
+        import whisperx
+
+        self.whisperx = whisperx
+        self.device = args.device or ("cuda" if torch.cuda.is_available() else "cpu")
+        compute_type = args.compute_type or ("float16" if self.device == "cuda" else "int8")
+        self.batch_size = args.batch_size
+        self.asr = whisperx.load_model(
+            args.model,
+            self.device,
+            compute_type=compute_type,
+            threads=args.threads or 4,
+            vad_method="silero",
+        )
+        self.align: dict[str, tuple[Any, Any]] = {}
+        self.diarize_pipeline: Any = None
+        self.hf_token = os.environ.get("HF_TOKEN") or None
+
+    def _align_model(self, language: str) -> tuple[Any, Any]:
+        if language not in self.align:
+            self.align[language] = self.whisperx.load_align_model(language_code=language, device=self.device)
+        return self.align[language]
+
+    def _diarizer(self) -> Any:
+        if self.diarize_pipeline is None:
+            try:
+                from whisperx.diarize import DiarizationPipeline
+            except ImportError:
+                DiarizationPipeline = self.whisperx.DiarizationPipeline
+            self.diarize_pipeline = DiarizationPipeline(use_auth_token=self.hf_token, device=self.device)
+        return self.diarize_pipeline
+
+    def transcribe(self, request: dict[str, Any], out: TextIO) -> list[dict[str, Any]]:
+        job_id = request.get("id")
+        language = request.get("language")
+        audio = self.whisperx.load_audio(request["audio"])
+        result = self.asr.transcribe(
+            audio,
+            batch_size=self.batch_size,
+            language=None if language in (None, "", "auto") else language,
+        )
+        _emit(out, id=job_id, event="progress", percent=60)
+        model_a, metadata = self._align_model(result["language"])
+        result = self.whisperx.align(result["segments"], model_a, metadata, audio, self.device)
+        _emit(out, id=job_id, event="progress", percent=80)
+        if request.get("diarize") and self.hf_token:
+            speakers = self._diarizer()(audio)
+            result = self.whisperx.assign_word_speakers(speakers, result)
+            _emit(out, id=job_id, event="progress", percent=95)
+        return result["segments"]
+
+
+def serve(args: argparse.Namespace, inp: TextIO, out: TextIO) -> None:
+    models = _Models(args)
+    _emit(out, event="ready")
+    for line in inp:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            segments = models.transcribe(request, out)
+        except Exception as exc:
+            _emit(out, id=request.get("id"), event="error", error=f"{type(exc).__name__}: {exc}")
+            continue
+        _emit(out, id=request.get("id"), event="result", segments=segments)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="large-v2")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--compute-type", default=None)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+    # Libraries print to stdout freely; keep the real stdout for the protocol and send the rest to stderr.
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    serve(args, sys.stdin, protocol)
+
+
+if __name__ == "__main__":
+    main()
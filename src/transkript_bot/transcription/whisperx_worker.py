@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import shlex
+import sys
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Aligned/diarized results for long recordings arrive as a single JSON line.
+_STREAM_LIMIT = 256 * 1024 * 1024
+
+
+class WhisperXError(RuntimeError):
+    pass
+
+
+def build_whisperx_worker_cmd(model: str, *, threads: int = 0, worker_cmd: str = "") -> list[str]:
+    if worker_cmd:
+        cmd = shlex.split(worker_cmd)
+    else:
+        cmd = [sys.executable, "-m", "transkript_bot.transcription.whisperx_server"]
+    cmd += ["--model", model]
+    if threads > 0:
+        cmd += ["--threads", str(threads)]
+    return cmd
+
+
+class WhisperXWorker:
+    def __init__(
+        self,
+        cmd: list[str],
+        *,
+        hf_token: str | None = None,
+        start_timeout: float | None = 600.0,
+        job_timeout: float | None = None,
+    ) -> None:
+        self.cmd = cmd
+        self.hf_token = hf_token
+        self.start_timeout = start_timeout
+        self.job_timeout = job_timeout
+        self.restarts = 0
+        self._proc: asyncio.subprocess.Process | None = None
+        self._lock = asyncio.Lock()
+        self._next_id = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def start(self) -> None:
+        async with self._lock:
+            await self._start()
+
+    async def _start(self) -> None:
+        if self.alive:
+            return
+        if self._proc is not None:
+            self.restarts += 1
+            logger.warning("Restarting WhisperX worker (exit code %s)", self._proc.returncode)
+        env = dict(os.environ)
+        if self.hf_token:
+            env["HF_TOKEN"] = self.hf_token
+        self._proc = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=env,
+            limit=_STREAM_LIMIT,
+        )
+        try:
+            message = await self._read(self.start_timeout)
+        except BaseException:
+            await self._kill()
+            raise
+        if message.get("event") != "ready":
+            await self._kill()
+            raise RuntimeError(f"WhisperX worker sent {message!r} instead of ready")
+        logger.info("WhisperX worker ready (pid=%s)", self._proc.pid)
+
+    async def _read(self, timeout: float | None) -> dict[str, Any]:
+        assert self._proc is not None and self._proc.stdout is not None
+        try:
+            line = await asyncio.wait_for(self._proc.stdout.readline(), timeout)
+        except asyncio.TimeoutError as exc:
+            raise TimeoutError(f"WhisperX worker did not respond within {timeout}s") from exc
+        if not line:
+            returncode = await self._proc.wait()
+            raise RuntimeError(f"WhisperX worker exited with code {returncode}")
+        return json.loads(line)
+
+    async def _kill(self) -> None:
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.kill()
+            await self._proc.wait()
+
+    async def transcribe(
+        self,
+        audio_path: str,
+        *,
+        language: str,
+        diarize: bool = False,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> list[dict[str, Any]]:
+        async with self._lock:
+            await self._start()
+            assert self._proc is not None and self._proc.stdin is not None
+            self._next_id += 1
+            request_id = self._next_id
+            request = {"id": request_id, "audio": audio_path, "language": language, "diarize": diarize}
+            try:
+                self._proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+                await self._proc.stdin.drain()
+                while True:
+                    message = await self._read(self.job_timeout)
+                    if message.get("id") != request_id:
+                        continue
+                    event = message.get("event")
+                    if event == "progress" and on_progress is not None:
+                        on_progress(int(message.get("percent") or 0))
+                    elif event == "result":
+                        return message.get("segments") or []
+                    elif event == "error":
+                        raise WhisperXError(message.get("error") or "WhisperX failed")
+            except WhisperXError:
+                raise
+            except BaseException:
+                # A crash, timeout or cancellation leaves the worker in an unknown state; the next job restarts it.
+                await self._kill()
+                raise
+
+    async def close(self) -> None:
+        if self._proc is None or self._proc.returncode is not None:
+            return
+        if self._proc.stdin is not None:
+            self._proc.stdin.close()
+        try:
+            await asyncio.wait_for(self._proc.wait(), 10)
+        except asyncio.TimeoutError:
+            await self._kill()
+
+
+class WhisperXPool:
+    def __init__(self, size: int, factory: Callable[[], WhisperXWorker]) -> None:
+        self.workers = [factory() for _ in range(max(1, size))]
+        self._idle: asyncio.Queue[WhisperXWorker] = asyncio.Queue()
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+
+    async def start(self) -> None:
+        await asyncio.gather(*(worker.start() for worker in self.workers))
+
+    async def transcribe(self, audio_path: str, **options: Any) -> list[dict[str, Any]]:
+        worker = await self._idle.get()
+        try:
+            return await worker.transcribe(audio_path, **options)
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(worker.close() for worker in self.workers))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": len(self.workers),
+            "alive": sum(1 for worker in self.workers if worker.alive),
+            "restarts": sum(worker.restarts for worker in self.workers),
+        }
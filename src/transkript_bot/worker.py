@@ -6,19 +6,30 @@ import logging
 import os
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from aiogram import Bot
-from aiogram.types import InlineKeyboardMarkup
+from aiogram.types import FSInputFile, InlineKeyboardMarkup
 
 from .config import Settings
+from .services.job_queue import JobQueue
+from .services.job_metrics import STAGES, metrics_row, sqlite_timestamp, stage_span
+from .services.memory_budget import MemoryBudget
+from .services.metrics import JOB_BUCKETS, MetricsRegistry
+from .services.pipeline import StageQueue, gather_batch
+from .services.profiler import PROFILE_SUFFIX, SamplingProfiler
 from .services.progress import format_progress
+from .services.queue import EtaModel, format_queue_status
+from .services.telegram_api import fetch_file, locate_local_file
+from .services.transcript_cache import TranscriptCache, hash_bytes, hash_file
 from .services.keyboard import build_result_files_keyboard
 from .storage.db import Storage
-from .transcription.faster_whisper import run_faster_whisper
-from .transcription.formatting import segments_to_txt
-from .transcription.media import convert_to_wav
+from .transcription.faster_whisper import run_faster_whisper, run_faster_whisper_batch
+from .transcription.partial import PartialTranscript, read_partial_checkpoint
+from .transcription.segment_store import SEGMENTS_SUFFIX, write_segments
+from .transcription.media import SAMPLE_RATE, PcmBuffer, convert_to_wav_async, decode_to_pcm, expected_samples
 from .transcription.whisperx_cli import run_whisperx
+from .transcription.whisperx_worker import WhisperXPool
 
 logger = logging.getLogger(__name__)
 
@@ -38,10 +49,117 @@ async def _edit_progress(
             reply_markup=reply_markup,
         )
         return True
-    except Exception:
+    except Exception as exc:
+        logger.debug("Failed to edit message %s in chat %s: %s", message_id, chat_id, exc)
         return False
 
 
+async def _edit_all_progress(bot: Bot, job: dict[str, Any], text: str) -> None:
+    # Coalesced submitters keep their own status messages; mirror every stage update to them.
+    targets = [job, *job.get("followers", [])]
+    await asyncio.gather(
+        *(
+            _edit_progress(bot, target["chat_id"], target["status_message_id"], text)
+            for target in targets
+            if target.get("status_message_id")
+        )
+    )
+
+
+async def _send_result(bot: Bot, target: dict[str, Any], text: str) -> None:
+    keyboard = build_result_files_keyboard(job_id=target["id"])
+    status_message_id = target.get("status_message_id")
+    if status_message_id and await _edit_progress(
+        bot,
+        target["chat_id"],
+        status_message_id,
+        text,
+        reply_markup=keyboard,
+    ):
+        return
+    await bot.send_message(
+        target["chat_id"],
+        text,
+        reply_to_message_id=target.get("message_id"),
+        message_thread_id=target.get("thread_id"),
+        reply_markup=keyboard,
+    )
+
+
+def _start_profile(job_id: int, settings: Settings, state: dict[str, Any]) -> None:
+    recipients = state.setdefault("profile_requests", {}).pop(job_id, None)
+    state["jobs_started"] = state.get("jobs_started", 0) + 1
+    every = settings.profile_every_n
+    if recipients is None and every > 0 and state["jobs_started"] % every == 0:
+        recipients = list(settings.root_admin_ids)
+    if not recipients:
+        return
+    profiler = SamplingProfiler(settings.profile_interval_ms / 1000)
+    profiler.start()
+    state.setdefault("profilers", {})[job_id] = {
+        "profiler": profiler,
+        "recipients": recipients,
+        "path": Path(settings.media_dir) / f"{job_id}{PROFILE_SUFFIX}",
+    }
+    logger.info("Job %s profiling started for admin(s) %s", job_id, recipients)
+
+
+async def _finish_profile(job_id: int, bot: Bot, state: dict[str, Any], outcome: str) -> None:
+    entry = state.get("profilers", {}).pop(job_id, None)
+    if entry is None:
+        return
+    profiler: SamplingProfiler = entry["profiler"]
+    # Stopped before any await, so a cancellation below cannot leave the sampler running; joining takes one interval.
+    profiler.stop()
+    path = await asyncio.to_thread(profiler.write, entry["path"])
+    caption = f"Profile of job {job_id} ({outcome}): {profiler.samples} samples over {profiler.elapsed_sec:.1f}s"
+    for admin_id in entry["recipients"]:
+        try:
+            await bot.send_document(admin_id, FSInputFile(path), caption=caption)
+        except Exception as exc:
+            logger.warning("Failed to send profile of job %s to %s: %s", job_id, admin_id, exc)
+
+
+def stop_profilers(state: dict[str, Any]) -> None:
+    profilers = state.get("profilers", {})
+    for job_id in list(profilers):
+        profilers.pop(job_id)["profiler"].stop()
+
+
+def _refresh_queue_etas(bot: Bot, state: dict[str, Any]) -> None:
+    eta_model: EtaModel | None = state.get("eta")
+    if eta_model is None:
+        return
+    edits = []
+    for _, entry, position, eta in eta_model.queued_etas():
+        previous = entry.get("eta")
+        # Small drifts are not worth a Telegram edit; position changes and >15% swings are.
+        if position == entry.get("position") and previous is not None and abs(eta - previous) <= 0.15 * previous:
+            continue
+        text = format_queue_status(position, eta)
+        entry.update(position=position, eta=eta)
+        if entry.get("status_message_id") and text != entry.get("text"):
+            entry["text"] = text
+            edits.append((entry, text))
+    if not edits:
+        return
+
+    async def _send_edit(entry: dict[str, Any], text: str) -> None:
+        # A newer refresh already replaced this text; the rate governor collapses the ones already waiting.
+        if entry.get("text") != text:
+            return
+        await _edit_progress(bot, entry["chat_id"], entry["status_message_id"], text)
+
+    async def _send_edits() -> None:
+        await asyncio.gather(*(_send_edit(entry, text) for entry, text in edits))
+
+    # Earlier refreshes are left to finish: cancelling them would drop edits other callers coalesced into.
+    tasks: set[asyncio.Task] = state.setdefault("eta_refresh_tasks", set())
+    task = asyncio.create_task(_send_edits())
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+
+
 def _safe_suffix(file_name: str | None) -> str:
     if not file_name:
         return ".bin"
@@ -49,70 +167,204 @@ def _safe_suffix(file_name: str | None) -> str:
     return suffix or ".bin"
 
 
-async def process_job(
+# Containers whose index may sit at the end of the file; ffmpeg cannot demux them from a pipe.
+_SEEKABLE_SUFFIXES = {".mp4", ".m4a", ".m4v", ".mov", ".3gp"}
+
+
+def _audio_plan(
+    job: dict[str, Any], settings: Settings, paths: dict[str, Path], in_place: bool = False
+) -> dict[str, Any]:
+    file_size = int(job.get("file_size") or 0)
+    capacity = expected_samples(job.get("duration_sec"))
+    in_memory = bool(job.get("duration_sec")) and 0 < file_size <= settings.inmemory_max_mb * 1024 * 1024
+    # A file read in place from the local Bot API volume goes to ffmpeg by path; no input copy is held in memory.
+    pipe_input = in_memory and not in_place and paths["input"].suffix.casefold() not in _SEEKABLE_SUFFIXES
+    return {
+        "capacity": capacity,
+        "in_memory": in_memory,
+        "pipe_input": pipe_input,
+        "input_bytes": file_size if pipe_input else 0,
+        "reserve": ((file_size if pipe_input else 0) + capacity * 4) if in_memory else 0,
+    }
+
+
+def _job_paths(settings: Settings, job: dict[str, Any]) -> dict[str, Path]:
+    media_dir = Path(settings.media_dir)
+    job_id = job["id"]
+    return {
+        "input": media_dir / f"{job_id}{_safe_suffix(job.get('file_name'))}",
+        "wav": media_dir / f"{job_id}.wav",
+        "pcm": media_dir / f"{job_id}.pcm",
+        "partial_jsonl": media_dir / f"{job_id}.partial.jsonl",
+        "partial_txt": media_dir / f"{job_id}.partial.txt",
+        "segments": media_dir / f"{job_id}{SEGMENTS_SUFFIX}",
+    }
+
+
+async def prepare_job(
     job: dict[str, Any],
     bot: Bot,
     settings: Settings,
     storage: Storage,
     state: dict[str, Any],
     backend: str,
-) -> None:
+) -> dict[str, Any]:
     job_id = job["id"]
     chat_id = job["chat_id"]
-    message_id = job["message_id"]
-    thread_id = job.get("thread_id")
-    status_message_id = job.get("status_message_id")
     file_id = job["file_id"]
-    file_name = job.get("file_name")
 
     os.makedirs(settings.media_dir, exist_ok=True)
-    suffix = _safe_suffix(file_name)
-    input_path = Path(settings.media_dir) / f"{job_id}{suffix}"
-    wav_path = Path(settings.media_dir) / f"{job_id}.wav"
-    txt_path = Path(settings.media_dir) / f"{job_id}.txt"
-    md_path = Path(settings.media_dir) / f"{job_id}.md"
-    json_path = Path(settings.media_dir) / f"{job_id}.json"
+    paths = _job_paths(settings, job)
+    input_path = paths["input"]
+    wav_path = paths["wav"]
 
     started_at = time.time()
+    _start_profile(job_id, settings, state)
+    # Shared by every copy of the job dict down the pipeline; deliver_job persists it to job_metrics.
+    timings: dict[str, float] = {}
+    queued_at = sqlite_timestamp(job.get("queued_at"))
+    if queued_at is not None:
+        timings["queue_wait"] = max(0.0, started_at - queued_at)
     logger.info(
         "Job %s started (chat=%s message=%s backend=%s file=%s)",
         job_id,
         chat_id,
-        message_id,
+        job["message_id"],
         backend,
-        file_name or file_id,
+        job.get("file_name") or file_id,
     )
     await storage.update_job(job_id, status="running", started_at=started_at, backend=backend)
+    eta_model: EtaModel | None = state.get("eta")
+    if eta_model is not None:
+        eta_model.start(job_id, job.get("duration_sec"))
+        _refresh_queue_etas(bot, state)
+    job = {**job, "followers": await storage.list_coalesced_jobs(job_id)}
+    await _edit_all_progress(bot, job, format_progress(stage="downloading"))
 
-    if status_message_id:
-        await _edit_progress(
-            bot,
-            chat_id,
-            status_message_id,
-            format_progress(stage="downloading"),
-        )
+    local_path, server_path = None, None
+    if settings.bot_api_read_in_place:
+        with stage_span(timings, "download"):
+            local_path, server_path = await locate_local_file(bot, file_id)
+    in_place = local_path is not None
 
-    logger.info("Job %s downloading file_id=%s", job_id, file_id)
-    await bot.download(file_id, destination=str(input_path))
+    streaming = backend == "faster" and settings.stream_audio
+    plan = _audio_plan(job, settings, paths, in_place) if streaming else {"in_memory": False, "pipe_input": False}
+    budget: MemoryBudget | None = state.get("memory_budget")
+    reserved = 0
+    if plan["in_memory"] and budget is not None:
+        if await budget.acquire(plan["reserve"]):
+            reserved = plan["reserve"]
+        else:
+            plan = {**plan, "in_memory": False, "pipe_input": False}
 
-    if status_message_id:
-        await _edit_progress(
-            bot,
-            chat_id,
-            status_message_id,
-            format_progress(stage="converting"),
-        )
+    try:
+        logger.info("Job %s downloading file_id=%s (in_memory=%s)", job_id, file_id, plan["pipe_input"])
+        with stage_span(timings, "download"):
+            if in_place:
+                logger.info("Job %s reading %s in place from the local Bot API volume", job_id, local_path)
+                source: str | memoryview = str(local_path)
+            else:
+                fetched = await fetch_file(
+                    bot,
+                    file_id,
+                    None if plan["pipe_input"] else input_path,
+                    server_path=server_path,
+                    server_dir=settings.bot_api_server_dir,
+                )
+                source = fetched if isinstance(fetched, str) else fetched.getbuffer()
+
+            content_hash = await asyncio.to_thread(
+                hash_file if isinstance(source, str) else hash_bytes,
+                source,
+            )
+        metrics: MetricsRegistry | None = state.get("metrics")
+        if metrics is not None and not in_place:
+            size = len(source) if not isinstance(source, str) else input_path.stat().st_size
+            metrics.counter("downloaded_bytes_total", "Bytes downloaded from Telegram").inc(size)
+        transcript_cache: TranscriptCache | None = state.get("transcript_cache")
+        cached_paths = None
+        if transcript_cache is not None:
+            cached_paths = await transcript_cache.lookup(
+                backend=backend,
+                model=settings.whisper_model,
+                language=settings.default_language,
+                content_hash=content_hash,
+            )
+        if cached_paths:
+            logger.info("Job %s transcript cache hit by content hash", job_id)
+            if budget is not None:
+                await budget.release(reserved)
+            return {
+                **job,
+                "paths": paths,
+                "started_at": started_at,
+                "backend": backend,
+                "content_hash": content_hash,
+                "cached_outputs": cached_paths,
+                "timings": timings,
+                "audio_sec": job.get("duration_sec"),
+            }
 
-    logger.info("Job %s converting to wav: %s -> %s", job_id, input_path, wav_path)
-    convert_to_wav(str(input_path), str(wav_path))
+        job["followers"] = await storage.list_coalesced_jobs(job_id)
+        await _edit_all_progress(bot, job, format_progress(stage="converting"))
 
-    if status_message_id:
-        await _edit_progress(
-            bot,
-            chat_id,
-            status_message_id,
-            format_progress(stage="transcribing"),
-        )
+        with stage_span(timings, "convert"):
+            if streaming:
+                logger.info("Job %s decoding to PCM (in_memory=%s)", job_id, plan["in_memory"])
+                buffer = PcmBuffer(
+                    plan["capacity"],
+                    mmap_path=None if plan["in_memory"] else str(paths["pcm"]),
+                    spill_path=str(paths["pcm"]),
+                )
+                audio = await decode_to_pcm(source, timeout=settings.ffmpeg_timeout_sec, buffer=buffer)
+                if buffer.spilled:
+                    logger.info("Job %s audio outgrew its reservation, spilled to %s", job_id, paths["pcm"])
+            else:
+                logger.info("Job %s converting to wav: %s -> %s", job_id, source, wav_path)
+                await convert_to_wav_async(str(source), str(wav_path), timeout=settings.ffmpeg_timeout_sec)
+                audio = None
+    except BaseException:
+        if budget is not None:
+            await budget.release(reserved)
+        for path in (paths["pcm"], wav_path):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                continue
+        raise
+
+    # The compressed input is no longer needed once decoded; keep only the PCM reservation.
+    if budget is not None and reserved:
+        await budget.release(plan["input_bytes"])
+        reserved -= plan["input_bytes"]
+
+    return {
+        **job,
+        "paths": paths,
+        "started_at": started_at,
+        "backend": backend,
+        "content_hash": content_hash,
+        "audio": audio,
+        "memory_reserved": reserved,
+        "timings": timings,
+        "audio_sec": len(audio) / SAMPLE_RATE if audio is not None else job.get("duration_sec"),
+    }
+
+
+async def transcribe_job(
+    job: dict[str, Any],
+    bot: Bot,
+    settings: Settings,
+    state: dict[str, Any],
+    backend: str,
+    threads: int = 0,
+    workers: int = 1,
+) -> dict[str, Any]:
+    job_id = job["id"]
+    if job.get("cached_outputs"):
+        return job
+
+    await _edit_all_progress(bot, job, format_progress(stage="transcribing"))
 
     logger.info("Job %s transcribing with backend=%s", job_id, backend)
     transcribe_started_at = time.time()
@@ -130,22 +382,161 @@ async def process_job(
             return
         last_progress_percent = percent
         last_progress_edit_at = now
-        if not status_message_id:
-            return
-        text = format_progress(stage="transcribing", transcribe_percent=percent)
-        loop.call_soon_threadsafe(
-            lambda: asyncio.create_task(
-                _edit_progress(
-                    bot,
-                    chat_id,
-                    status_message_id,
-                    text,
-                )
-            )
+        tail = partial.tail() if partial is not None else None
+        text = format_progress(stage="transcribing", transcribe_percent=percent, tail=tail)
+        loop.call_soon_threadsafe(_spawn_progress_edit, text)
+
+    def _spawn_progress_edit(text: str) -> None:
+        task = asyncio.create_task(_edit_all_progress(bot, job, text))
+        progress_tasks.add(task)
+        task.add_done_callback(progress_tasks.discard)
+
+    progress_tasks: set[asyncio.Task] = set()
+    partial: PartialTranscript | None = None
+    resumed: list[dict[str, Any]] = []
+    if settings.stream_partial and backend == "faster":
+        # The partial jsonl doubles as the checkpoint: an earlier attempt of this job may have left segments there.
+        resumed, intact_size = read_partial_checkpoint(job["paths"]["partial_jsonl"])
+        partial = PartialTranscript(
+            job["paths"]["partial_jsonl"],
+            job["paths"]["partial_txt"],
+            tail_chars=settings.partial_tail_chars,
+            append=bool(resumed),
         )
+        partial.restore(resumed, intact_size)
+    start_sec = float(resumed[-1]["end"]) if resumed else 0.0
+    if resumed:
+        logger.info("Job %s resuming at %.1fs from %s checkpointed segment(s)", job_id, start_sec, len(resumed))
+    timings = job.setdefault("timings", {})
+    try:
+        with stage_span(timings, "transcribe"):
+            segments = await _run_backend(
+                job,
+                settings,
+                state,
+                backend,
+                threads,
+                workers,
+                _transcribe_progress_callback,
+                partial.append if partial is not None else None,
+                start_sec,
+                timings,
+            )
+        # Model load time is reported as its own stage.
+        timings["transcribe"] -= timings.get("model", 0.0)
+        segments = resumed + segments
+    finally:
+        # Edits still waiting for a rate-limit slot are stale now; drop them so they cannot overwrite later stages.
+        for task in list(progress_tasks):
+            task.cancel()
+        if partial is not None:
+            partial.close()
+        budget: MemoryBudget | None = state.get("memory_budget")
+        if budget is not None:
+            await budget.release(job.get("memory_reserved", 0))
+    logger.info(
+        "Job %s transcription completed in %.2fs (segments=%s)",
+        job_id,
+        time.time() - transcribe_started_at,
+        len(segments),
+    )
+    audio_sec = job.get("audio_sec")
+    return {
+        **job,
+        "segments": segments,
+        "audio": None,
+        "memory_reserved": 0,
+        "transcribed_audio_sec": audio_sec - start_sec if audio_sec else None,
+    }
+
+
+def _load_audio(path: str) -> Any:
+    from faster_whisper import decode_audio
 
+    return decode_audio(path, sampling_rate=SAMPLE_RATE)
+
+
+async def transcribe_batch(
+    jobs: list[dict[str, Any]],
+    bot: Bot,
+    settings: Settings,
+    state: dict[str, Any],
+    threads: int = 0,
+    workers: int = 1,
+) -> list[dict[str, Any]]:
+    for job in jobs:
+        await _edit_all_progress(bot, job, format_progress(stage="transcribing"))
+    audios = []
+    for job in jobs:
+        audio = job.get("audio")
+        if audio is None:
+            audio = await asyncio.to_thread(_load_audio, str(job["paths"]["wav"]))
+        audios.append(audio)
+    transcribe_started_at = time.time()
+    batch_timings: dict[str, float] = {}
+    results = await asyncio.to_thread(
+        run_faster_whisper_batch,
+        audios,
+        model_size=settings.whisper_model,
+        language=settings.default_language,
+        device=settings.whisper_device,
+        compute_type=settings.whisper_compute_type,
+        model_cache=state.get("model_cache"),
+        cpu_threads=threads,
+        num_workers=workers * max(1, settings.chunk_workers),
+        batch_size=settings.batch_max_size,
+        timings=batch_timings,
+    )
+    elapsed = time.time() - transcribe_started_at
+    # Reservations are only released on success; on failure each job is retried alone and releases its own.
+    budget: MemoryBudget | None = state.get("memory_budget")
+    if budget is not None:
+        for job in jobs:
+            await budget.release(job.get("memory_reserved", 0))
+    logger.info("Jobs %s transcribed as one batch in %.2fs", [job["id"] for job in jobs], elapsed)
+    # Every job in the batch waited for the whole batch; the real-time factor is the batch's throughput.
+    batch_audio_sec = sum(len(audio) for audio in audios) / SAMPLE_RATE
+    for job in jobs:
+        timings = job.setdefault("timings", {})
+        timings["model"] = batch_timings.get("model", 0.0)
+        timings["transcribe"] = elapsed - timings["model"]
+    return [
+        {
+            **job,
+            "segments": segments,
+            "audio": None,
+            "memory_reserved": 0,
+            "batched": True,
+            "audio_sec": len(audio) / SAMPLE_RATE,
+            "transcribed_audio_sec": batch_audio_sec,
+        }
+        for job, audio, segments in zip(jobs, audios, results)
+    ]
+
+
+async def _run_backend(
+    job: dict[str, Any],
+    settings: Settings,
+    state: dict[str, Any],
+    backend: str,
+    threads: int,
+    workers: int,
+    on_progress: Callable[[int], None],
+    on_segment: Callable[[dict[str, Any]], None] | None = None,
+    start_sec: float = 0.0,
+    timings: dict[str, float] | None = None,
+) -> list[dict[str, Any]]:
+    wav_path = job["paths"]["wav"]
+    whisperx_pool: WhisperXPool | None = state.get("whisperx_pool")
+    if backend == "whisperx" and whisperx_pool is not None:
+        return await whisperx_pool.transcribe(
+            str(wav_path),
+            language=settings.default_language,
+            diarize=bool(settings.hf_token),
+            on_progress=on_progress,
+        )
     if backend == "whisperx":
-        segments = await asyncio.to_thread(
+        return await asyncio.to_thread(
             run_whisperx,
             str(wav_path),
             str(Path(settings.media_dir)),
@@ -154,110 +545,346 @@ async def process_job(
             diarize=bool(settings.hf_token),
             hf_token=settings.hf_token,
             whisperx_cmd=settings.whisperx_cmd,
+            threads=threads,
         )
-    else:
-        segments = await asyncio.to_thread(
-            run_faster_whisper,
-            str(wav_path),
-            model_size=settings.whisper_model,
-            language=settings.default_language,
-            device="cpu",
-            compute_type="int8",
-            on_progress=_transcribe_progress_callback,
-        )
-    logger.info(
-        "Job %s transcription completed in %.2fs (segments=%s)",
-        job_id,
-        time.time() - transcribe_started_at,
-        len(segments),
+    audio = job.get("audio")
+    return await asyncio.to_thread(
+        run_faster_whisper,
+        str(wav_path) if audio is None else audio,
+        model_size=settings.whisper_model,
+        language=settings.default_language,
+        device=settings.whisper_device,
+        compute_type=settings.whisper_compute_type,
+        on_progress=on_progress,
+        on_segment=on_segment,
+        model_cache=state.get("model_cache"),
+        cpu_threads=threads,
+        num_workers=workers * max(1, settings.chunk_workers),
+        chunk_workers=settings.chunk_workers,
+        chunk_min_sec=settings.chunk_min_sec,
+        chunk_target_sec=settings.chunk_target_sec,
+        start_sec=start_sec,
+        timings=timings,
     )
 
-    text = segments_to_txt(segments)
-    txt_path.write_text(text, encoding="utf-8")
-    md_path.write_text(text, encoding="utf-8")
-    json_path.write_text(json.dumps({"segments": segments}, ensure_ascii=False), encoding="utf-8")
-
-    if status_message_id:
-        await _edit_progress(
-            bot,
-            chat_id,
-            status_message_id,
-            format_progress(stage="uploading"),
-        )
 
-    logger.info("Job %s updating status message with result selector keyboard", job_id)
-    keyboard = build_result_files_keyboard(job_id=job_id)
-    final_text = format_progress(stage="done", transcribe_percent=100)
-    if status_message_id:
-        updated = await _edit_progress(
-            bot,
-            chat_id,
-            status_message_id,
-            final_text,
-            reply_markup=keyboard,
-        )
-        if not updated:
-            await bot.send_message(
-                chat_id,
-                final_text,
-                reply_to_message_id=message_id,
-                message_thread_id=thread_id,
-                reply_markup=keyboard,
+async def deliver_job(
+    job: dict[str, Any],
+    bot: Bot,
+    settings: Settings,
+    storage: Storage,
+    state: dict[str, Any],
+) -> None:
+    outcome = "failed"
+    try:
+        await _deliver_results(job, bot, settings, storage, state)
+        outcome = "done"
+    finally:
+        await _finish_profile(job["id"], bot, state, outcome)
+
+
+async def _deliver_results(
+    job: dict[str, Any],
+    bot: Bot,
+    settings: Settings,
+    storage: Storage,
+    state: dict[str, Any],
+) -> None:
+    job_id = job["id"]
+    paths = job["paths"]
+
+    output_paths = job.get("cached_outputs")
+    if not output_paths:
+        # One compressed segment store per job; txt/md/srt/vtt/json are rendered when a user asks for them.
+        with stage_span(job.setdefault("timings", {}), "render"):
+            await asyncio.to_thread(write_segments, paths["segments"], job["segments"])
+        output_paths = {"segments": str(paths["segments"])}
+        transcript_cache: TranscriptCache | None = state.get("transcript_cache")
+        if transcript_cache is not None:
+            await transcript_cache.store(
+                job_id=job_id,
+                backend=job["backend"],
+                model=settings.whisper_model,
+                language=settings.default_language,
+                output_paths=output_paths,
+                file_unique_id=job.get("file_unique_id"),
+                content_hash=job.get("content_hash"),
             )
-    else:
-        await bot.send_message(
-            chat_id,
-            final_text,
-            reply_to_message_id=message_id,
-            message_thread_id=thread_id,
-            reply_markup=keyboard,
-        )
 
     finished_at = time.time()
-    await storage.update_job(
-        job_id,
-        status="done",
-        finished_at=finished_at,
-        output_paths=json.dumps(
-            {"txt": str(txt_path), "md": str(md_path), "json": str(json_path)}
-        ),
-    )
+    done = {"status": "done", "finished_at": finished_at, "output_paths": json.dumps(output_paths)}
+    # Marked done before any network call: from here on find_inflight_job no longer attaches duplicates to it.
+    await storage.update_job(job_id, **done)
+    job = {**job, "followers": await storage.list_coalesced_jobs(job_id)}
+    fanned_out = 0
+    with stage_span(job.setdefault("timings", {}), "deliver"):
+        await _edit_all_progress(bot, job, format_progress(stage="uploading"))
+
+        logger.info("Job %s updating status message with result selector keyboard", job_id)
+        final_text = format_progress(stage="done", transcribe_percent=100)
+        await _send_result(bot, job, final_text)
+        # A duplicate that found the leader still running may attach during these edits; drain until none wait.
+        followers = await storage.list_coalesced_jobs(job_id)
+        while followers:
+            for target in followers:
+                await storage.update_job(target["id"], **done)
+                await _send_result(bot, target, final_text)
+            fanned_out += len(followers)
+            followers = await storage.list_coalesced_jobs(job_id)
+    if fanned_out:
+        logger.info("Job %s fanned out to %s coalesced job(s)", job_id, fanned_out)
 
-    for path in (input_path, wav_path):
+    for path in (paths["input"], paths["wav"], paths["pcm"], paths["partial_jsonl"], paths["partial_txt"]):
         try:
             path.unlink(missing_ok=True)
         except Exception:
             continue
 
-    logger.info("Job %s completed in %.2fs", job_id, finished_at - started_at)
+    eta_model: EtaModel | None = state.get("eta")
+    if eta_model is not None:
+        # Only the transcribe span: time spent waiting in stage queues would inflate the learned real-time factor.
+        # Cache hits have no span and would teach the model a near-zero one.
+        transcribe_sec = None if job.get("cached_outputs") else job["timings"].get("transcribe")
+        audio_sec = job.get("transcribed_audio_sec") or job.get("duration_sec")
+        eta_model.finish(job_id, audio_sec, transcribe_sec=transcribe_sec)
+        _refresh_queue_etas(bot, state)
+
+    row = metrics_row(job, time.time())
+    try:
+        await storage.record_job_metrics(job_id, row)
+    except Exception as exc:
+        logger.warning("Failed to record metrics for job %s: %s", job_id, exc)
+    metrics: MetricsRegistry | None = state.get("metrics")
+    if metrics is not None:
+        _observe_job(metrics, row)
+
+    logger.info("Job %s completed in %.2fs", job_id, finished_at - job["started_at"])
     state["last_activity"] = time.time()
 
 
-async def worker_loop(
-    queue,
+def _observe_job(metrics: MetricsRegistry, row: dict[str, Any]) -> None:
+    backend = row.get("backend") or "unknown"
+    stages = metrics.histogram("job_stage_seconds", "Time spent in each job stage", JOB_BUCKETS)
+    for stage in STAGES:
+        if row.get(f"{stage}_sec") is not None:
+            stages.observe(row[f"{stage}_sec"], stage=stage, backend=backend)
+    metrics.histogram("job_seconds", "End-to-end job latency including queue wait", JOB_BUCKETS).observe(
+        row["total_sec"], backend=backend
+    )
+    metrics.counter("jobs_total", "Finished jobs").inc(backend=backend, cached=row["cached"])
+
+
+async def process_job(
+    job: dict[str, Any],
     bot: Bot,
     settings: Settings,
     storage: Storage,
     state: dict[str, Any],
     backend: str,
+    threads: int = 0,
+    workers: int = 1,
+) -> None:
+    prepared = await prepare_job(job, bot, settings, storage, state, backend)
+    transcribed = await transcribe_job(prepared, bot, settings, state, backend, threads, workers)
+    await deliver_job(transcribed, bot, settings, storage, state)
+
+
+async def _fail_job(
+    job: dict[str, Any],
+    exc: Exception,
+    bot: Bot,
+    storage: Storage,
+    state: dict[str, Any],
+) -> None:
+    logger.exception("Job %s failed: %s", job.get("id"), exc)
+    try:
+        eta_model: EtaModel | None = state.get("eta")
+        if eta_model is not None:
+            eta_model.finish(job["id"])
+            _refresh_queue_etas(bot, state)
+        # Failing the leader first means no follower can attach after the list below is read.
+        await storage.update_job(job["id"], status="failed", error=str(exc))
+        job = {**job, "followers": await storage.list_coalesced_jobs(job["id"])}
+        for follower in job["followers"]:
+            await storage.update_job(follower["id"], status="failed", error=str(exc))
+        await _edit_all_progress(bot, job, f"Failed: {exc}")
+    finally:
+        await _finish_profile(job["id"], bot, state, "failed")
+
+
+async def _run_stage_item(
+    job: dict[str, Any],
+    outbox: StageQueue | None,
+    handler: Callable[[dict[str, Any]], Awaitable[dict[str, Any] | None]],
+    bot: Bot,
+    storage: Storage,
+    state: dict[str, Any],
+    release: Callable[[int], None] | None,
+) -> None:
+    try:
+        try:
+            result = await handler(job)
+        except asyncio.CancelledError as exc:
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                raise
+            # A stray cancellation from an awaited helper, not a shutdown of this worker: fail the job, keep the loop.
+            raise RuntimeError("Job was cancelled") from exc
+        if outbox is not None:
+            await outbox.put(result)
+    except Exception as exc:
+        await _fail_job(job, exc, bot, storage, state)
+        if release is not None:
+            release(job["id"])
+
+
+async def stage_loop(
+    worker_name: str,
+    inbox: StageQueue | JobQueue,
+    outbox: StageQueue | None,
+    handler: Callable[[dict[str, Any]], Awaitable[dict[str, Any] | None]],
+    bot: Bot,
+    storage: Storage,
+    state: dict[str, Any],
+    release: Callable[[int], None] | None = None,
 ) -> None:
+    busy = state.setdefault("workers", {})
+    busy[worker_name] = None
     while True:
-        job = await queue.get()
-        logger.info("Picked job from queue: id=%s", job.get("id"))
-        state["worker_busy"] = True
+        job = await inbox.get()
+        logger.info("Worker %s picked job: id=%s", worker_name, job.get("id"))
+        busy[worker_name] = job.get("id")
         try:
-            await process_job(job, bot, settings, storage, state, backend)
-        except Exception as exc:
-            logger.exception("Job %s failed: %s", job.get("id"), exc)
-            await storage.update_job(job["id"], status="failed", error=str(exc))
-            status_message_id = job.get("status_message_id")
-            if status_message_id:
-                await _edit_progress(
+            await _run_stage_item(job, outbox, handler, bot, storage, state, release)
+        finally:
+            busy[worker_name] = None
+            inbox.task_done()
+
+
+def _batchable(job: dict[str, Any], settings: Settings) -> bool:
+    duration = job.get("duration_sec")
+    # Each note must fit in one 30 s Whisper window to be decoded as a single batched clip.
+    return not job.get("cached_outputs") and bool(duration) and duration <= min(settings.batch_max_audio_sec, 30)
+
+
+async def batch_stage_loop(
+    worker_name: str,
+    inbox: StageQueue,
+    outbox: StageQueue,
+    handler: Callable[[dict[str, Any]], Awaitable[dict[str, Any]]],
+    batch_handler: Callable[[list[dict[str, Any]]], Awaitable[list[dict[str, Any]]]],
+    bot: Bot,
+    settings: Settings,
+    storage: Storage,
+    state: dict[str, Any],
+    release: Callable[[int], None] | None = None,
+) -> None:
+    busy = state.setdefault("workers", {})
+    busy[worker_name] = None
+    carry: dict[str, Any] | None = None
+    while True:
+        first = carry if carry is not None else await inbox.get()
+        batch, carry = await gather_batch(
+            inbox,
+            first,
+            max_size=settings.batch_max_size,
+            wait_sec=settings.batch_wait_ms / 1000,
+            accept=lambda job: _batchable(job, settings),
+        )
+        logger.info("Worker %s picked job(s): ids=%s", worker_name, [job.get("id") for job in batch])
+        busy[worker_name] = batch[0].get("id")
+        try:
+            results = None
+            if len(batch) > 1:
+                try:
+                    results = await batch_handler(batch)
+                except Exception as exc:
+                    logger.warning(
+                        "Batched transcription of %s job(s) failed, retrying one by one: %s", len(batch), exc
+                    )
+            if results is not None:
+                for result in results:
+                    await outbox.put(result)
+            else:
+                for job in batch:
+                    await _run_stage_item(job, outbox, handler, bot, storage, state, release)
+        finally:
+            busy[worker_name] = None
+            for _ in batch:
+                inbox.task_done()
+
+
+def start_workers(
+    queue: JobQueue,
+    bot: Bot,
+    settings: Settings,
+    storage: Storage,
+    state: dict[str, Any],
+    backend: str,
+    workers: int,
+    threads: int,
+) -> list[asyncio.Task]:
+    batching = backend == "faster" and settings.batch_max_size > 1
+    # The transcribe queue must be able to hold a whole batch, or batches never fill up.
+    transcribe_depth = max(settings.pipeline_depth, settings.batch_max_size if batching else 1)
+    transcribe_queue = StageQueue("transcribe", maxsize=max(1, transcribe_depth))
+    deliver_queue = StageQueue("deliver", maxsize=max(1, settings.pipeline_depth))
+    state["pipeline"] = {"download": queue, "transcribe": transcribe_queue, "deliver": deliver_queue}
+
+    async def _prepare(job: dict[str, Any]) -> dict[str, Any]:
+        return await prepare_job(job, bot, settings, storage, state, backend)
+
+    async def _transcribe(job: dict[str, Any]) -> dict[str, Any]:
+        return await transcribe_job(job, bot, settings, state, backend, threads, workers)
+
+    async def _transcribe_batch(jobs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return await transcribe_batch(jobs, bot, settings, state, threads, workers)
+
+    async def _deliver(job: dict[str, Any]) -> None:
+        await deliver_job(job, bot, settings, storage, state)
+        queue.release(job["id"])
+
+    logger.info(
+        "Starting pipeline: %s download, %s transcribe (%s thread(s) each), 1 deliver worker(s)",
+        settings.prepare_workers,
+        workers,
+        threads,
+    )
+    stages = [
+        ("download", max(1, settings.prepare_workers), queue, transcribe_queue, _prepare),
+        ("transcribe", workers, transcribe_queue, deliver_queue, _transcribe),
+        ("deliver", 1, deliver_queue, None, _deliver),
+    ]
+    if batching:
+        stages.pop(1)
+    tasks = [
+        asyncio.create_task(
+            stage_loop(f"{name}-{index}", inbox, outbox, handler, bot, storage, state, queue.release)
+        )
+        for name, count, inbox, outbox, handler in stages
+        for index in range(count)
+    ]
+    if batching:
+        logger.info(
+            "Batching short notes: up to %s per batch, %sms window",
+            settings.batch_max_size,
+            settings.batch_wait_ms,
+        )
+        tasks += [
+            asyncio.create_task(
+                batch_stage_loop(
+                    f"transcribe-{index}",
+                    transcribe_queue,
+                    deliver_queue,
+                    _transcribe,
+                    _transcribe_batch,
                     bot,
-                    job["chat_id"],
-                    status_message_id,
-                    f"Failed: {exc}",
+                    settings,
+                    storage,
+                    state,
+                    queue.release,
                 )
-        finally:
-            state["worker_busy"] = False
-            queue.task_done()
+            )
+            for index in range(workers)
+        ]
+    return tasks
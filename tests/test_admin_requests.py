@@ -22,3 +22,4 @@ async def test_approve_user_request_updates_user_flags(tmp_path: Path):
 
     request = await storage.get_request(req_id)
     assert request["status"] == "approved"
+    await storage.close()
@@ -11,6 +11,7 @@ async def test_chat_upsert_and_get(tmp_path):
     chat = await store.get_chat(1)
     assert chat["enabled"] is False
     assert chat["allowed_senders"] == "whitelist"
+    await store.close()
 
 
 @pytest.mark.asyncio
@@ -26,3 +27,19 @@ async def test_chat_settings_updates(tmp_path):
     assert chat["enabled"] is True
     assert chat["allowed_senders"] == "all"
     assert chat["require_reply"] is True
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_noop_upsert_releases_write_lock(tmp_path):
+    db_path = tmp_path / "test.db"
+    await init_db(str(db_path))
+    store = Storage(str(db_path))
+    other = Storage(str(db_path), busy_timeout_ms=100)
+    await store.upsert_chat(chat_id=1, title="Test", type_="group")
+    await store.upsert_chat(chat_id=1, title="Test", type_="group")
+    await other.set_chat_enabled(1, True)
+    chat = await other.get_chat(1)
+    assert chat["enabled"] is True
+    await other.close()
+    await store.close()
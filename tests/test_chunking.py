@@ -0,0 +1,51 @@
+import numpy as np
+
+from transkript_bot.transcription.chunking import plan_chunks, transcribe_chunks
+from transkript_bot.transcription.media import SAMPLE_RATE
+
+
+def test_plan_chunks_cuts_in_pauses():
+    speech = [(0, 40), (50, 90), (100, 140), (160, 190)]
+    assert plan_chunks(speech, total_samples=200, target_samples=100) == [(0, 95), (95, 200)]
+    assert plan_chunks(speech, total_samples=200, target_samples=1000) == [(0, 200)]
+    assert plan_chunks([(0, 500)], total_samples=600, target_samples=100) == [(0, 600)]
+
+
+def test_transcribe_chunks_stitches_ordered_segments():
+    audio = np.zeros(30 * SAMPLE_RATE, dtype=np.float32)
+    chunks = [(0, 10 * SAMPLE_RATE), (10 * SAMPLE_RATE, 20 * SAMPLE_RATE), (20 * SAMPLE_RATE, 30 * SAMPLE_RATE)]
+    languages = []
+    progress = []
+
+    def transcribe(chunk, language):
+        languages.append(language)
+        return [{"start": 1.0, "end": 2.0, "text": "x"}], "ru"
+
+    segments = transcribe_chunks(audio, chunks, transcribe, language=None, workers=2, on_progress=progress.append)
+    assert [seg["start"] for seg in segments] == [1.0, 11.0, 21.0]
+    assert languages == [None, "ru", "ru"]
+    assert progress[-1] == 99
+
+
+def test_transcribe_chunks_streams_segments_of_chunks_done_in_order():
+    import threading
+
+    audio = np.concatenate([np.full(10 * SAMPLE_RATE, index, dtype=np.float32) for index in range(3)])
+    chunks = [(0, 10 * SAMPLE_RATE), (10 * SAMPLE_RATE, 20 * SAMPLE_RATE), (20 * SAMPLE_RATE, 30 * SAMPLE_RATE)]
+    later_done = threading.Semaphore(0)
+    streamed = []
+
+    def transcribe(chunk, language):
+        # The first chunk finishes last; nothing may be streamed ahead of it.
+        if int(chunk[0]) == 0:
+            later_done.acquire()
+            later_done.acquire()
+        else:
+            later_done.release()
+        return [{"start": 1.0, "end": 2.0, "text": "x"}], "ru"
+
+    segments = transcribe_chunks(
+        audio, chunks, transcribe, language="ru", workers=3, on_segment=lambda seg: streamed.append(seg["start"])
+    )
+    assert streamed == [1.0, 11.0, 21.0]
+    assert [seg["start"] for seg in segments] == streamed
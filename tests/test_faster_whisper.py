@@ -1,7 +1,64 @@
-from transkript_bot.transcription.faster_whisper import normalize_segments
+from types import SimpleNamespace
+
+import numpy as np
+
+from transkript_bot.transcription.faster_whisper import (
+    normalize_segments,
+    pack_clips,
+    run_faster_whisper,
+    split_by_clip,
+)
+from transkript_bot.transcription.media import SAMPLE_RATE
+from transkript_bot.transcription.model_cache import ModelCache
 
 
 def test_normalize_segments():
     segs = [{"start": 0.0, "end": 1.0, "text": "ok"}]
     out = normalize_segments(segs)
     assert out[0]["speaker"] == "SPEAKER_00"
+
+
+def test_pack_and_split_clips():
+    audios = [np.ones(SAMPLE_RATE, dtype=np.float32), np.ones(2 * SAMPLE_RATE, dtype=np.float32)]
+    joined, clips = pack_clips(audios, gap_samples=SAMPLE_RATE)
+    assert len(joined) == 5 * SAMPLE_RATE
+    assert clips == [{"start": 0.0, "end": 1.0}, {"start": 2.0, "end": 4.0}]
+
+    segments = [{"start": 0.1, "end": 0.9, "text": "a"}, {"start": 2.5, "end": 3.9, "text": "b"}]
+    assert split_by_clip(segments, clips) == [
+        [{"start": 0.1, "end": 0.9, "text": "a"}],
+        [{"start": 0.5, "end": 1.9, "text": "b"}],
+    ]
+
+
+class _FakeModel:
+    def __init__(self):
+        self.audio_lengths = []
+
+    def transcribe(self, audio, **kwargs):
+        self.audio_lengths.append(len(audio))
+        seconds = len(audio) / SAMPLE_RATE
+        segments = [
+            SimpleNamespace(start=0.0, end=seconds / 2, text="a"),
+            SimpleNamespace(start=seconds / 2, end=seconds, text="b"),
+        ]
+        return iter(segments), SimpleNamespace(duration=seconds, language="ru")
+
+
+def test_run_faster_whisper_resumes_from_checkpoint():
+    model = _FakeModel()
+    cache = ModelCache(budget_mb=1 << 20, loader=lambda *args, **kwargs: model)
+    streamed = []
+    segments = run_faster_whisper(
+        np.zeros(10 * SAMPLE_RATE, dtype=np.float32),
+        model_size="small",
+        language="ru",
+        device="cpu",
+        compute_type="int8",
+        model_cache=cache,
+        on_segment=streamed.append,
+        start_sec=6.0,
+    )
+    assert model.audio_lengths == [4 * SAMPLE_RATE]
+    assert [(seg["start"], seg["end"]) for seg in segments] == [(6.0, 8.0), (8.0, 10.0)]
+    assert streamed == segments
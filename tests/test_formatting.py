@@ -1,4 +1,4 @@
-from transkript_bot.transcription.formatting import segments_to_txt
+from transkript_bot.transcription.formatting import segments_to_srt, segments_to_txt, segments_to_vtt
 
 
 def test_segments_to_txt():
@@ -6,3 +6,9 @@ def test_segments_to_txt():
     out = segments_to_txt(segments)
     assert "SPEAKER_00" in out
     assert "Привет" in out
+
+
+def test_subtitle_renderers():
+    segments = [{"start": 3661.5, "end": 3662.25, "speaker": "SPEAKER_00", "text": " Hi "}, {"start": 1, "end": 2, "text": ""}]
+    assert segments_to_srt(segments) == "1\n01:01:01,500 --> 01:01:02,250\nSPEAKER_00: Hi\n"
+    assert segments_to_vtt(segments) == "WEBVTT\n\n01:01:01.500 --> 01:01:02.250\n<v SPEAKER_00>Hi\n"
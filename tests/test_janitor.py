@@ -0,0 +1,50 @@
+import json
+import os
+import time
+
+import pytest
+
+from transkript_bot.services.janitor import MediaJanitor
+from transkript_bot.storage.db import Storage, init_db
+
+
+def _touch(path, size, age):
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_janitor_purges_orphans_and_applies_disk_pressure(tmp_path):
+    db_path = tmp_path / "test.db"
+    await init_db(str(db_path))
+    store = Storage(str(db_path))
+    media = tmp_path / "media"
+    media.mkdir()
+    failed = await store.create_job(chat_id=1, user_id=2, status="failed")
+    running = await store.create_job(chat_id=1, user_id=2, status="running")
+    old_seg = _touch(media / "90.seg", 100, age=7200)
+    new_seg = _touch(media / "91.seg", 100, age=3600)
+    done = await store.create_job(
+        chat_id=1, user_id=2, status="done", output_paths=json.dumps({"segments": str(old_seg)})
+    )
+    _touch(media / f"{failed}.bin", 50, age=3600)
+    _touch(media / f"{failed}.partial.jsonl", 10, age=3600)
+    _touch(media / f"{running}.wav", 50, age=3600)
+    _touch(media / "99.seg", 100, age=0)
+
+    usage = {"total_bytes": 10_000, "free_bytes": 2_000, "free_pct": 20.0}
+    janitor = MediaJanitor(
+        store, str(media), retention_sec=86400, max_bytes=0, min_free_pct=10.0, disk_usage=lambda _: usage
+    )
+    assert await janitor.run_once() == 2
+    assert {p.name for p in media.iterdir()} == {"90.seg", "91.seg", "99.seg", f"{running}.wav"}
+
+    # 50 bytes short of the 10% floor: the oldest output goes, the one inside the grace window stays.
+    usage.update(free_bytes=950, free_pct=9.5)
+    assert await janitor.run_once() == 1
+    assert not old_seg.exists() and new_seg.exists()
+    assert (await store.get_job(done))["output_paths"] is None
+    assert janitor.stats()["removed_files"] == 3
+    await store.close()
@@ -0,0 +1,52 @@
+import pytest
+
+from transkript_bot.services.job_metrics import (
+    format_job_metrics,
+    metrics_row,
+    percentile,
+    sqlite_timestamp,
+    summarize_job_metrics,
+)
+from transkript_bot.storage.db import Storage, init_db
+
+
+def test_percentile_and_summary():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile(list(range(1, 101)), 95) == 95
+    rows = [
+        {"backend": "faster", "download_sec": 1.0, "transcribe_sec": 10.0, "total_sec": 12.0, "rtf": 0.2},
+        {"backend": "faster", "download_sec": 3.0, "transcribe_sec": None, "total_sec": 4.0, "rtf": None},
+    ]
+    summary = summarize_job_metrics(rows)
+    assert summary["faster"]["download"] == {"p50": 1.0, "p95": 3.0, "count": 2}
+    assert summary["faster"]["transcribe"]["count"] == 1
+    assert "faster (2 jobs): download 1.00/3.00s" in format_job_metrics(summary)
+
+
+def test_metrics_row_rtf_and_queue_wait():
+    assert sqlite_timestamp("1970-01-01 00:01:40") == 100.0
+    job = {
+        "backend": "faster",
+        "started_at": 100.0,
+        "audio_sec": 60.0,
+        "transcribed_audio_sec": 40.0,
+        "timings": {"queue_wait": 5.0, "transcribe": 10.0, "model": 2.0},
+    }
+    row = metrics_row(job, finished_at=120.0)
+    assert row["rtf"] == 0.25
+    assert row["total_sec"] == 25.0
+    assert row["model_sec"] == 2.0
+    assert "download_sec" not in row
+
+
+@pytest.mark.asyncio
+async def test_storage_records_job_metrics(tmp_path):
+    db_path = tmp_path / "test.db"
+    await init_db(str(db_path))
+    store = Storage(str(db_path))
+    await store.record_job_metrics(1, {"backend": "faster", "download_sec": 1.5, "created_at": 10.0})
+    await store.record_job_metrics(2, {"backend": "whisperx", "transcribe_sec": 3.0, "created_at": 20.0})
+    rows = await store.list_job_metrics(limit=10)
+    assert [row["job_id"] for row in rows] == [2, 1]
+    assert rows[1]["download_sec"] == 1.5
+    await store.close()
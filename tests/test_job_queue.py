@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from transkript_bot.services.job_queue import JobQueue
+from transkript_bot.storage.db import Storage, init_db
+
+
+@pytest.mark.asyncio
+async def test_job_queue_claims_by_priority_then_age(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    storage = Storage(db_path)
+    low = await storage.create_job(chat_id=1, user_id=1, status="queued")
+    high = await storage.create_job(chat_id=1, user_id=1, status="queued", priority=5)
+    queue = JobQueue(storage)
+    await queue.recover()
+    assert queue.qsize() == 2
+
+    first = await queue.get()
+    second = await queue.get()
+    assert [first["id"], second["id"]] == [high, low]
+    assert queue.empty()
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_job_queue_recovers_expired_leases(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    storage = Storage(db_path)
+    job_id = await storage.create_job(chat_id=1, user_id=1, status="queued")
+    crashed = JobQueue(storage, lease_sec=60)
+    await crashed.get()
+    await storage.update_job(job_id, lease_expires_at=time.time() - 1)
+
+    restarted = JobQueue(storage)
+    assert await restarted.recover() == 1
+    job = await restarted.get()
+    assert job["id"] == job_id
+    assert job["attempts"] == 2
+    await storage.close()
+
+
+class FakeBot:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_message_text(self, **kwargs):
+        self.edits.append(kwargs)
+
+
+@pytest.mark.asyncio
+async def test_job_queue_reports_jobs_given_up_on(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    storage = Storage(db_path)
+    leader = await storage.create_job(chat_id=1, user_id=1, status="queued", status_message_id=10)
+    await storage.create_job(chat_id=2, user_id=2, status="waiting", coalesced_into=leader, status_message_id=20)
+    await storage.update_job(leader, status="running", attempts=3, lease_expires_at=time.time() - 1)
+
+    bot = FakeBot()
+    queue = JobQueue(storage, max_attempts=3, bot=bot)
+    assert await queue.recover() == 0
+    assert [(edit["chat_id"], edit["message_id"]) for edit in bot.edits] == [(1, 10), (2, 20)]
+    assert all(edit["text"].startswith("Failed:") for edit in bot.edits)
+    await storage.close()
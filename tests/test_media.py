@@ -1,6 +1,44 @@
-from transkript_bot.transcription.media import build_ffmpeg_cmd
+import pytest
+
+from transkript_bot.transcription.media import PcmBuffer, build_ffmpeg_cmd, build_ffmpeg_pcm_cmd, run_ffmpeg
 
 
 def test_build_ffmpeg_cmd():
     cmd = build_ffmpeg_cmd("in.mp4", "out.wav")
     assert cmd[:2] == ["ffmpeg", "-y"]
+
+
+def test_build_ffmpeg_pcm_cmd_streams_to_stdout():
+    cmd = build_ffmpeg_pcm_cmd("in.ogg")
+    assert cmd[-1] == "pipe:1"
+    assert "f32le" in cmd
+
+
+@pytest.mark.asyncio
+async def test_run_ffmpeg_times_out_and_kills_process():
+    with pytest.raises(TimeoutError):
+        await run_ffmpeg(["sleep", "5"], timeout=0.1)
+
+
+def test_pcm_buffer_grows_in_memory_and_mmap(tmp_path):
+    import numpy as np
+
+    samples = np.arange(10, dtype=np.float32)
+    for buffer in (PcmBuffer(4), PcmBuffer(4, mmap_path=str(tmp_path / "a.pcm"))):
+        buffer.write(samples[:3].tobytes())
+        buffer.write(samples[3:].tobytes())
+        assert buffer.array().tolist() == samples.tolist()
+
+
+def test_pcm_buffer_spills_to_disk_instead_of_growing_in_memory(tmp_path):
+    import numpy as np
+
+    samples = np.arange(10, dtype=np.float32)
+    spill = tmp_path / "b.pcm"
+    buffer = PcmBuffer(4, spill_path=str(spill))
+    buffer.write(samples[:4].tobytes())
+    assert not buffer.spilled
+    buffer.write(samples[4:].tobytes())
+    assert buffer.spilled
+    assert spill.exists()
+    assert buffer.array().tolist() == samples.tolist()
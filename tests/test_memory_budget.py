@@ -0,0 +1,20 @@
+import asyncio
+
+import pytest
+
+from transkript_bot.services.memory_budget import MemoryBudget
+
+
+@pytest.mark.asyncio
+async def test_memory_budget_rejects_oversized_and_waits_for_release():
+    budget = MemoryBudget(limit_bytes=100)
+    assert await budget.acquire(150) is False
+    assert await budget.acquire(80) is True
+
+    waiter = asyncio.create_task(budget.acquire(40))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    await budget.release(80)
+    assert await asyncio.wait_for(waiter, 1) is True
+    assert budget.used_bytes == 40
+    assert budget.peak_bytes == 80
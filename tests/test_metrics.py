@@ -0,0 +1,38 @@
+import pytest
+from aiohttp import ClientSession
+
+from transkript_bot.services.metrics import MetricsRegistry, register_app_metrics, start_metrics_server
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors").inc(method="SendMessage")
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+    registry.collect("depth", "Depth", lambda: 3)
+    text = registry.render()
+    assert '# TYPE transkript_errors_total counter' in text
+    assert 'transkript_errors_total{method="SendMessage"} 1.0' in text
+    assert 'transkript_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'transkript_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'transkript_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "transkript_latency_seconds_count 3" in text
+    assert "transkript_depth 3" in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_registry(unused_tcp_port):
+    registry = MetricsRegistry()
+    register_app_metrics(registry, {"workers": {"transcribe-0": 7, "deliver-0": None}})
+    runner = await start_metrics_server(registry, "127.0.0.1", unused_tcp_port)
+    try:
+        async with ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{unused_tcp_port}/metrics") as response:
+                body = await response.text()
+        assert response.status == 200
+        assert "transkript_workers_busy 1" in body
+        assert "transkript_process_rss_bytes" in body
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,27 @@
+from transkript_bot.transcription.model_cache import ModelCache, estimate_model_mb
+
+
+def _loader(model_size, device, compute_type, **options):
+    return object()
+
+
+def test_model_cache_reuses_loaded_model():
+    cache = ModelCache(budget_mb=4096, loader=_loader)
+    first = cache.get("small", "cpu", "int8")
+    second = cache.get("small", "cpu", "int8")
+    assert first is second
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_model_cache_evicts_least_recently_used():
+    budget = estimate_model_mb("small", "int8") + estimate_model_mb("base", "int8")
+    cache = ModelCache(budget_mb=budget, loader=_loader)
+    cache.get("small", "cpu", "int8")
+    cache.get("base", "cpu", "int8")
+    cache.get("small", "cpu", "int8")
+    cache.get("tiny", "cpu", "int8")
+    assert cache.stats()["evictions"] == 1
+    cache.get("small", "cpu", "int8")
+    assert cache.stats()["hits"] == 2
@@ -0,0 +1,42 @@
+from transkript_bot.services.progress import format_progress
+from transkript_bot.transcription.partial import PartialTranscript, read_partial_checkpoint, read_partial_segments
+
+
+def test_partial_transcript_flushes_each_segment(tmp_path):
+    jsonl = tmp_path / "1.partial.jsonl"
+    txt = tmp_path / "1.partial.txt"
+    partial = PartialTranscript(jsonl, txt, tail_chars=12)
+    partial.append({"start": 0.0, "end": 1.0, "text": " hello", "speaker": "SPEAKER_00"})
+    assert read_partial_segments(jsonl) == [{"start": 0.0, "end": 1.0, "text": " hello", "speaker": "SPEAKER_00"}]
+    assert "hello" in txt.read_text(encoding="utf-8")
+    assert partial.tail() == "hello"
+
+    partial.append({"start": 1.0, "end": 2.0, "text": "big world", "speaker": "SPEAKER_00"})
+    assert partial.tail() == "…big world"
+    assert "…big world" in format_progress(stage="transcribing", transcribe_percent=50, tail=partial.tail())
+    partial.remove()
+    assert not jsonl.exists() and not txt.exists()
+
+
+def test_read_partial_segments_stops_at_torn_line(tmp_path):
+    jsonl = tmp_path / "2.partial.jsonl"
+    jsonl.write_text('{"start": 0.0, "end": 1.0, "text": "a"}\n{"start": 1.0, "en', encoding="utf-8")
+    assert [seg["text"] for seg in read_partial_segments(jsonl)] == ["a"]
+    assert read_partial_segments(tmp_path / "missing.jsonl") == []
+
+
+def test_resume_after_torn_line_keeps_later_segments(tmp_path):
+    jsonl = tmp_path / "3.partial.jsonl"
+    txt = tmp_path / "3.partial.txt"
+    jsonl.write_text('{"start": 0.0, "end": 1.0, "text": "a"}\n{"start": 1.0, "en', encoding="utf-8")
+    txt.write_text("stale\n", encoding="utf-8")
+    resumed, size = read_partial_checkpoint(jsonl)
+    partial = PartialTranscript(jsonl, txt, append=True)
+    partial.restore(resumed, size)
+    partial.append({"start": 1.0, "end": 2.0, "text": "b"})
+    partial.append({"start": 2.0, "end": 3.0, "text": "c"})
+    partial.close()
+    assert [seg["text"] for seg in read_partial_segments(jsonl)] == ["a", "b", "c"]
+    text = txt.read_text(encoding="utf-8")
+    assert "stale" not in text and all(word in text for word in ("a", "b", "c"))
+    assert partial.count == 3
@@ -0,0 +1,34 @@
+import pytest
+
+from transkript_bot.services.pipeline import StageQueue, format_pipeline_stats, gather_batch, pipeline_empty
+
+
+@pytest.mark.asyncio
+async def test_stage_queue_tracks_depth_and_wait():
+    stage = StageQueue("transcribe", maxsize=2)
+    await stage.put({"id": 1})
+    assert stage.snapshot()["depth"] == 1
+    assert pipeline_empty({"pipeline": {"transcribe": stage}}) is False
+    item = await stage.get()
+    stage.task_done()
+    assert item == {"id": 1}
+    snap = stage.snapshot()
+    assert snap["depth"] == 0
+    assert snap["wait_max_sec"] >= 0.0
+    assert "transcribe: depth 0/2" in format_pipeline_stats({"pipeline": {"transcribe": stage}})
+
+
+@pytest.mark.asyncio
+async def test_gather_batch_stops_at_non_batchable_item():
+    stage = StageQueue("transcribe", maxsize=8)
+    for item in ({"id": 2, "short": True}, {"id": 3, "short": False}, {"id": 4, "short": True}):
+        await stage.put(item)
+    batch, carry = await gather_batch(
+        stage, {"id": 1, "short": True}, max_size=4, wait_sec=0.05, accept=lambda job: job["short"]
+    )
+    assert [job["id"] for job in batch] == [1, 2]
+    assert carry["id"] == 3
+
+    batch, carry = await gather_batch(stage, {"id": 5, "short": True}, max_size=4, wait_sec=0.05, accept=lambda job: True)
+    assert [job["id"] for job in batch] == [5, 4]
+    assert carry is None
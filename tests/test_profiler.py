@@ -0,0 +1,22 @@
+import time
+
+from transkript_bot.services.profiler import SamplingProfiler
+
+
+def _spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler(interval_sec=0.001)
+    profiler.start()
+    _spin(0.2)
+    profiler.stop()
+    assert profiler.samples > 0
+    lines = profiler.write(tmp_path / "1.folded").read_text(encoding="utf-8").splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;")
+    assert stack.endswith("test_profiler:_spin")
+    assert int(count) > 0
@@ -1,6 +1,48 @@
-from transkript_bot.services.queue import estimate_eta
+import pytest
+
+from transkript_bot.services.queue import EtaModel, estimate_eta, format_queue_status
 
 
 def test_eta_from_history():
     durations = [60, 120, 90]
     assert estimate_eta(durations, position=3) == 180
+
+
+def test_queue_status_text():
+    assert format_queue_status(2, 90) == "Queued. Position: 2. ETA: 90 sec."
+    assert format_queue_status(1, -1) == "Queued. Position: 1. ETA: unknown."
+
+
+def test_eta_model_learns_rtf_and_sums_audio_ahead():
+    model = EtaModel("faster", "small", workers=2, default_rtf=1.0, overhead_sec=0.0)
+    model.observe("faster", "small", audio_sec=100, elapsed_sec=50)
+    model.observe("whisperx", "small", audio_sec=100, elapsed_sec=10)
+    assert model.rtf() == 0.5
+    assert model.rtf("whisperx") == 0.1
+
+    assert model.estimate(60) == 30
+    model.enqueue(1, 7200)
+    model.enqueue(2, 60)
+    assert model.estimate(60) == (3600 + 30) // 2 + 30
+
+    model.start(1, now=1000.0)
+    assert [(job_id, position, eta) for job_id, _, position, eta in model.queued_etas(now=1000.0)] == [
+        (2, 1, 1800 + 30)
+    ]
+    model.finish(1, audio_sec=7200, elapsed_sec=7200 * 0.3)
+    assert model.rtf() < 0.5
+    assert model.queued_etas(now=1000.0)[0][3] == int(model.job_seconds(60))
+
+
+def test_eta_model_seeds_from_job_metrics():
+    model = EtaModel("faster", "small", default_rtf=1.0, overhead_sec=5.0, alpha=1.0)
+    model.seed(
+        [
+            {"backend": "faster", "audio_sec": 100.0, "transcribe_sec": 20.0, "cached": 0},
+            {"backend": "faster", "audio_sec": 100.0, "transcribe_sec": None, "cached": 1},
+            {"backend": "faster", "audio_sec": 100.0, "transcribe_sec": 80.0, "cached": 0},
+        ]
+    )
+    # Newest row wins with alpha=1; the overhead is not subtracted from transcribe_sec.
+    assert model.rtf() == pytest.approx(0.2)
+    assert model.samples == 2
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, GetMe, SendMediaGroup, SendMessage
+from aiogram.types import InputMediaDocument
+
+from transkript_bot.services.rate_governor import RateGovernor, TokenBucket
+
+
+def test_token_bucket_books_slots_in_order():
+    bucket = TokenBucket(rate=10.0, capacity=1.0)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+    bucket.pause(1.0)
+    assert bucket.reserve() >= 1.0
+
+
+@pytest.mark.asyncio
+async def test_superseded_edits_are_coalesced():
+    governor = RateGovernor(chat_rate=20.0)
+    sent = []
+
+    async def make_request(bot, method):
+        sent.append(getattr(method, "text", None))
+        return len(sent)
+
+    edits = [EditMessageText(chat_id=1, message_id=5, text=f"{percent}%") for percent in (10, 20, 30, 40)]
+    first = await governor(make_request, None, edits[0])
+    results = await asyncio.gather(*(governor(make_request, None, edit) for edit in edits[1:]))
+    assert sent == ["10%", "40%"]
+    assert first == 1
+    assert results == [2, 2, 2]
+    assert governor.stats()["coalesced"] == 2
+
+    await governor(make_request, None, GetMe())
+    assert sent[-1] is None
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honored():
+    governor = RateGovernor(max_retries=2)
+    calls = 0
+
+    async def make_request(bot, method):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0)
+        return "ok"
+
+    assert await governor(make_request, None, SendMessage(chat_id=2, text="hi")) == "ok"
+    assert calls == 2
+    assert governor.stats()["retry_after"] == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_waiter_outlives_cancelled_owner():
+    governor = RateGovernor(chat_rate=10.0)
+    sent = []
+
+    async def make_request(bot, method):
+        sent.append(method.text)
+        return method.text
+
+    def edit(text):
+        return EditMessageText(chat_id=1, message_id=5, text=text)
+
+    await governor(make_request, None, edit("0%"))
+    owner = asyncio.create_task(governor(make_request, None, edit("10%")))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(governor(make_request, None, edit("20%")))
+    await asyncio.sleep(0)
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+    assert await follower == "20%"
+    assert sent == ["0%", "20%"]
+
+    # With nobody left waiting, a cancelled owner's edit is dropped rather than sent.
+    owner = asyncio.create_task(governor(make_request, None, edit("30%")))
+    await asyncio.sleep(0)
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    assert await governor(make_request, None, edit("40%")) == "40%"
+    assert sent == ["0%", "20%", "40%"]
+
+
+@pytest.mark.asyncio
+async def test_media_group_costs_one_token_per_item():
+    governor = RateGovernor(chat_rate=20.0)
+    album = SendMediaGroup(chat_id=3, media=[InputMediaDocument(media=f"file-{index}") for index in range(3)])
+
+    async def make_request(bot, method):
+        return "ok"
+
+    started_at = time.monotonic()
+    assert await governor(make_request, None, album) == "ok"
+    # One token is available up front; the other two items wait 2 / 20 s for theirs.
+    assert time.monotonic() - started_at >= 0.09
+    assert governor.stats()["throttled"] == 1
@@ -19,6 +19,7 @@ async def test_auto_request_created_for_denied_user(tmp_path: Path):
     assert pending is not None
     assert pending["status"] == "pending"
     assert pending["id"] == request_id
+    await storage.close()
 
 
 @pytest.mark.asyncio
@@ -33,3 +34,4 @@ async def test_chat_request_created(tmp_path: Path):
     assert pending is not None
     assert pending["status"] == "pending"
     assert pending["id"] == request_id
+    await storage.close()
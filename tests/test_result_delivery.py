@@ -0,0 +1,95 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import BufferedInputFile, FSInputFile
+
+from transkript_bot.routers.media import send_result_file
+from transkript_bot.storage.db import Storage, init_db
+from transkript_bot.transcription.segment_store import RenderCache, write_segments
+
+
+class FakeBot:
+    def __init__(self):
+        self.calls = []
+        self._next_id = 100
+
+    def _message(self, document):
+        self._next_id += 1
+        file_id = document if isinstance(document, str) else f"id-{document.filename}"
+        return SimpleNamespace(message_id=self._next_id, document=SimpleNamespace(file_id=file_id))
+
+    async def send_document(self, *, chat_id, document, message_thread_id=None):
+        self.calls.append(("document", [document]))
+        return self._message(document)
+
+    async def send_media_group(self, *, chat_id, media, message_thread_id=None):
+        self.calls.append(("group", [item.media for item in media]))
+        return [self._message(item.media) for item in media]
+
+    async def delete_message(self, *, chat_id, message_id):
+        return True
+
+
+def _query(bot, data):
+    answers = []
+
+    async def answer(text=None, show_alert=False):
+        answers.append(text)
+
+    message = SimpleNamespace(chat=SimpleNamespace(id=1), message_id=10, message_thread_id=None)
+    return SimpleNamespace(data=data, message=message, bot=bot, answer=answer), answers
+
+
+@pytest.mark.asyncio
+async def test_result_files_upload_once_then_reuse_file_ids(tmp_path):
+    db_path = tmp_path / "test.db"
+    await init_db(str(db_path))
+    store = Storage(str(db_path))
+    paths = {}
+    for kind in ("txt", "md", "json"):
+        path = tmp_path / f"out.{kind}"
+        path.write_text("x", encoding="utf-8")
+        paths[kind] = str(path)
+    job_id = await store.create_job(chat_id=1, user_id=2, status="done", output_paths=json.dumps(paths))
+    bot = FakeBot()
+
+    query, answers = _query(bot, f"job:file:{job_id}:txt")
+    await send_result_file(query, store, {})
+    query, answers = _query(bot, f"job:file:{job_id}:all")
+    await send_result_file(query, store, {})
+    query, answers = _query(bot, f"job:file:{job_id}:all")
+    await send_result_file(query, store, {})
+
+    assert bot.calls[0][0] == "document" and isinstance(bot.calls[0][1][0], FSInputFile)
+    kind, media = bot.calls[1]
+    assert kind == "group"
+    assert media[0] == "id-out.txt"
+    assert all(isinstance(item, FSInputFile) for item in media[1:])
+    assert bot.calls[2] == ("group", ["id-out.txt", "id-out.md", "id-out.json"])
+    assert answers == ["Sent 3 file(s)"]
+    job = await store.get_job(job_id)
+    assert json.loads(job["tg_file_ids"]) == {"txt": "id-out.txt", "md": "id-out.md", "json": "id-out.json"}
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_result_files_render_from_segment_store(tmp_path):
+    db_path = tmp_path / "test.db"
+    await init_db(str(db_path))
+    store = Storage(str(db_path))
+    seg_path = tmp_path / "7.seg"
+    write_segments(seg_path, [{"start": 0.0, "end": 1.0, "speaker": "SPEAKER_00", "text": "hello"}])
+    job_id = await store.create_job(
+        chat_id=1, user_id=2, status="done", output_paths=json.dumps({"segments": str(seg_path)})
+    )
+    bot = FakeBot()
+
+    query, answers = _query(bot, f"job:file:{job_id}:srt")
+    await send_result_file(query, store, {"render_cache": RenderCache()})
+    document = bot.calls[0][1][0]
+    assert isinstance(document, BufferedInputFile)
+    assert document.filename == f"{job_id}.srt"
+    assert b"SPEAKER_00: hello" in document.data
+    assert answers == ["Sent 1 file(s)"]
+    await store.close()
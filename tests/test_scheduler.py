@@ -0,0 +1,36 @@
+from transkript_bot.config import Settings
+from transkript_bot.services.scheduler import (
+    any_worker_busy,
+    format_workers,
+    threads_per_worker,
+    worker_count,
+    workers_by_stage,
+)
+
+
+def test_worker_count_per_backend():
+    settings = Settings(_env_file=None, workers_cpu=4, workers_gpu=2)
+    assert worker_count(settings, "faster") == 4
+    assert worker_count(settings, "whisperx") == 2
+
+
+def test_threads_per_worker():
+    assert threads_per_worker(16, 4) == 4
+    assert threads_per_worker(2, 8) == 1
+    assert threads_per_worker(16, 4, override=2) == 2
+
+
+def test_any_worker_busy():
+    assert any_worker_busy({"workers": {0: None, 1: 5}}) is True
+    assert any_worker_busy({"workers": {0: None}}) is False
+
+
+def test_workers_are_counted_per_stage():
+    state = {"workers": {"download-0": 7, "download-1": None, "transcribe-0": 6, "deliver-0": None}}
+    assert workers_by_stage(state) == {
+        "download": {"busy": 1, "total": 2},
+        "transcribe": {"busy": 1, "total": 1},
+        "deliver": {"busy": 0, "total": 1},
+    }
+    assert format_workers(state) == "Workers busy: download 1/2, transcribe 1/1, deliver 0/1"
+    assert format_workers({}) == "Workers: none"
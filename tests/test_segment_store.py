@@ -0,0 +1,20 @@
+import json
+
+from transkript_bot.transcription.segment_store import RenderCache, read_segments, write_segments
+
+
+def test_segment_store_round_trip_and_lazy_renders(tmp_path):
+    segments = [
+        {"start": 0.0, "end": 1.234, "speaker": "SPEAKER_00", "text": "Привет"},
+        {"start": 1.5, "end": 2.0, "text": "no speaker"},
+    ]
+    path = tmp_path / "1.seg"
+    write_segments(path, segments)
+    assert read_segments(path) == segments
+
+    renders = RenderCache(max_entries=1)
+    assert json.loads(renders.render(path, "json"))["segments"] == segments
+    assert renders.render(path, "json") == renders.render(path, "json")
+    assert b"SPEAKER_00" in renders.render(path, "txt")
+    assert renders.stats()["entries"] == 1
+    assert renders.stats()["hits"] == 2
@@ -19,3 +19,4 @@ async def test_stats_counts(tmp_path):
     assert stats["users_blocked"] == 1
     assert stats["chats_total"] == 1
     assert stats["jobs_total"] == 1
+    await store.close()
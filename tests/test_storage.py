@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from transkript_bot.storage.db import init_db, Storage
 
@@ -10,6 +12,7 @@ async def test_user_allowlist(tmp_path):
     await store.set_user_allowed(123, True)
     u = await store.get_user(123)
     assert u["is_allowed"] is True
+    await store.close()
 
 
 @pytest.mark.asyncio
@@ -20,6 +23,7 @@ async def test_user_blocked(tmp_path):
     await store.set_user_blocked(321, True)
     u = await store.get_user(321)
     assert u["is_blocked"] is True
+    await store.close()
 
 
 @pytest.mark.asyncio
@@ -31,3 +35,100 @@ async def test_job_durations(tmp_path):
     await store.update_job(job_id, status="done", started_at=10.0, finished_at=25.0)
     durations = await store.get_recent_durations(limit=5)
     assert durations[0] == 15
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_storage_reuses_pooled_wal_connections(tmp_path):
+    db_path = tmp_path / "test.db"
+    await init_db(str(db_path))
+    store = Storage(str(db_path), pool_size=2)
+    await asyncio.gather(*(store.set_user_allowed(i, True) for i in range(10)))
+    assert store._opened <= 2
+    async with store._connection() as db:
+        async with db.execute("PRAGMA journal_mode") as cursor:
+            row = await cursor.fetchone()
+    assert row[0] == "wal"
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_init_db_adds_columns_to_existing_jobs_table(tmp_path):
+    import aiosqlite
+
+    db_path = str(tmp_path / "old.db")
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            """
+            CREATE TABLE jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                message_id INTEGER,
+                thread_id INTEGER,
+                file_id TEXT,
+                file_name TEXT,
+                duration_sec REAL,
+                backend TEXT,
+                status TEXT NOT NULL,
+                status_message_id INTEGER,
+                progress_message_id INTEGER,
+                queued_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                started_at TEXT,
+                finished_at TEXT,
+                error TEXT,
+                output_paths TEXT
+            )
+            """
+        )
+        await db.commit()
+    await init_db(db_path)
+    store = Storage(db_path)
+    job_id = await store.create_job(chat_id=1, user_id=2, status="queued", priority=1, file_size=10)
+    assert job_id == 1
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_attach_coalesced_job_requires_inflight_leader(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    store = Storage(db_path)
+    leader = await store.create_job(chat_id=1, user_id=1, status="running", file_unique_id="u1")
+    follower = await store.attach_coalesced_job(leader, chat_id=2, user_id=2, file_unique_id="u1", status_message_id=7)
+    assert await store.list_coalesced_jobs(leader) == [
+        {"id": follower, "chat_id": 2, "message_id": None, "thread_id": None, "status_message_id": 7}
+    ]
+
+    await store.update_job(leader, status="done")
+    assert await store.attach_coalesced_job(leader, chat_id=3, user_id=3, file_unique_id="u1") is None
+    assert await store.count_jobs("waiting") == 1
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_jobs_follow_inflight_leader(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    store = Storage(db_path)
+    leader = await store.create_job(chat_id=1, user_id=1, status="queued", file_unique_id="u1")
+    assert (await store.find_inflight_job("u1"))["id"] == leader
+    assert await store.find_inflight_job("u2") is None
+
+    follower = await store.create_job(
+        chat_id=2, user_id=2, status="waiting", file_unique_id="u1", coalesced_into=leader, status_message_id=7
+    )
+    assert (await store.find_inflight_job("u1"))["id"] == leader
+    assert [job["id"] for job in await store.list_coalesced_jobs(leader)] == [follower]
+
+    await store.update_job(leader, status="running", attempts=3, lease_expires_at=0.0)
+    assert await store.requeue_expired_jobs(now=1.0, max_attempts=3) == (
+        0,
+        [
+            {"id": leader, "chat_id": 1, "status_message_id": None},
+            {"id": follower, "chat_id": 2, "status_message_id": 7},
+        ],
+    )
+    assert await store.list_coalesced_jobs(leader) == []
+    assert await store.find_inflight_job("u1") is None
+    await store.close()
@@ -18,6 +18,7 @@ async def test_requests_table_created(tmp_path: Path):
         chat_id=None,
         requested_by_id=123,
     )
+    await storage.close()
 
 
 @pytest.mark.asyncio
@@ -33,6 +34,7 @@ async def test_request_dedup_and_list(tmp_path: Path):
     pending = await storage.list_requests(kind="user", status="pending", limit=10, offset=0)
     assert len(pending) == 1
     assert pending[0]["user_id"] == 1
+    await storage.close()
 
 
 @pytest.mark.asyncio
@@ -47,3 +49,4 @@ async def test_request_status_update(tmp_path: Path):
     updated = await storage.get_request(req_id)
     assert updated["status"] == "approved"
     assert updated["reason"] == "ok"
+    await storage.close()
@@ -1,5 +1,11 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+
 from transkript_bot.config import Settings
-from transkript_bot.services.telegram_api import build_api_server
+from transkript_bot.services.telegram_api import build_api_server, fetch_file, locate_local_file, server_file_url
 
 
 def test_build_api_server_default():
@@ -13,3 +19,91 @@ def test_build_api_server_custom():
     server = build_api_server(settings)
     assert server.base.startswith("http://localhost:8081/")
     assert server.is_local is True
+
+
+def test_build_api_server_maps_mounted_dir():
+    settings = Settings(
+        _env_file=None,
+        bot_api_base_url="http://localhost:8081",
+        bot_api_server_dir="/var/lib/telegram-bot-api",
+        bot_api_local_dir="/mnt/bot-api",
+    )
+    server = build_api_server(settings)
+    local = server.wrap_local_file.to_local("/var/lib/telegram-bot-api/token/videos/file_1.mp4")
+    assert Path(local) == Path("/mnt/bot-api/token/videos/file_1.mp4")
+
+
+class FakeSession:
+    def __init__(self, api, chunks=()):
+        self.api = api
+        self.chunks = chunks
+        self.urls = []
+
+    async def stream_content(self, url, **_):
+        self.urls.append(url)
+        for chunk in self.chunks:
+            yield chunk
+
+
+class FakeBot:
+    token = "42:TEST"
+
+    def __init__(self, api, file_path, chunks=()):
+        self.session = FakeSession(api, chunks)
+        self.file_path = file_path
+        self.downloads = []
+
+    async def get_file(self, file_id):
+        return SimpleNamespace(file_id=file_id, file_path=self.file_path)
+
+    async def download(self, file_id, destination=None):
+        self.downloads.append(file_id)
+        Path(destination).write_bytes(b"copied")
+
+
+LOCAL_API = TelegramAPIServer.from_base("http://localhost:8081", is_local=True)
+
+
+@pytest.mark.asyncio
+async def test_local_file_is_located_on_the_shared_volume(tmp_path):
+    upload = tmp_path / "bot-api" / "videos" / "file_1.mp4"
+    upload.parent.mkdir(parents=True)
+    upload.write_bytes(b"video")
+    bot = FakeBot(LOCAL_API, str(upload))
+    assert await locate_local_file(bot, "file-1") == (upload, str(upload))
+
+    bot = FakeBot(LOCAL_API, "/nonexistent/videos/file_1.mp4")
+    assert await locate_local_file(bot, "file-1") == (None, "/nonexistent/videos/file_1.mp4")
+    assert await locate_local_file(FakeBot(PRODUCTION, "videos/file_1.mp4"), "file-1") == (None, None)
+
+
+def test_server_file_url_is_relative_to_the_server_dir():
+    server_path = "/var/lib/telegram-bot-api/42:TEST/videos/file_1.mp4"
+    url = server_file_url(LOCAL_API, "42:TEST", server_path, "/var/lib/telegram-bot-api")
+    assert url == "http://localhost:8081/file/bot42:TEST/42:TEST/videos/file_1.mp4"
+    assert server_file_url(LOCAL_API, "42:TEST", "/elsewhere/file_1.mp4", "/var/lib/telegram-bot-api") == (
+        "http://localhost:8081/file/bot42:TEST/elsewhere/file_1.mp4"
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_file_falls_back_to_http_when_volume_missing(tmp_path):
+    server_path = "/var/lib/telegram-bot-api/42:TEST/videos/file_1.mp4"
+    bot = FakeBot(LOCAL_API, server_path, chunks=(b"vi", b"deo"))
+    source = await fetch_file(bot, "file-1", tmp_path / "1.mp4", server_path=server_path)
+    assert source == str(tmp_path / "1.mp4")
+    assert (tmp_path / "1.mp4").read_bytes() == b"video"
+    assert bot.session.urls == ["http://localhost:8081/file/bot42:TEST/42:TEST/videos/file_1.mp4"]
+    assert bot.downloads == []
+
+    buffer = await fetch_file(bot, "file-1", None, server_path=server_path)
+    assert buffer.read() == b"video"
+
+
+@pytest.mark.asyncio
+async def test_fetch_file_uses_plain_download_without_a_server_path(tmp_path):
+    bot = FakeBot(PRODUCTION, "videos/file_1.mp4")
+    source = await fetch_file(bot, "file-1", tmp_path / "1.mp4")
+    assert source == str(tmp_path / "1.mp4")
+    assert bot.downloads == ["file-1"]
+    assert bot.session.urls == []
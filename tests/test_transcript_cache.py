@@ -0,0 +1,61 @@
+import pytest
+
+from transkript_bot.services.transcript_cache import TranscriptCache, hash_bytes, hash_file
+from transkript_bot.storage.db import Storage, init_db
+
+
+def _write_outputs(tmp_path, name: str, size: int) -> dict[str, str]:
+    paths = {}
+    for ext in ("txt", "md", "json"):
+        path = tmp_path / f"{name}.{ext}"
+        path.write_bytes(b"x" * size)
+        paths[ext] = str(path)
+    return paths
+
+
+def test_hash_file_matches_hash_bytes(tmp_path):
+    path = tmp_path / "input.ogg"
+    path.write_bytes(b"voice" * 1000)
+    assert hash_file(str(path), chunk_size=7) == hash_bytes(memoryview(b"voice" * 1000))
+
+
+@pytest.mark.asyncio
+async def test_transcript_cache_hit_by_unique_id_and_hash(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    storage = Storage(db_path)
+    cache = TranscriptCache(storage, max_bytes=1 << 20, max_age_sec=3600)
+    key = {"backend": "faster", "model": "small", "language": "ru"}
+    outputs = _write_outputs(tmp_path, "job_1", 10)
+
+    assert await cache.lookup(**key, file_unique_id="u1") is None
+    await cache.store(job_id=1, output_paths=outputs, file_unique_id="u1", content_hash="h1", **key)
+
+    assert await cache.lookup(**key, file_unique_id="u1") == outputs
+    assert await cache.lookup(**key, content_hash="h1") == outputs
+    assert await cache.lookup(**{**key, "model": "large-v3"}, content_hash="h1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 1)
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_transcript_cache_evicts_lru_and_drops_missing_files(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    storage = Storage(db_path)
+    cache = TranscriptCache(storage, max_bytes=100, max_age_sec=3600)
+    key = {"backend": "faster", "model": "small", "language": "ru"}
+    old = _write_outputs(tmp_path, "job_1", 20)
+    new = _write_outputs(tmp_path, "job_2", 20)
+    await cache.store(job_id=1, output_paths=old, content_hash="h1", **key)
+    await cache.store(job_id=2, output_paths=new, content_hash="h2", **key)
+
+    assert await cache.lookup(**key, content_hash="h1") is None
+    assert not (tmp_path / "job_1.txt").exists()
+    assert cache.stats()["entries"] == 1
+
+    (tmp_path / "job_2.md").unlink()
+    assert await cache.lookup(**key, content_hash="h2") is None
+    assert await storage.list_transcript_cache_lru() == []
+    await storage.close()
@@ -0,0 +1,58 @@
+import pytest
+
+from transkript_bot.storage.db import Storage, init_db
+from transkript_bot.storage.ttl_cache import TtlCache
+
+
+def test_ttl_cache_expiry_and_stale_write():
+    now = [0.0]
+    cache = TtlCache(10, clock=lambda: now[0])
+    cache.set("a", 1)
+    assert cache.get("a") == (True, 1)
+    now[0] = 11
+    assert cache.get("a") == (False, None)
+    generation = cache.generation
+    cache.invalidate("a")
+    cache.set("a", "stale", generation=generation)
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+
+def test_ttl_cache_drops_expired_and_oldest_entries_on_write():
+    now = [0.0]
+    cache = TtlCache(10, max_entries=3, clock=lambda: now[0])
+    for key in range(3):
+        cache.set(key, key)
+    cache.set(3, 3)
+    assert cache.stats()["entries"] == 3
+    assert cache.get(0) == (False, None)
+    now[0] = 20
+    cache.set("fresh", 1)
+    assert cache.stats()["entries"] == 1
+    assert cache.get("fresh") == (True, 1)
+
+@pytest.mark.asyncio
+async def test_storage_permission_cache_invalidated_by_writes(tmp_path):
+    db_path = tmp_path / "test.db"
+    await init_db(str(db_path))
+    store = Storage(str(db_path), permission_cache_ttl_sec=60)
+    assert await store.get_user(1) is None
+    await store.set_user_allowed(1, True)
+    assert (await store.get_user(1))["is_allowed"] is True
+    assert (await store.get_user(1))["is_allowed"] is True
+    assert store.user_cache.stats()["hits"] == 1
+
+    await store.upsert_chat(chat_id=5, title="Team", type_="group")
+    chat = await store.get_chat(5)
+    chat["allowed_user_ids"].append(7)
+    await store.upsert_chat(chat_id=5, title="Team", type_="group")
+    assert (await store.get_chat(5))["allowed_user_ids"] == []
+    await store.set_chat_enabled(5, True)
+    assert (await store.get_chat(5))["enabled"] is True
+    await store.upsert_chat(chat_id=5, title="Renamed", type_="group")
+    chat = await store.get_chat(5)
+    assert chat["title"] == "Renamed"
+    assert chat["enabled"] is True
+    await store.close()
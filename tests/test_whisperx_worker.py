@@ -0,0 +1,67 @@
+import sys
+
+import pytest
+
+from transkript_bot.transcription.whisperx_worker import (
+    WhisperXError,
+    WhisperXPool,
+    WhisperXWorker,
+    build_whisperx_worker_cmd,
+)
+
+STUB = """
+import json, os, sys
+print(json.dumps({"event": "ready"}), flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    if request["audio"] == "crash.wav":
+        os._exit(3)
+    if request["audio"] == "bad.wav":
+        print(json.dumps({"id": request["id"], "event": "error", "error": "bad audio"}), flush=True)
+        continue
+    print(json.dumps({"id": request["id"], "event": "progress", "percent": 50}), flush=True)
+    segment = {"text": request["audio"], "pid": os.getpid(), "language": request["language"]}
+    print(json.dumps({"id": request["id"], "event": "result", "segments": [segment]}), flush=True)
+"""
+
+
+def test_build_worker_cmd():
+    assert build_whisperx_worker_cmd("large-v2", threads=4)[-4:] == ["--model", "large-v2", "--threads", "4"]
+    assert build_whisperx_worker_cmd("small", worker_cmd="python stub.py") == ["python", "stub.py", "--model", "small"]
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_process_and_restarts_after_crash(tmp_path):
+    stub = tmp_path / "stub.py"
+    stub.write_text(STUB, encoding="utf-8")
+    worker = WhisperXWorker([sys.executable, str(stub)], job_timeout=10)
+    progress = []
+
+    first = await worker.transcribe("a.wav", language="ru", on_progress=progress.append)
+    second = await worker.transcribe("b.wav", language="ru")
+    assert progress == [50]
+    assert first[0]["pid"] == second[0]["pid"]
+
+    with pytest.raises(WhisperXError):
+        await worker.transcribe("bad.wav", language="ru")
+    assert worker.alive
+
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        await worker.transcribe("crash.wav", language="ru")
+    third = await worker.transcribe("c.wav", language="ru")
+    assert third[0]["pid"] != first[0]["pid"]
+    assert worker.restarts == 1
+    await worker.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_spreads_jobs_over_workers(tmp_path):
+    stub = tmp_path / "stub.py"
+    stub.write_text(STUB, encoding="utf-8")
+    pool = WhisperXPool(2, lambda: WhisperXWorker([sys.executable, str(stub)], job_timeout=10))
+    await pool.start()
+    assert pool.stats() == {"workers": 2, "alive": 2, "restarts": 0}
+    segments = await pool.transcribe("a.wav", language="auto")
+    assert segments[0]["text"] == "a.wav"
+    await pool.close()
+    assert pool.stats()["alive"] == 0
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from transkript_bot.config import Settings
+from transkript_bot.services.queue import EtaModel
+from transkript_bot.storage.db import Storage, init_db
+from transkript_bot.worker import (
+    _audio_plan,
+    _fail_job,
+    _job_paths,
+    _run_stage_item,
+    _start_profile,
+    deliver_job,
+    stop_profilers,
+)
+
+
+class FakeBot:
+    def __init__(self, on_edit=None):
+        self.edits = []
+        self.documents = []
+        self.on_edit = on_edit
+
+    async def edit_message_text(self, *, chat_id, message_id, text, reply_markup=None):
+        self.edits.append((chat_id, message_id, text, reply_markup is not None))
+        if self.on_edit is not None:
+            await self.on_edit(chat_id, message_id, text)
+        return SimpleNamespace(message_id=message_id)
+
+    async def send_message(self, chat_id, text, **_):
+        return SimpleNamespace(message_id=1)
+
+    async def send_document(self, chat_id, document, **_):
+        self.documents.append((chat_id, str(document.path)))
+        return SimpleNamespace(message_id=1)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_attached_during_delivery_still_gets_result(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    store = Storage(db_path)
+    settings = Settings(_env_file=None, media_dir=str(tmp_path))
+    leader = await store.create_job(chat_id=1, user_id=1, status="running", file_unique_id="u1", status_message_id=5)
+    outputs = {"segments": str(tmp_path / "cached.seg")}
+    late = []
+
+    async def on_edit(chat_id, message_id, text):
+        # The duplicate saw the leader running and is inserted while the leader's result is being sent.
+        if not late:
+            late.append(
+                await store.create_job(
+                    chat_id=2,
+                    user_id=2,
+                    status="waiting",
+                    file_unique_id="u1",
+                    coalesced_into=leader,
+                    status_message_id=7,
+                )
+            )
+
+    bot = FakeBot(on_edit)
+    job = {
+        "id": leader,
+        "chat_id": 1,
+        "status_message_id": 5,
+        "paths": _job_paths(settings, {"id": leader}),
+        "cached_outputs": outputs,
+        "started_at": time.time(),
+        "backend": "faster",
+    }
+    await deliver_job(job, bot, settings, store, {})
+
+    follower = await store.get_job(late[0])
+    assert follower["status"] == "done"
+    assert json.loads(follower["output_paths"]) == outputs
+    assert (2, 7) in [(chat_id, message_id) for chat_id, message_id, _, keyboard in bot.edits if keyboard]
+    assert (await store.get_job(leader))["status"] == "done"
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_stray_cancellation_fails_the_job_but_not_the_stage_worker(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    store = Storage(db_path)
+    job_id = await store.create_job(chat_id=1, user_id=1, status="running")
+    released = []
+
+    async def handler(job):
+        helper = asyncio.create_task(asyncio.sleep(10))
+        helper.cancel()
+        await helper
+
+    await _run_stage_item({"id": job_id, "chat_id": 1}, None, handler, FakeBot(), store, {}, released.append)
+
+    assert (await store.get_job(job_id))["status"] == "failed"
+    assert released == [job_id]
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_eta_learns_from_transcribe_span_not_stage_waits(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    await init_db(db_path)
+    store = Storage(db_path)
+    settings = Settings(_env_file=None, media_dir=str(tmp_path))
+    job_id = await store.create_job(chat_id=1, user_id=1, status="running")
+    eta_model = EtaModel("faster", "small")
+    eta_model.start(job_id, 100)
+    job = {
+        "id": job_id,
+        "chat_id": 1,
+        "paths": _job_paths(settings, {"id": job_id}),
+        "segments": [{"start": 0.0, "end": 1.0, "text": "hi"}],
+        # Most of the 600 s went to waiting in the transcribe and deliver queues.
+        "started_at": time.time() - 600,
+        "duration_sec": 100,
+        "transcribed_audio_sec": 100,
+        "timings": {"transcribe": 20.0},
+        "backend": "faster",
+    }
+    await deliver_job(job, FakeBot(), settings, store, {"eta": eta_model})
+
+    assert eta_model.rtf() == pytest.approx(0.2)
+    await store.close()
+
+
+class BrokenStorage:
+    async def update_job(self, job_id, **fields):
+        raise RuntimeError("database is locked")
+
+    async def list_coalesced_jobs(self, job_id):
+        raise RuntimeError("database is locked")
+
+
+@pytest.mark.asyncio
+async def test_profiler_is_stopped_even_when_failing_the_job_raises(tmp_path):
+    settings = Settings(_env_file=None, media_dir=str(tmp_path), profile_every_n=1, root_admin_ids=[9])
+    state = {}
+    _start_profile(1, settings, state)
+    _start_profile(2, settings, state)
+    first = state["profilers"][1]["profiler"]
+
+    bot = FakeBot()
+    with pytest.raises(RuntimeError):
+        await _fail_job({"id": 1, "chat_id": 1}, ValueError("boom"), bot, BrokenStorage(), state)
+    assert first._thread is None
+    assert bot.documents == [(9, str(tmp_path / "1.folded"))]
+    assert list(state["profilers"]) == [2]
+
+    second = state["profilers"][2]["profiler"]
+    stop_profilers(state)
+    assert second._thread is None
+    assert state["profilers"] == {}
+
+
+def test_in_place_input_is_not_reserved_in_memory(tmp_path):
+    settings = Settings(_env_file=None, media_dir=str(tmp_path))
+    job = {"id": 1, "file_name": "voice.ogg", "file_size": 1 << 20, "duration_sec": 60}
+    paths = _job_paths(settings, job)
+    copied = _audio_plan(job, settings, paths)
+    in_place = _audio_plan(job, settings, paths, in_place=True)
+    assert copied["pipe_input"] and copied["input_bytes"] == 1 << 20
+    assert not in_place["pipe_input"] and in_place["input_bytes"] == 0
+    assert in_place["reserve"] == copied["reserve"] - (1 << 20)